@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Exa Contents Benchmark
+Runs research.py against the mock Exa API and a local stand-in site twice, once
+fetching every hit and once with --exa-contents, then reads the hit URLs with
+soup.py --exa, and reports wall time, Exa requests and page fetches per run as
+JSON.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import functools
+import threading
+from typing import Any, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+CORPUS_DIR = os.path.join(BENCH_DIR, "corpus")
+
+# Keep caches and stored content written during the run out of the real output/ directory
+os.environ.setdefault("VAT_OUTPUT_DIR", tempfile.mkdtemp(prefix="vat-bench-"))
+os.environ.setdefault("VAT_SESSION_LOG", "0")
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "tools"))
+
+from server import LocalServer, QuietHandler
+from mock_exa import MockExaServer, add_config_arguments, config_from_args, fake_results
+
+class CountingHandler(QuietHandler):
+    """Static handler that counts page requests and answers after a fixed latency."""
+
+    latency = 0.0
+    count = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with CountingHandler.lock:
+            CountingHandler.count += 1
+        time.sleep(self.latency)
+        super().do_GET()
+
+def build_site(directory: str, queries: List[str], limit: int) -> List[str]:
+    """Place a corpus page at every hit path of the queries, returning the paths."""
+    pages = sorted(name for name in os.listdir(CORPUS_DIR) if name.endswith(".html"))
+    paths = [result["url"].lstrip("/") for query in queries for result in fake_results(query, limit, "")]
+    for i, path in enumerate(paths):
+        os.makedirs(os.path.dirname(os.path.join(directory, path)), exist_ok=True)
+        shutil.copy(os.path.join(CORPUS_DIR, pages[i % len(pages)]), os.path.join(directory, path))
+    return paths
+
+def run_tool(mock: MockExaServer, runner: Any, argv: List[str]) -> Dict[str, Any]:
+    """Run a tool's runner, counting Exa requests, page fetches and results."""
+    before = dict(mock.stats)
+    CountingHandler.count = 0
+    out = io.StringIO()
+    start = time.perf_counter()
+    stdout, sys.stdout = sys.stdout, out
+    try:
+        runner.run(argv)
+    finally:
+        sys.stdout = stdout
+    wall = time.perf_counter() - start
+
+    results = [json.loads(line) for line in out.getvalue().splitlines() if line.startswith("{")]
+    return {
+        "seconds": round(wall, 3),
+        "results": len(results),
+        "errors": sum("error" in result for result in results),
+        "from_exa": sum(result.get("document_type") == "exa" for result in results),
+        "exa_search_requests": mock.stats["search"] - before["search"],
+        "exa_contents_requests": mock.stats["contents"] - before["contents"],
+        "page_fetches": CountingHandler.count,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare fetching search hits with getting their text from Exa")
+    parser.add_argument("--queries", "-n",
+                       type=int, default=5,
+                       help="Search queries per run (default: 5)")
+    parser.add_argument("--limit", "-l",
+                       type=int, default=10,
+                       help="Results per query (default: 10)")
+    parser.add_argument("--site-latency",
+                       type=float, default=0.2,
+                       help="Seconds the stand-in site takes per page (default: 0.2)")
+    add_config_arguments(parser)
+    parser.set_defaults(contents_missing=0.2)
+    args = parser.parse_args()
+
+    queries = [f"contents benchmark query {i}" for i in range(args.queries)]
+    site_dir = tempfile.mkdtemp(prefix="vat-bench-site-")
+    paths = build_site(site_dir, queries, args.limit)
+    CountingHandler.latency = args.site_latency
+
+    with LocalServer(site_dir) as site:
+        site.httpd.RequestHandlerClass = functools.partial(CountingHandler, directory=site_dir)
+        args.hit_base_url = site.base_url
+        with MockExaServer(config_from_args(args)) as mock:
+            os.environ["EXA_BASE_URL"] = mock.base_url
+            os.environ.setdefault("EXA_API_KEY", "mock-key")
+            import research
+            import soup
+
+            common = ["--queries", *queries, "--limit", str(args.limit), "--format", "json", "--no-cache"]
+            runs = {
+                "fetch": run_tool(mock, research.create_runner(), common),
+                "exa_contents": run_tool(mock, research.create_runner(), [*common, "--exa-contents"]),
+                "soup_exa": run_tool(mock, soup.create_runner(), [
+                    "--urls", *(site.url(path) for path in paths), "--exa", "--format", "json", "--stream", "--no-cache",
+                    "--engine", "async", "--concurrency", "16"
+                ]),
+            }
+            stats = dict(mock.stats)
+    shutil.rmtree(site_dir, ignore_errors=True)
+
+    report = {
+        "queries": len(queries),
+        "hits": len(paths),
+        "contents_missing": args.contents_missing,
+        "site_latency": args.site_latency,
+        "server_stats": stats,
+        "runs": runs,
+    }
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Crawl Check
+Crawls the offline stand-in site (benchmarks/crawl_site) through the crawl
+frontier and soup.py extraction, interrupting the crawl halfway and resuming it
+from its saved frontier, and reports the pages reached against the expected set
+(scope, depth limit, robots.txt and de-duplication) with timing and per-host
+concurrency as JSON.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+from typing import Any, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SITE_DIR = os.path.join(BENCH_DIR, "crawl_site")
+
+# Keep caches and crawl state written during the run out of the real output/ directory
+os.environ.setdefault("VAT_OUTPUT_DIR", tempfile.mkdtemp(prefix="vat-bench-"))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "tools"))
+
+from server import LocalServer
+from soup import extract_text_from_url
+from src.utils.cache import bind_cache_policy, configure_cache
+from src.utils.cli.crawl import Crawler, CrawlJob, CrawlScope, Frontier
+
+# Pages a depth-2 crawl of docs/index.html reaches, with the depth each is found at
+EXPECTED = {
+    "docs/index.html": 0,
+    "docs/guide/intro.html": 1,
+    "docs/guide/install.html": 1,
+    "docs/api/": 1,
+    "docs/private/secret.html": 1,  # Reported as disallowed by robots.txt
+    "docs/guide/advanced.html": 2,
+    "docs/api/client.html": 2,
+}
+
+def crawl(server: LocalServer, job: CrawlJob, stop_after: int, delay: float, per_host: int) -> Dict[str, Any]:
+    """Run (or resume) the crawl, stopping after `stop_after` pages (0 for no limit)."""
+    seed = server.url("docs/index.html")
+    previous = job.load()
+    frontier = Frontier.from_state(previous, 20) if previous else Frontier(20)
+    if not previous:
+        frontier.add(seed, 0)
+    job.state = {"seeds": [seed]}
+
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    @bind_cache_policy
+    def extract(url: str, **kwargs):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        try:
+            return extract_text_from_url(url, **kwargs)
+        finally:
+            with lock:
+                active -= 1
+
+    crawler = Crawler(extract, frontier, CrawlScope([seed]), max_depth=2, concurrency=8,
+                      per_host=per_host, delay=delay)
+    pages: List[Dict[str, Any]] = []
+    status = "interrupted"
+    for _, url, depth, result in crawler.run(chunk_size=0):
+        pages.append({"url": url, "depth": depth, "error": result.get("error")})
+        job.checkpoint(frontier)
+        if stop_after and len(pages) >= stop_after:
+            break
+    else:
+        status = "done"
+    job.checkpoint(frontier, status=status, force=True)
+    return {"pages": pages, "peak_per_host": peak, "status": status}
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the crawler against the offline stand-in site")
+    parser.add_argument("--delay", type=float, default=0.05,
+                        help="Seconds between requests to the host (default: 0.05)")
+    parser.add_argument("--per-host", type=int, default=2,
+                        help="Concurrent requests to the host (default: 2)")
+    parser.add_argument("--stop-after", type=int, default=3,
+                        help="Pages after which the first run is interrupted (default: 3)")
+    args = parser.parse_args()
+    configure_cache(enabled=False)
+
+    with LocalServer(SITE_DIR) as server:
+        job = CrawlJob(f"bench-{int(time.time())}")
+        start = time.perf_counter()
+        first = crawl(server, job, args.stop_after, args.delay, args.per_host)
+        second = crawl(server, job, 0, args.delay, args.per_host)
+        seconds = time.perf_counter() - start
+        base = server.url("")
+
+    pages = first["pages"] + second["pages"]
+    reached = {page["url"][len(base):]: page["depth"] for page in pages}
+    report = {
+        "pages": len(pages),
+        "seconds": round(seconds, 3),
+        "resumed_after": len(first["pages"]),
+        "status": second["status"],
+        "missing": sorted(set(EXPECTED) - set(reached)),
+        "unexpected": sorted(set(reached) - set(EXPECTED)),
+        "wrong_depth": sorted(path for path, depth in reached.items() if EXPECTED.get(path, depth) != depth),
+        "repeated": len(pages) - len(reached),
+        "disallowed": sorted(page["url"][len(base):] for page in pages if page["error"] == "Disallowed by robots.txt"),
+        "errors": sorted(page["url"][len(base):] for page in pages
+                         if page["error"] and page["error"] != "Disallowed by robots.txt"),
+        "peak_per_host": max(first["peak_per_host"], second["peak_per_host"]),
+    }
+    print(json.dumps(report, indent=2))
+    failed = (report["missing"] or report["unexpected"] or report["wrong_depth"] or report["repeated"]
+              or report["errors"] or report["disallowed"] != ["docs/private/secret.html"]
+              or report["status"] != "done" or report["peak_per_host"] > args.per_host)
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Exa Search Load Generator
+Drives the exa.py ToolRunner multi-query path against the mock Exa API (or any
+EXA_BASE_URL) at rising concurrency, and reports latency percentiles, throughput
+and an error breakdown per level as JSON.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+from collections import Counter
+from typing import Any, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Keep caches written during the run out of the real output/ directory
+os.environ.setdefault("VAT_OUTPUT_DIR", tempfile.mkdtemp(prefix="vat-bench-"))
+os.environ.setdefault("VAT_SESSION_LOG", "0")
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "tools"))
+
+from mock_exa import MockExaServer, add_config_arguments, config_from_args
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, round(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+def error_kind(error: str) -> str:
+    """Bucket an ErrorResult message by HTTP status or failure type."""
+    match = re.match(r"(\d{3}) ", error)
+    if match:
+        return match.group(1)
+    if "timed out" in error.lower():
+        return "timeout"
+    if "connection" in error.lower():
+        return "connection"
+    return "other"
+
+def run_level(concurrency: int, requests: int, limit: int) -> Dict[str, Any]:
+    """Run one load level through ToolRunner.run with the async engine."""
+    import exa
+
+    latencies: List[float] = []
+    errors: Counter = Counter()
+    lock = threading.Lock()
+
+    def timed_search(query: str, **kwargs):
+        start = time.perf_counter()
+        result = exa.search_exa(query, **kwargs)
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies.append(elapsed)
+            if "error" in result:
+                errors[error_kind(result["error"])] += 1
+        return result
+
+    runner = exa.create_runner()
+    runner.processor = runner.parallel_processor.processor = timed_search
+    queries = [f"load test query {concurrency}-{i}" for i in range(requests)]
+    argv = ["--queries", *queries, "--limit", str(limit), "--format", "json",
+            "--engine", "async", "--concurrency", str(concurrency), "--no-cache"]
+
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            runner.run(argv)
+        finally:
+            sys.stdout = stdout
+    wall = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "seconds": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else None,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(max(latencies, default=0), 2),
+        },
+        "errors": sum(errors.values()),
+        "error_breakdown": dict(errors),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test exa.py against a mock Exa API")
+    parser.add_argument("--levels",
+                       type=int, nargs="+", default=[1, 2, 5, 10, 20, 50],
+                       help="Concurrency levels to run (default: 1 2 5 10 20 50)")
+    parser.add_argument("--requests", "-n",
+                       type=int, default=100,
+                       help="Queries per level (default: 100)")
+    parser.add_argument("--limit", "-l",
+                       type=int, default=10,
+                       help="Results per query (default: 10)")
+    parser.add_argument("--url",
+                       help="Use this Exa-compatible base URL instead of starting the mock server")
+    parser.add_argument("--output", "-o",
+                       help="Write the JSON report to this file instead of stdout")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    mock = None
+    if args.url:
+        os.environ["EXA_BASE_URL"] = args.url
+    else:
+        mock = MockExaServer(config_from_args(args)).__enter__()
+        os.environ["EXA_BASE_URL"] = mock.base_url
+        os.environ.setdefault("EXA_API_KEY", "mock-key")
+
+    try:
+        levels = [run_level(concurrency, args.requests, args.limit) for concurrency in args.levels]
+    finally:
+        if mock:
+            mock.__exit__(None, None, None)
+
+    report = {
+        "base_url": os.environ["EXA_BASE_URL"],
+        "requests_per_level": args.requests,
+        "mock": vars(mock.config) if mock else None,
+        "server_stats": mock.stats if mock else None,
+        "levels": levels,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Soup Extraction Benchmark
+Runs the offline HTML corpus through tools/soup.py via a local stand-in server and
+reports per-page timings, peak memory, throughput, output size and golden-output
+diffs as JSON, so runs can be compared across commits.
+"""
+
+import os
+import sys
+import json
+import time
+import glob
+import difflib
+import argparse
+import platform
+import tempfile
+import statistics
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+CORPUS_DIR = os.path.join(BENCH_DIR, "corpus")
+GOLDEN_DIR = os.path.join(BENCH_DIR, "golden")
+
+# Keep caches and content stores written during the run out of the real output/ directory
+os.environ.setdefault("VAT_OUTPUT_DIR", tempfile.mkdtemp(prefix="vat-bench-"))
+# Corpus pages share one host, so a profile learned from one page would apply to the others
+os.environ.setdefault("SOUP_PROFILES", "0")
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "tools"))
+
+from server import LocalServer
+from soup import extract_text_from_url, clean_text
+from src.utils.cache import configure_cache
+from src.utils.soup.parsers import get_backend
+
+def time_ms(func, repeat: int) -> float:
+    """Median wall time of `func` in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def compare_golden(name: str, title: str, content: str, update: bool) -> Dict[str, Any]:
+    """Compare extracted output against the stored golden output (or rewrite it)."""
+    path = os.path.join(GOLDEN_DIR, name + ".json")
+    if update:
+        os.makedirs(GOLDEN_DIR, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"title": title, "content": content}, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        return {"status": "updated"}
+    if not os.path.exists(path):
+        return {"status": "missing"}
+
+    with open(path, encoding="utf-8") as f:
+        golden = json.load(f)
+    if golden["title"] == title and golden["content"] == content:
+        return {"status": "match"}
+
+    expected, actual = golden["content"].splitlines(), content.splitlines()
+    diff = list(difflib.unified_diff(expected, actual, "golden", "actual", lineterm="", n=0))
+    return {
+        "status": "mismatch",
+        "title_matches": golden["title"] == title,
+        "similarity": round(difflib.SequenceMatcher(None, expected, actual).ratio(), 4),
+        "diff": diff[:20],
+    }
+
+def bench_page(server: LocalServer, path: str, parser: Optional[str], repeat: int, update: bool) -> Dict[str, Any]:
+    """Benchmark one corpus page."""
+    name = os.path.splitext(os.path.basename(path))[0]
+    with open(path, encoding="utf-8") as f:
+        html = f.read()
+    url = server.url(os.path.basename(path))
+
+    # End to end through the tool: local fetch, parse, extract, clean
+    fetch_extract_ms = time_ms(lambda: extract_text_from_url(url, chunk_size=0, parser=parser), repeat)
+    result = extract_text_from_url(url, chunk_size=0, parser=parser)
+    if "error" in result:
+        return {"page": name, "error": result["error"]}
+
+    # Parse and extract stages on their own, with a fresh backend per run
+    parse_ms = time_ms(lambda: get_backend(parser).parse(html), repeat)
+    def parse_and_extract():
+        backend = get_backend(parser)
+        _, content = backend.extract(backend.parse(html))
+        clean_text(content)
+    extract_ms = max(time_ms(parse_and_extract, repeat) - parse_ms, 0.0)
+
+    # Python heap peak only: memory held inside C parsers is not traced
+    tracemalloc.start()
+    parse_and_extract()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "page": name,
+        "bytes": len(html.encode("utf-8")),
+        "fetch_extract_ms": round(fetch_extract_ms, 3),
+        "parse_ms": round(parse_ms, 3),
+        "extract_ms": round(extract_ms, 3),
+        "peak_memory_bytes": peak_memory,
+        "output_chars": result["content_length"],
+        "golden": compare_golden(name, result["title"], result["content"], update),
+    }
+
+def summarize(pages: List[Dict[str, Any]], baseline: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Compute corpus-wide throughput and, if given, per-page change against a baseline run."""
+    measured = [page for page in pages if "error" not in page]
+    total_seconds = sum(page["fetch_extract_ms"] for page in measured) / 1000
+    total_bytes = sum(page["bytes"] for page in measured)
+
+    if baseline:
+        previous = {page["page"]: page for page in baseline.get("pages", []) if "error" not in page}
+        for page in measured:
+            if page["page"] in previous:
+                before = previous[page["page"]]["fetch_extract_ms"]
+                page["change_pct"] = round((page["fetch_extract_ms"] - before) / before * 100, 1) if before else None
+
+    return {
+        "pages": len(pages),
+        "errors": len(pages) - len(measured),
+        "golden_mismatches": sum(1 for page in measured if page["golden"]["status"] == "mismatch"),
+        "bytes": total_bytes,
+        "seconds": round(total_seconds, 4),
+        "pages_per_sec": round(len(measured) / total_seconds, 2) if total_seconds else None,
+        "mb_per_sec": round(total_bytes / 1e6 / total_seconds, 3) if total_seconds else None,
+        "peak_memory_bytes": max((page["peak_memory_bytes"] for page in measured), default=0),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark soup.py extraction on the offline corpus")
+    parser.add_argument("--parser", "-p",
+                       default=None,
+                       help="Parser backend to benchmark (default: same as soup.py)")
+    parser.add_argument("--repeat", "-r",
+                       type=int, default=5,
+                       help="Runs per measurement; the median is reported (default: 5)")
+    parser.add_argument("--pages",
+                       nargs="+",
+                       help="Only benchmark these corpus pages (file names without .html)")
+    parser.add_argument("--baseline", "-b",
+                       help="Previous JSON report to compare fetch+extract times against")
+    parser.add_argument("--update-golden",
+                       action="store_true",
+                       help="Rewrite the golden outputs from this run")
+    parser.add_argument("--output", "-o",
+                       help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    configure_cache(enabled=False)
+    paths = sorted(glob.glob(os.path.join(CORPUS_DIR, "*.html")))
+    if args.pages:
+        paths = [path for path in paths if os.path.splitext(os.path.basename(path))[0] in args.pages]
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    with LocalServer(CORPUS_DIR) as server:
+        pages = [bench_page(server, path, args.parser, args.repeat, args.update_golden) for path in paths]
+
+    report = {
+        "parser": get_backend(args.parser).name,
+        "python": platform.python_version(),
+        "repeat": args.repeat,
+        "pages": pages,
+        "totals": summarize(pages, baseline),
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if report["totals"]["golden_mismatches"] or report["totals"]["errors"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
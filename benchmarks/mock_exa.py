@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Mock Exa API server for offline load testing.
+Answers POST /search (with page text when contents are requested) and POST
+/contents with deterministic fake results after a configurable delay, and
+injects server errors and 429 responses at configurable rates or once a
+requests-per-second quota is exceeded.
+"""
+
+import json
+import time
+import random
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler
+from typing import Any, Dict, List, Optional
+from server import BenchHTTPServer
+
+class MockExaConfig:
+    """Behaviour knobs for the mock server."""
+
+    def __init__(self,
+                 latency: float = 0.2,
+                 jitter: float = 0.05,
+                 error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0,
+                 quota: float = 0.0,
+                 retry_after: float = 1.0,
+                 hit_base_url: str = "https://example.com",
+                 contents_missing: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.quota = quota
+        self.retry_after = retry_after
+        self.hit_base_url = hit_base_url.rstrip("/")
+        # Fraction of URLs without page text (the same URLs for search and /contents)
+        self.contents_missing = contents_missing
+
+def fake_text(url: str, missing: float = 0.0) -> Optional[str]:
+    """Deterministic page text for a URL, or None for the `missing` fraction of URLs."""
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    if int(digest[:8], 16) / 0xFFFFFFFF < missing:
+        return None
+    paragraphs = [
+        f"Paragraph {i + 1} of the page at {url}. "
+        + " ".join(f"word{int(digest[j:j + 2], 16)}" for j in range(0, 40, 2))
+        for i in range(8)
+    ]
+    return "\n\n".join(paragraphs)
+
+def fake_results(query: str, limit: int, hit_base_url: str = "https://example.com") -> List[Dict[str, Any]]:
+    """Deterministic search results for a query."""
+    digest = hashlib.sha1(query.encode("utf-8")).hexdigest()[:8]
+    return [
+        {
+            "id": f"{digest}-{i}",
+            "title": f"Result {i + 1} for {query}",
+            "author": f"Author {i + 1}",
+            "url": f"{hit_base_url}/{digest}/{i + 1}.html",
+            "score": round(1 - i / (limit + 1), 4),
+        }
+        for i in range(limit)
+    ]
+
+class MockExaServer:
+    """Context manager running the mock Exa API on an ephemeral local port."""
+
+    def __init__(self, config: MockExaConfig = None, port: int = 0):
+        self.config = config or MockExaConfig()
+        self.lock = threading.Lock()
+        self.window_start = time.monotonic()
+        self.window_count = 0
+        self.stats = {"requests": 0, "ok": 0, "errors": 0, "rate_limited": 0,
+                      "search": 0, "contents": 0, "contents_urls": 0}
+        self.httpd = BenchHTTPServer(("127.0.0.1", port), self._handler())
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _over_quota(self) -> bool:
+        """Fixed one-second window quota, like a per-second API limit."""
+        if not self.config.quota:
+            return False
+        with self.lock:
+            now = time.monotonic()
+            if now - self.window_start >= 1:
+                self.window_start, self.window_count = now, 0
+            self.window_count += 1
+            return self.window_count > self.config.quota
+
+    def _count(self, key: str) -> None:
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats[key] += 1
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self, status: int, body: Dict[str, Any], headers: Dict[str, str] = None) -> None:
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                config = server.config
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    payload = None
+
+                if not self.headers.get("Authorization", "").startswith("Bearer "):
+                    server._count("errors")
+                    return self._reply(401, {"error": "Missing API key"})
+                if not isinstance(payload, dict) or not (
+                        (self.path == "/search" and "query" in payload)
+                        or (self.path == "/contents" and isinstance(payload.get("urls"), list))):
+                    server._count("errors")
+                    return self._reply(400, {"error": "Bad request"})
+
+                if server._over_quota() or random.random() < config.rate_limit_rate:
+                    server._count("rate_limited")
+                    return self._reply(429, {"error": "Rate limit exceeded"}, {"Retry-After": str(config.retry_after)})
+
+                time.sleep(max(0.0, random.gauss(config.latency, config.jitter)))
+                if random.random() < config.error_rate:
+                    server._count("errors")
+                    return self._reply(500, {"error": "Internal server error"})
+
+                server._count("ok")
+                if self.path == "/contents":
+                    with server.lock:
+                        server.stats["contents"] += 1
+                        server.stats["contents_urls"] += len(payload["urls"])
+                    results, statuses = [], []
+                    for url in payload["urls"]:
+                        text = fake_text(url, config.contents_missing)
+                        if text is None:
+                            statuses.append({"id": url, "status": "error", "error": {"tag": "CRAWL_NOT_FOUND"}})
+                        else:
+                            statuses.append({"id": url, "status": "success"})
+                            results.append({"id": url, "url": url, "title": f"Page {url}", "author": None, "text": text})
+                    return self._reply(200, {"results": results, "statuses": statuses})
+
+                with server.lock:
+                    server.stats["search"] += 1
+                limit = int(payload.get("numResults", 10))
+                results = fake_results(payload["query"], limit, config.hit_base_url)
+                if "text" in payload.get("contents", {}):
+                    for result in results:
+                        text = fake_text(result["url"], config.contents_missing)
+                        if text is not None:
+                            result["text"] = text
+                self._reply(200, {"results": results})
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self) -> "MockExaServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def add_config_arguments(parser) -> None:
+    """Add the mock server behaviour options to an argument parser."""
+    parser.add_argument("--latency", type=float, default=0.2, help="Mean response latency in seconds (default: 0.2)")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Latency standard deviation in seconds (default: 0.05)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500 (default: 0)")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with 429 (default: 0)")
+    parser.add_argument("--quota", type=float, default=0.0, help="Requests per second before answering 429, 0 for none (default: 0)")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429 (default: 1)")
+    parser.add_argument("--hit-base-url", default="https://example.com", help="Base URL of result links, e.g. a local stand-in site")
+    parser.add_argument("--contents-missing", type=float, default=0.0, help="Fraction of URLs without page text (default: 0)")
+
+def config_from_args(args) -> MockExaConfig:
+    return MockExaConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        quota=args.quota,
+        retry_after=args.retry_after,
+        hit_base_url=args.hit_base_url,
+        contents_missing=args.contents_missing,
+    )
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Run a mock Exa API server")
+    parser.add_argument("--port", "-p", type=int, default=8001, help="Port (default: 8001)")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+    with MockExaServer(config_from_args(args), args.port) as server:
+        print(f"Mock Exa API at {server.base_url} (set EXA_BASE_URL to use it)")
+        server.thread.join()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Local stand-in HTTP server for offline benchmarks and tests.
+Serves a directory of saved pages on 127.0.0.1 from a background thread.
+"""
+
+import os
+import threading
+import functools
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+class BenchHTTPServer(ThreadingHTTPServer):
+    """Threaded server with a listen backlog large enough for high-concurrency runs."""
+
+    request_queue_size = 128
+    daemon_threads = True
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    """Static file handler that declares UTF-8 HTML and does not log requests."""
+
+    # Keep connections alive between requests, as real servers do
+    protocol_version = "HTTP/1.1"
+
+    extensions_map = {
+        **SimpleHTTPRequestHandler.extensions_map,
+        ".html": "text/html; charset=utf-8",
+        ".txt": "text/plain; charset=utf-8",
+        ".md": "text/markdown; charset=utf-8",
+        ".json": "application/json",
+        ".xml": "application/xml",
+    }
+
+    def log_message(self, format, *args):
+        pass
+
+class LocalServer:
+    """Context manager serving `directory` on an ephemeral local port."""
+
+    def __init__(self, directory: str, port: int = 0):
+        handler = functools.partial(QuietHandler, directory=os.path.abspath(directory))
+        self.httpd = BenchHTTPServer(("127.0.0.1", port), handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def __enter__(self) -> "LocalServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Serve a directory on localhost")
+    parser.add_argument("directory", help="Directory to serve")
+    parser.add_argument("--port", "-p", type=int, default=8000, help="Port (default: 8000)")
+    args = parser.parse_args()
+    with LocalServer(args.directory, args.port) as server:
+        print(f"Serving {args.directory} at {server.base_url}")
+        server.thread.join()
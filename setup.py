@@ -17,4 +17,11 @@ setup(
         "python-dotenv",
         "inflect",
     ],
+    extras_require={
+        # Faster HTML parser backends, brotli decoding and zstd session log compression,
+        # picked up automatically when installed
+        "fast": ["selectolax", "lxml", "cssselect", "brotli", "zstandard"],
+        # Text extraction from PDF documents
+        "pdf": ["pypdf"],
+    },
 )
\ No newline at end of file
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Persistent on-disk cache for tool responses.
+"""
+
+import os
+import json
+import time
+import hashlib
+import functools
+import threading
+import contextvars
+from typing import Any, Callable, Dict, Generic, NamedTuple, Optional, Tuple, TypedDict, TypeVar
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from dotenv import load_dotenv
+from .common import OUTPUT_DIR
+
+load_dotenv()
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(OUTPUT_DIR, ".cache"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+
+# Stores between full rescans of the cache, which also pick up other processes' stores
+EVICT_RESCAN_STORES = 1000
+# Eviction frees the cache down to this fraction of its limit, so the stores that
+# follow fit without another scan
+EVICT_LOW_WATER = 0.9
+
+V = TypeVar('V')
+F = TypeVar('F', bound=Callable[..., Any])
+
+class CachePolicy(NamedTuple):
+    enabled: bool = True
+    refresh: bool = False
+
+# Cache policy of the current run, set from its --no-cache / --refresh flags. Runs
+# served by the daemon share the process, so the policy is per context, not global.
+_policy: "contextvars.ContextVar[CachePolicy]" = contextvars.ContextVar("cache_policy", default=CachePolicy())
+
+def configure_cache(enabled: bool = True, refresh: bool = False) -> None:
+    """
+    Set the cache policy for the current run (the calling thread's context).
+
+    Args:
+        enabled: Whether to read from and write to the cache at all
+        refresh: Ignore cached entries but still store fresh responses
+    """
+    _policy.set(CachePolicy(enabled, refresh))
+
+def cache_reads_allowed() -> bool:
+    """Whether the current run may use previously stored pages (neither --no-cache nor --refresh)."""
+    policy = _policy.get()
+    return policy.enabled and not policy.refresh
+
+def bind_cache_policy(func: F) -> F:
+    """
+    Wrap a function so it runs under the caller's cache policy in whichever
+    thread calls it (worker threads do not inherit the run's context).
+    """
+    policy = _policy.get()
+
+    @functools.wraps(func)
+    def bound(*args, **kwargs):
+        token = _policy.set(policy)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _policy.reset(token)
+    return bound  # type: ignore[return-value]
+
+class CacheEntry(TypedDict):
+    """Type for a stored cache entry"""
+    key: str
+    stored_at: float
+    etag: Optional[str]
+    last_modified: Optional[str]
+    value: Any
+
+# Cache root -> (approximate size in bytes, stores since the last scan), seeded by
+# the first eviction scan and then kept up to date by this process's stores
+_sizes: Dict[str, Tuple[int, int]] = {}
+_sizes_lock = threading.Lock()
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL so trivially different spellings share a cache key."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme, netloc.rsplit(":", 1)[-1]) in (("http", "80"), ("https", "443")):
+        netloc = netloc.rsplit(":", 1)[0]
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, parts.path or "/", query, ""))
+
+def make_key(*parts: Any) -> str:
+    """Build a cache key from its parts."""
+    return json.dumps(parts, ensure_ascii=False)
+
+class ResponseCache(Generic[V]):
+    """File-per-entry cache with a TTL and size-bounded LRU eviction."""
+
+    def __init__(self, namespace: str, ttl: float, max_bytes: int = CACHE_MAX_BYTES, directory: str = CACHE_DIR):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.root = directory
+        self.directory = os.path.join(directory, namespace)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry for a key, fresh or stale, or None if there is none."""
+        if not cache_reads_allowed():
+            return None
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("key") != key:
+            return None
+        # Bump the modification time so eviction is least-recently-used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """Check whether an entry is still within its TTL."""
+        return time.time() - entry["stored_at"] < self.ttl
+
+    def get(self, key: str) -> Optional[V]:
+        """Return the cached value for a key if it is fresh."""
+        entry = self.lookup(key)
+        if entry and self.is_fresh(entry):
+            return entry["value"]
+        return None
+
+    def store(self, key: str, value: V, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """Store a value, evicting least recently used entries if over the size limit."""
+        if not _policy.get().enabled:
+            return
+        entry = CacheEntry(key=key, stored_at=time.time(), etag=etag, last_modified=last_modified, value=value)
+        path = self._path(key)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+                size = f.tell()
+            try:
+                replaced = os.path.getsize(path)
+            except OSError:
+                replaced = 0
+            os.replace(tmp_path, path)
+            self.track(size - replaced)
+        except OSError:
+            pass
+
+    def renew(self, entry: CacheEntry) -> None:
+        """Restart the TTL of an entry, e.g. after a 304 Not Modified."""
+        self.store(entry["key"], entry["value"], entry.get("etag"), entry.get("last_modified"))
+
+    def track(self, delta: int) -> None:
+        """Account for a store of `delta` bytes, evicting only once the cache may be over max_bytes."""
+        with _sizes_lock:
+            seen = _sizes.get(self.root)
+            if seen and seen[0] + delta <= self.max_bytes and seen[1] < EVICT_RESCAN_STORES:
+                _sizes[self.root] = (seen[0] + delta, seen[1] + 1)
+                return
+        self.evict()
+
+    def evict(self) -> None:
+        """Delete least recently used entries across all namespaces if over max_bytes, down to the low-water mark."""
+        files = []
+        total = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        target = self.max_bytes if total <= self.max_bytes else int(self.max_bytes * EVICT_LOW_WATER)
+        for _, size, path in sorted(files):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        with _sizes_lock:
+            _sizes[self.root] = (total, 0)
+
+def conditional_headers(entry: Optional[CacheEntry]) -> Dict[str, str]:
+    """Build revalidation headers (If-None-Match / If-Modified-Since) for a stale entry."""
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
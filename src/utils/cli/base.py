@@ -5,40 +5,83 @@ Common CLI utilities and base classes.
 
 import os
 import sys
+import time
 import inflect
 import argparse
+import itertools
 import concurrent.futures
-from typing import TypeVar, Generic, List, Callable, Optional, Union, Dict, Any
+from typing import TypeVar, Generic, List, Callable, Optional, Union, Dict, Any, Iterable, Iterator, Sequence, Tuple
 from dotenv import load_dotenv
+from ..cache import bind_cache_policy, configure_cache
+from ..common import BaseFormatter, ResultWriter, OUTPUT_FORMATS, output_stream, output_path
+from ..dedup import DuplicateFilter
+from ..session_log import SessionRecorder
+from .engine import AsyncProcessor, ASYNC_CONCURRENCY, ASYNC_PER_HOST, url_host
+from . import timing
 
 # Load environment variables once
 load_dotenv()
 MAX_PARALLEL_REQUESTS = int(os.getenv("MAX_PARALLEL_REQUESTS", "5"))
 
+DEFAULT_ENGINE = os.getenv("DEFAULT_ENGINE", "thread")
+
 # Initialize the inflect engine
 p = inflect.engine()
 
+# Arguments handled by ToolRunner itself rather than passed to the processor
+RUNNER_ARGS = ['format', 'output', 'no_cache', 'refresh', 'timings', 'trace',
+               'engine', 'concurrency', 'per_host', 'stream', 'ordered', 'batch', 'job', 'restart']
+
 T = TypeVar('T')
 
 class ParallelProcessor(Generic[T]):
     """Base class for parallel processing of items."""
     
-    def __init__(self, processor: Callable[..., T], max_items: int = MAX_PARALLEL_REQUESTS):
+    def __init__(self, processor: Callable[..., T], max_workers: int = MAX_PARALLEL_REQUESTS):
         self.processor = processor
-        self.max_items = max_items
+        # Items beyond this many wait in the executor's queue for a free worker
+        self.max_workers = max_workers
     
     def process_items(self, items: List[str], **kwargs) -> List[T]:
-        """Process multiple items in parallel."""
-        if len(items) > self.max_items:
-            print(f"Warning: Maximum {self.max_items} parallel requests allowed. Only the first {self.max_items} will be processed.")
-            items = items[:self.max_items]
-        
-        with concurrent.futures.ThreadPoolExecutor() as executor:
+        """Process multiple items in parallel, returning results in input order."""
+        with concurrent.futures.ThreadPoolExecutor(self.max_workers) as executor:
             futures = [
                 executor.submit(self.processor, item, **kwargs) 
                 for item in items
             ]
-            return [future.result() for future in concurrent.futures.as_completed(futures)]
+            return [future.result() for future in futures]
+    
+    def iter_items(self, items: List[str], **kwargs) -> Iterator[Tuple[int, T]]:
+        """
+        Process multiple items in parallel, yielding (1-based input index, result) as each completes.
+        
+        Only a couple of items per worker are submitted ahead of the consumer, so
+        finished results wait in memory only until they are taken.
+        """
+        inputs = enumerate(items, 1)
+        with concurrent.futures.ThreadPoolExecutor(self.max_workers) as executor:
+            futures: Dict[concurrent.futures.Future, int] = {}
+            
+            def submit(count: int) -> None:
+                for index, item in itertools.islice(inputs, count):
+                    futures[executor.submit(self.processor, item, **kwargs)] = index
+            
+            submit(self.max_workers * 2)
+            while futures:
+                done, _ = concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    yield futures.pop(future), future.result()
+                submit(len(done))
+
+def in_input_order(results: Iterable[Tuple[int, T]]) -> Iterator[Tuple[int, T]]:
+    """Re-emit (index, result) pairs in input order, buffering only results that arrive early."""
+    pending: Dict[int, T] = {}
+    next_index = 1
+    for index, result in results:
+        pending[index] = result
+        while next_index in pending:
+            yield next_index, pending.pop(next_index)
+            next_index += 1
 
 def create_output_parser(description: str, 
                         input_name: str,
@@ -56,29 +99,85 @@ def create_output_parser(description: str,
         plural_name = p.plural(input_name)
         input_group.add_argument(f"--{plural_name}", f"-{input_name[0]}s", 
                                nargs="+", type=str,
-                               help=f"{multi_input_help} (up to {MAX_PARALLEL_REQUESTS})")
+                               help=f"{multi_input_help} ({MAX_PARALLEL_REQUESTS} at a time with the thread engine)")
+        input_group.add_argument("--batch",
+                               type=str,
+                               metavar="FILE",
+                               help=f"Read {plural_name} from FILE (one per line, - for stdin) and run them as a resumable job, writing JSONL results")
+        parser.add_argument("--job",
+                           type=str,
+                           help="Batch job name (default: derived from the tool, inputs and options)")
+        parser.add_argument("--restart",
+                           action="store_true",
+                           help="Discard the progress of an earlier run of the same batch job")
+        parser.add_argument("--engine",
+                           choices=["thread", "async"],
+                           default=DEFAULT_ENGINE,
+                           help=f"Execution engine for multiple {plural_name} (default: {DEFAULT_ENGINE})")
+        parser.add_argument("--concurrency",
+                           type=int,
+                           default=ASYNC_CONCURRENCY,
+                           help=f"Global concurrency limit for the async engine and batch jobs (default: {ASYNC_CONCURRENCY})")
+        parser.add_argument("--per-host",
+                           type=int,
+                           default=ASYNC_PER_HOST,
+                           help=f"Per-host concurrency limit for the async engine and batch jobs (default: {ASYNC_PER_HOST})")
+        parser.add_argument("--stream",
+                           action="store_true",
+                           help="Print each result as soon as it completes (NDJSON lines with --format json or ndjson)")
+        parser.add_argument("--ordered",
+                           action="store_true",
+                           help="Stream results in input order, holding back only those that finish early")
     
-    # Common arguments
+    add_runner_arguments(parser)
+    return parser
+
+def add_runner_arguments(parser: argparse.ArgumentParser,
+                         formats: Sequence[str] = OUTPUT_FORMATS,
+                         format_help: str = "Output format: text, json (pretty), ndjson (one result per line) or compact JSON",
+                         output_help: str = "Save results to file (in output directory; gzip-compressed if it ends in .gz)",
+                         cache: bool = True,
+                         timings: bool = True) -> None:
+    """
+    Add the arguments shared by the tools: --format and --output, and unless
+    disabled, the cache flags and the timing flags.
+    """
     parser.add_argument("--format", "-f", 
-                       choices=["text", "json"], 
+                       choices=formats, 
                        default="text",
-                       help="Output format (default: text)")
+                       help=f"{format_help} (default: text)")
     parser.add_argument("--output", "-o", 
                        type=str,
-                       help="Save results to file (in output directory)")
-    
-    return parser
+                       help=output_help)
+    if cache:
+        parser.add_argument("--no-cache",
+                           action="store_true",
+                           help="Neither read from nor write to the response cache")
+        parser.add_argument("--refresh",
+                           action="store_true",
+                           help="Ignore cached responses but store the fresh ones")
+    if timings:
+        parser.add_argument("--timings",
+                           action="store_true",
+                           help="Report per-item stage timings (a table on stderr, a `timings` field in JSON)")
+        parser.add_argument("--trace",
+                           type=str,
+                           help="Write timings to a trace file: Chrome trace JSON, or appended JSON lines for .jsonl")
 
 class ToolRunner(Generic[T]):
     """Base class for running tools with standard CLI patterns."""
     
     def __init__(self,
                  processor: Callable[..., T],
-                 formatter: Callable[[Union[T, List[T]], str], str],
+                 formatter: BaseFormatter,
                  description: str,
                  input_name: str,
                  input_help: str,
-                 multi_input_help: Optional[str] = None):
+                 multi_input_help: Optional[str] = None,
+                 host_of: Callable[[str], Optional[str]] = url_host,
+                 duplicate_filter: Optional[Callable[[], DuplicateFilter]] = None,
+                 prepare_kwargs: Optional[Dict[str, Any]] = None,
+                 duplicate_kwargs: Optional[Dict[str, Any]] = None):
         self.processor = processor
         self.formatter = formatter
         self.input_name = input_name
@@ -90,19 +189,165 @@ class ToolRunner(Generic[T]):
             multi_input_help=multi_input_help
         )
         self.parallel_processor = ParallelProcessor(processor)
+        self.host_of = host_of
+        self.duplicate_filter = duplicate_filter
+        # Processor arguments for multi-input runs whose results go through formatter.prepare
+        self.prepare_kwargs = prepare_kwargs or {}
+        # Processor arguments for runs whose results are checked for duplicates
+        self.duplicate_kwargs = duplicate_kwargs or {}
     
     def add_arguments(self, **kwargs: Dict[str, Any]) -> None:
         """Add additional tool-specific arguments to the parser."""
         for name, options in kwargs.items():
-            self.parser.add_argument(f"--{name}", f"-{name[0]}", **options)
+            flag = f"--{name.replace('_', '-')}"
+            try:
+                self.parser.add_argument(flag, f"-{name[0]}", **options)
+            except argparse.ArgumentError:
+                # Short flag already taken (e.g. -o for --output): long flag only
+                self.parser.add_argument(flag, **options)
+    
+    def _multi_processor(self, args: argparse.Namespace,
+                         processor: Optional[Callable[..., T]] = None) -> Union[ParallelProcessor[T], AsyncProcessor[T]]:
+        """Pick the processor for multiple inputs based on the --engine flag."""
+        processor = processor or self.processor
+        if args.engine == "async":
+            return AsyncProcessor(
+                processor,
+                concurrency=args.concurrency,
+                per_host=args.per_host,
+                host_of=self.host_of
+            )
+        return self.parallel_processor if processor is self.processor else ParallelProcessor(processor)
+    
+    def _instrumented(self, recorded: List[timing.ItemTimings], attach: bool) -> Callable[..., T]:
+        """Wrap the processor to record timings per item, optionally attaching them to results."""
+        def process(item: str, **kwargs) -> T:
+            with timing.record(item) as timings:
+                timings.notes["host"] = self.host_of(item) or ""
+                result = self.processor(item, **kwargs)
+            recorded.append(timings)
+            if attach and isinstance(result, dict):
+                return {**result, "timings": timings.summary()}
+            return result
+        return process
     
-    def run(self) -> None:
-        """Run the tool with parsed arguments."""
-        args = self.parser.parse_args()
+    def _recorded(self, recorder: SessionRecorder, processor: Callable[..., T]) -> Callable[..., T]:
+        """Wrap the processor to record each result in the session log."""
+        def process(item: str, **kwargs) -> T:
+            result = processor(item, **kwargs)
+            recorder.result(item, self.formatter.recordable(result))
+            return result
+        return process
+    
+    def report_timings(self, args: argparse.Namespace, recorded: List[timing.ItemTimings],
+                       run_spans: List[Tuple[str, float, float]], origin: float) -> None:
+        """Print the timings table and write the trace file, as requested."""
+        if args.timings and recorded:
+            print(timing.format_table(recorded, run_spans), file=sys.stderr)
+        if args.trace:
+            from ..common import open_output_file
+            jsonl = args.trace.endswith(".jsonl")
+            with open_output_file(args.trace, "a" if jsonl else "w") as f:
+                timing.write_trace(f, recorded, run_spans, origin, jsonl=jsonl)
+            print(f"Trace saved to {f.name}", file=sys.stderr)
+    
+    def run_batch(self, args: argparse.Namespace, processor: Callable[..., T], **kwargs) -> None:
+        """Run every input of a --batch file as a resumable job with incremental JSONL results."""
+        from ..common import PROJECT_ROOT
+        from .batch import BatchJob, BatchProcessor, read_inputs, CHECKPOINT_INTERVAL
+        
+        # stdin can only be read once, so its (small) list of inputs is kept
+        stdin_items = list(read_inputs("-")) if args.batch == "-" else None
+        
+        def inputs() -> Iterator[str]:
+            return iter(stdin_items) if stdin_items is not None else read_inputs(args.batch)
+        
+        tool = os.path.splitext(os.path.basename(self.parser.prog))[0]
+        name = args.job or BatchJob.default_name(tool, inputs(), kwargs)
+        job = BatchJob(name, os.path.join(PROJECT_ROOT, args.output) if args.output else None)
+        
+        previous = None if args.restart else job.load()
+        if previous and previous.get("status") == "done":
+            print(f"Batch job {name} is already complete: {previous['results']} (use --restart to run it again)",
+                  file=sys.stderr)
+            return
+        done = job.start(tool, args.batch, kwargs, restart=args.restart)
+        total = sum(1 for _ in inputs())
+        if done:
+            print(f"Resuming batch job {name}: {len(done)} of {total} {self.plural_name} already done", file=sys.stderr)
+        
+        batch = BatchProcessor(processor, workers=args.concurrency, per_host=args.per_host, host_of=self.host_of)
+        todo = ((index, item) for index, item in enumerate(inputs(), 1) if index not in done)
+        status = "interrupted"
+        try:
+            with open(job.results_path, "a", encoding="utf-8") as out:
+                for index, result in batch.iter_items(todo, **kwargs):
+                    out.write(self.formatter.format_item(index, result, "json"))
+                    out.flush()
+                    job.state["completed"] += 1
+                    job.state["errors"] += isinstance(result, dict) and "error" in result
+                    if time.time() - job.last_checkpoint >= CHECKPOINT_INTERVAL:
+                        print(f"{job.state['completed']}/{total} {self.plural_name} done", file=sys.stderr)
+                    job.checkpoint()
+            status = "done"
+        except KeyboardInterrupt:
+            print(f"\nInterrupted: run the same command again to resume batch job {name}", file=sys.stderr)
+            sys.exit(130)
+        finally:
+            job.finish(status)
+        
+        print(f"Batch job {name}: {job.state['completed']} {self.plural_name} done, {job.state['errors']} errors", file=sys.stderr)
+        print(f"Results saved to {job.results_path}")
+    
+    def stream(self, items: List[str], args: argparse.Namespace,
+               duplicates: Optional[DuplicateFilter] = None,
+               processor: Optional[Callable[..., T]] = None,
+               run_spans: Optional[List[Tuple[str, float, float]]] = None, **kwargs) -> None:
+        """Format and write each result as soon as it is ready."""
+        results = self._multi_processor(args, processor).iter_items(items, **kwargs)
+        if args.ordered:
+            results = in_input_order(results)
+        # Streamed JSON is written as NDJSON lines
+        output_format = "ndjson" if args.format == "json" else args.format
+        
+        with output_stream(args.output) as out:
+            writer = ResultWriter(self.formatter, out, output_format)
+            for index, result in results:
+                primary = duplicates.check(result) if duplicates else None
+                if primary is not None:
+                    result = duplicates.duplicate_result(result, primary)
+                start = time.perf_counter()
+                writer.write(result, index)
+                out.flush()
+                if run_spans is not None:
+                    run_spans.append(("format", start, time.perf_counter() - start))
+            writer.close()
+        if args.output:
+            print(f"Results saved to {output_path(args.output)}")
+    
+    def write_results(self, results: Iterable[T], args: argparse.Namespace,
+                      run_spans: List[Tuple[str, float, float]]) -> None:
+        """Write the results of a run one at a time to the --output file or stdout."""
+        with output_stream(args.output) as out:
+            writer = ResultWriter(self.formatter, out, args.format)
+            for result in results:
+                start = time.perf_counter()
+                writer.write(result)
+                run_spans.append(("format", start, time.perf_counter() - start))
+            writer.close()
+            # As print() did; NDJSON lines already end in one
+            if not args.output and args.format != "ndjson":
+                out.write("\n")
+    
+    def run(self, argv: Optional[List[str]] = None) -> None:
+        """Run the tool with parsed arguments (from sys.argv unless argv is given)."""
+        args = self.parser.parse_args(argv)
+        
+        configure_cache(enabled=not args.no_cache, refresh=args.refresh)
         
         # Get the input value and any additional args
         input_args = {k: v for k, v in vars(args).items() 
-                     if k not in ['format', 'output']}
+                     if k not in RUNNER_ARGS}
         
         # Process single or multiple inputs using proper plural form
         single_input = input_args.get(self.input_name)
@@ -112,24 +357,55 @@ class ToolRunner(Generic[T]):
         kwargs = {k: v for k, v in input_args.items() 
                  if v is not None and k not in [self.input_name, self.plural_name]}
         
+        duplicates = self.duplicate_filter() if self.duplicate_filter and multi_inputs else None
+        if duplicates:
+            multi_inputs = duplicates.unique_inputs(multi_inputs)
+            kwargs.update(self.duplicate_kwargs)
+        
+        origin = time.perf_counter()
+        recorded: List[timing.ItemTimings] = []
+        run_spans: List[Tuple[str, float, float]] = []
+        instrumented = args.timings or args.trace
+        processor = self._instrumented(recorded, attach=args.timings) if instrumented else self.processor
+        tool = os.path.splitext(os.path.basename(self.parser.prog))[0]
+        processor = self._recorded(SessionRecorder(tool, sys.argv[1:] if argv is None else argv), processor)
+        processor = bind_cache_policy(processor)
+        
         try:
-            if single_input:
-                results = self.processor(single_input, **kwargs)
-            else:
-                results = self.parallel_processor.process_items(multi_inputs, **kwargs)
+            if getattr(args, "batch", None):
+                self.run_batch(args, processor, **kwargs)
+                if instrumented:
+                    self.report_timings(args, recorded, run_spans, origin)
+                return
             
-            # Format and output results
-            formatted_results = self.formatter(results, args.format)
+            if multi_inputs and (args.stream or args.ordered):
+                self.stream(multi_inputs, args, duplicates=duplicates,
+                            processor=processor, run_spans=run_spans, **kwargs)
+                if instrumented:
+                    self.report_timings(args, recorded, run_spans, origin)
+                return
             
-            if args.output:
-                from ..common import save_to_file
-                try:
-                    save_to_file(formatted_results, args.output)
-                except Exception as e:
-                    print(f"Error saving results: {str(e)}", file=sys.stderr)
-                    sys.exit(1)
+            if single_input:
+                result = processor(single_input, **kwargs)
+                start = time.perf_counter()
+                with output_stream(args.output) as out:
+                    out.write(self.formatter(result, args.format))
+                    if not args.output and args.format != "ndjson":
+                        out.write("\n")
+                run_spans.append(("format", start, time.perf_counter() - start))
             else:
-                print(formatted_results)
+                # Results are written in input order as they complete; only formatters
+                # that work across results (see BaseFormatter.prepare) hold them back
+                completed = in_input_order(self._multi_processor(args, processor).iter_items(
+                    multi_inputs, **kwargs, **self.prepare_kwargs))
+                results: Iterable[T] = (result for _, result in completed)
+                if duplicates:
+                    results = duplicates.collapse(results)
+                self.write_results(self.formatter.prepare(results), args, run_spans)
+            if args.output:
+                print(f"Results saved to {output_path(args.output)}")
+            if instrumented:
+                self.report_timings(args, recorded, run_spans, origin)
         except Exception as e:
             print(f"Error processing request: {str(e)}", file=sys.stderr)
             sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Resumable batch jobs: inputs from a file or stdin, processed through a bounded
+worker queue, with results appended to a JSONL file as they complete.
+
+Each job lives under output/jobs/: `<job>.jsonl` holds one result per line
+(with its 1-based input `index`) and `<job>.job.json` is the checkpoint with the
+job's source, options and progress. Completed items are read back from the
+results file, so an interrupted run resumes where it stopped.
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import hashlib
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Generic, Iterable, Iterator, Optional, Set, Tuple, TypeVar
+from ..common import OUTPUT_DIR
+
+JOBS_DIR = os.path.join(OUTPUT_DIR, "jobs")
+
+# Seconds between checkpoint rewrites while a job runs
+CHECKPOINT_INTERVAL = 2.0
+
+T = TypeVar('T')
+
+def read_inputs(source: str) -> Iterator[str]:
+    """Yield non-empty, non-comment lines from a file, or from stdin for "-"."""
+    stream = sys.stdin if source == "-" else open(source, encoding="utf-8")
+    try:
+        for line in stream:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+class BatchProcessor(Generic[T]):
+    """
+    Process a stream of items with a fixed number of worker threads.
+
+    Items are pulled from the input iterator only as fast as workers free up
+    (through a bounded queue), so neither inputs nor results pile up in memory.
+    """
+
+    def __init__(self,
+                 processor: Callable[..., T],
+                 workers: int,
+                 per_host: int,
+                 host_of: Callable[[str], Optional[str]]):
+        self.processor = processor
+        self.workers = max(workers, 1)
+        self.per_host = per_host
+        self.host_of = host_of
+
+    def iter_items(self, items: Iterator[Tuple[int, str]], **kwargs) -> Iterator[Tuple[int, T]]:
+        """Process (index, item) pairs, yielding (index, result) as each completes."""
+        pending: "queue.Queue[Optional[Tuple[int, str]]]" = queue.Queue(maxsize=self.workers * 2)
+        completed: "queue.Queue[Tuple[Optional[int], Any]]" = queue.Queue()
+        host_slots = defaultdict(lambda: threading.BoundedSemaphore(self.per_host))
+
+        def feed():
+            try:
+                for pair in items:
+                    pending.put(pair)
+            except BaseException as e:
+                completed.put((None, e))
+            finally:
+                for _ in range(self.workers):
+                    pending.put(None)
+
+        def work():
+            while True:
+                pair = pending.get()
+                if pair is None:
+                    completed.put((-1, None))
+                    return
+                index, item = pair
+                try:
+                    host = self.host_of(item)
+                    if host is None:
+                        result = self.processor(item, **kwargs)
+                    else:
+                        with host_slots[host]:
+                            result = self.processor(item, **kwargs)
+                    completed.put((index, result))
+                except BaseException as e:
+                    completed.put((None, e))
+
+        threads = [threading.Thread(target=feed, daemon=True)]
+        threads += [threading.Thread(target=work, daemon=True) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+
+        running = self.workers
+        while running:
+            index, result = completed.get()
+            if index is None:
+                raise result
+            if index == -1:
+                running -= 1
+                continue
+            yield index, result
+
+class BatchJob:
+    """Checkpoint and results files of one batch job."""
+
+    def __init__(self, name: str, results_path: Optional[str] = None, directory: str = JOBS_DIR):
+        self.name = name
+        self.job_path = os.path.join(directory, f"{name}.job.json")
+        self.results_path = results_path or os.path.join(directory, f"{name}.jsonl")
+        self.state: Dict[str, Any] = {}
+        self.last_checkpoint = 0.0
+
+    @staticmethod
+    def default_name(tool: str, items: Iterable[str], options: Dict[str, Any]) -> str:
+        """Name a job after its tool and a hash of its inputs and options."""
+        digest = hashlib.sha256(json.dumps(options, sort_keys=True, default=str).encode("utf-8"))
+        for item in items:
+            digest.update(item.encode("utf-8") + b"\n")
+        return f"{tool}-{digest.hexdigest()[:12]}"
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.job_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def completed(self) -> Tuple[Set[int], int]:
+        """
+        Read back the results on file, dropping a partly written last line.
+
+        Returns:
+            Tuple of (completed indexes, number of error results)
+        """
+        done: Set[int] = set()
+        errors = 0
+        try:
+            with open(self.results_path, "rb+") as f:
+                valid = 0
+                for line in f:
+                    try:
+                        result = json.loads(line)
+                        done.add(result["index"])
+                    except (ValueError, KeyError, TypeError):
+                        break
+                    errors += "error" in result
+                    valid += len(line)
+                f.truncate(valid)
+        except OSError:
+            pass
+        return done, errors
+
+    def start(self, tool: str, source: str, options: Dict[str, Any], restart: bool = False) -> Set[int]:
+        """
+        Open the job, discarding earlier progress if `restart` is set.
+
+        Returns:
+            Indexes of the items already completed
+        """
+        os.makedirs(os.path.dirname(self.job_path), exist_ok=True)
+        os.makedirs(os.path.dirname(os.path.abspath(self.results_path)), exist_ok=True)
+        previous = None if restart else self.load()
+        if previous is None and os.path.exists(self.results_path):
+            os.remove(self.results_path)
+        done, errors = self.completed() if previous else (set(), 0)
+        self.state = {
+            "tool": tool,
+            "source": os.path.abspath(source) if source != "-" else "-",
+            "options": options,
+            "results": os.path.abspath(self.results_path),
+            "started_at": previous["started_at"] if previous else time.time(),
+            "updated_at": time.time(),
+            "completed": len(done),
+            "errors": errors,
+            "status": "running",
+        }
+        self.checkpoint(force=True)
+        return done
+
+    def checkpoint(self, force: bool = False) -> None:
+        """Rewrite the job file atomically (at most every CHECKPOINT_INTERVAL seconds unless forced)."""
+        now = time.time()
+        if not force and now - self.last_checkpoint < CHECKPOINT_INTERVAL:
+            return
+        self.state["updated_at"] = now
+        tmp_path = f"{self.job_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.job_path)
+        self.last_checkpoint = now
+
+    def finish(self, status: str) -> None:
+        self.state["status"] = status
+        self.checkpoint(force=True)
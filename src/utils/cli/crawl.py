@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Site crawler with a politeness-aware frontier.
+
+Starting from seed URLs, pages are extracted and their in-scope links queued,
+breadth first, up to a depth and a page budget. The frontier de-duplicates URLs
+and hands them out per host: at most `per_host` requests at a time and at least
+`delay` seconds (or the site's robots.txt Crawl-delay) between request starts,
+rotating between hosts. Pages disallowed by robots.txt are not fetched.
+
+The frontier is checkpointed to output/crawls/<job>.json, so an interrupted
+crawl resumes with the pages it had not finished.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+import concurrent.futures
+from collections import OrderedDict, defaultdict, deque
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+import requests
+from dotenv import load_dotenv
+from ..common import OUTPUT_DIR, ErrorResult
+from ..dedup import canonicalize_url
+from ..http_client import http_session, http_timeout, HTTP_USER_AGENT
+from .engine import url_host
+
+load_dotenv()
+CRAWLS_DIR = os.path.join(OUTPUT_DIR, "crawls")
+CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "50"))
+CRAWL_MAX_DEPTH = int(os.getenv("CRAWL_MAX_DEPTH", "2"))
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "8"))
+CRAWL_PER_HOST = int(os.getenv("CRAWL_PER_HOST", "2"))
+# Minimum seconds between request starts on one host
+CRAWL_DELAY = float(os.getenv("CRAWL_DELAY", "1.0"))
+
+# Seconds between frontier checkpoints while a crawl runs
+CHECKPOINT_INTERVAL = 2.0
+
+# Links to files that never have text worth extracting are not queued
+SKIPPED_EXTENSIONS = (
+    ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".ico", ".bmp",
+    ".css", ".js", ".mjs", ".map", ".woff", ".woff2", ".ttf", ".eot",
+    ".zip", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".rar", ".tar", ".dmg", ".exe", ".whl",
+    ".mp3", ".mp4", ".webm", ".avi", ".mov", ".wav", ".ogg",
+)
+
+class CrawlScope:
+    """
+    Which links a crawl follows: pages on a seed's host, and for the "prefix"
+    scope only those under the seed's directory.
+    """
+
+    def __init__(self, seeds: List[str], mode: str = "prefix"):
+        self.mode = mode
+        self.prefixes: Set[Tuple[str, str]] = set()
+        for seed in seeds:
+            parts = urlsplit(canonicalize_url(seed))
+            path = parts.path if mode == "prefix" else "/"
+            self.prefixes.add((parts.netloc, path[:path.rfind("/") + 1] or "/"))
+
+    def __contains__(self, url: str) -> bool:
+        parts = urlsplit(canonicalize_url(url))
+        if parts.scheme not in ("http", "https") or parts.path.lower().endswith(SKIPPED_EXTENSIONS):
+            return False
+        return any(parts.netloc == host and parts.path.startswith(prefix) for host, prefix in self.prefixes)
+
+class RobotsCache:
+    """robots.txt rules per host, fetched once per crawl."""
+
+    def __init__(self, user_agent: str = HTTP_USER_AGENT):
+        self.user_agent = user_agent
+        self.rules: Dict[str, RobotFileParser] = {}
+        self.locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+
+    def _rules(self, url: str) -> RobotFileParser:
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        with self.locks[origin]:
+            if origin not in self.rules:
+                rules = RobotFileParser(f"{origin}/robots.txt")
+                try:
+                    response = http_session().get(rules.url, timeout=http_timeout())
+                    if response.status_code >= 500:
+                        # An unreachable robots.txt means nothing may be crawled (RFC 9309)
+                        rules.disallow_all = True
+                    elif response.status_code >= 400:
+                        rules.allow_all = True
+                    else:
+                        rules.parse(response.text.splitlines())
+                except requests.exceptions.RequestException:
+                    rules.disallow_all = True
+                self.rules[origin] = rules
+            return self.rules[origin]
+
+    def allowed(self, url: str) -> bool:
+        return self._rules(url).can_fetch(self.user_agent, url)
+
+    def crawl_delay(self, url: str) -> float:
+        """The site's Crawl-delay, 0 if it has none (or its robots.txt was not read yet)."""
+        origin = "{0.scheme}://{0.netloc}".format(urlsplit(url))
+        rules = self.rules.get(origin)
+        delay = rules.crawl_delay(self.user_agent) if rules else None
+        return float(delay or 0)
+
+class Frontier:
+    """De-duplicated queue of (url, depth) entries, handed out per host."""
+
+    def __init__(self, max_pages: int):
+        self.max_pages = max_pages
+        self.seen: Set[str] = set()
+        self.queues: "OrderedDict[str, Deque[Tuple[str, int]]]" = OrderedDict()
+        self.in_flight: Dict[str, int] = {}
+        self.done = 0
+
+    def add(self, url: str, depth: int) -> bool:
+        """Queue a URL unless it was seen before or the page budget is spent."""
+        key = canonicalize_url(url)
+        if key in self.seen or len(self.seen) >= self.max_pages:
+            return False
+        self.seen.add(key)
+        self.queues.setdefault(url_host(url) or "", deque()).append((url, depth))
+        return True
+
+    def pop(self, ready: Callable[[str], bool]) -> Optional[Tuple[str, int]]:
+        """Take the next entry of the first ready host, moving that host to the back of the rotation."""
+        for host, entries in self.queues.items():
+            if ready(host):
+                url, depth = entries.popleft()
+                if entries:
+                    self.queues.move_to_end(host)
+                else:
+                    del self.queues[host]
+                self.in_flight[url] = depth
+                return url, depth
+        return None
+
+    def finish(self, url: str) -> None:
+        self.in_flight.pop(url, None)
+        self.done += 1
+
+    @property
+    def hosts(self) -> List[str]:
+        return list(self.queues)
+
+    def __bool__(self) -> bool:
+        return bool(self.queues or self.in_flight)
+
+    def state(self) -> Dict[str, Any]:
+        """Serializable state; pages in flight are saved as pending."""
+        pending = [[url, depth] for url, depth in self.in_flight.items()]
+        pending += [[url, depth] for entries in self.queues.values() for url, depth in entries]
+        return {"seen": sorted(self.seen), "pending": pending, "done": self.done}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], max_pages: int) -> "Frontier":
+        frontier = cls(max_pages)
+        frontier.seen = set(state.get("seen", []))
+        frontier.done = state.get("done", 0)
+        for url, depth in state.get("pending", []):
+            frontier.queues.setdefault(url_host(url) or "", deque()).append((url, depth))
+        return frontier
+
+class CrawlJob:
+    """Checkpoint file of one crawl."""
+
+    def __init__(self, name: str, directory: str = CRAWLS_DIR):
+        self.name = name
+        self.path = os.path.join(directory, f"{name}.json")
+        self.state: Dict[str, Any] = {}
+        self.last_checkpoint = 0.0
+
+    @staticmethod
+    def default_name(seeds: List[str], options: Dict[str, Any]) -> str:
+        """Name a crawl after a hash of its seeds and options."""
+        data = json.dumps([seeds, options], sort_keys=True, default=str)
+        return f"crawl-{hashlib.sha256(data.encode('utf-8')).hexdigest()[:12]}"
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def checkpoint(self, frontier: Frontier, status: str = "running", force: bool = False) -> None:
+        """Rewrite the checkpoint atomically (at most every CHECKPOINT_INTERVAL seconds unless forced)."""
+        now = time.time()
+        if not force and now - self.last_checkpoint < CHECKPOINT_INTERVAL:
+            return
+        self.state.update(frontier.state(), status=status, updated_at=now)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.path)
+        self.last_checkpoint = now
+
+class Crawler:
+    """
+    Crawl from a frontier with a pool of fetch workers.
+
+    `extract` is called as extract(url, links=True, **kwargs) and must return a
+    result dict with the page's absolute `links` (removed from the yielded result).
+    """
+
+    def __init__(self,
+                 extract: Callable[..., Any],
+                 frontier: Frontier,
+                 scope: CrawlScope,
+                 max_depth: int = CRAWL_MAX_DEPTH,
+                 concurrency: int = CRAWL_CONCURRENCY,
+                 per_host: int = CRAWL_PER_HOST,
+                 delay: float = CRAWL_DELAY,
+                 robots: Optional[RobotsCache] = None):
+        self.extract = extract
+        self.frontier = frontier
+        self.scope = scope
+        self.max_depth = max_depth
+        self.concurrency = max(concurrency, 1)
+        self.per_host = max(per_host, 1)
+        self.delay = delay
+        self.robots = robots or RobotsCache()
+        self.active: Dict[str, int] = defaultdict(int)
+        self.next_start: Dict[str, float] = defaultdict(float)
+
+    def _fetch(self, url: str, kwargs: Dict[str, Any]) -> Any:
+        if not self.robots.allowed(url):
+            return ErrorResult(query=url, error="Disallowed by robots.txt")
+        return self.extract(url, links=True, **kwargs)
+
+    def _ready(self, host: str, now: float) -> bool:
+        return self.active[host] < self.per_host and self.next_start[host] <= now
+
+    def _next_ready_time(self) -> Optional[float]:
+        """When the earliest host with queued pages and a free slot may start a request."""
+        times = [self.next_start[host] for host in self.frontier.hosts if self.active[host] < self.per_host]
+        return min(times) if times else None
+
+    def run(self, **kwargs) -> Iterator[Tuple[int, str, int, Any]]:
+        """
+        Crawl until the frontier is empty, yielding (page number, url, depth, result)
+        as each page completes.
+        """
+        pool = concurrent.futures.ThreadPoolExecutor(self.concurrency)
+        running: Dict[concurrent.futures.Future, Tuple[str, int, str]] = {}
+        try:
+            while self.frontier:
+                now = time.monotonic()
+                while len(running) < self.concurrency:
+                    entry = self.frontier.pop(lambda host: self._ready(host, now))
+                    if entry is None:
+                        break
+                    url, depth = entry
+                    host = url_host(url) or ""
+                    self.active[host] += 1
+                    self.next_start[host] = now + max(self.delay, self.robots.crawl_delay(url))
+                    running[pool.submit(self._fetch, url, kwargs)] = (url, depth, host)
+
+                # Wake up for the first finished page or the next host coming off its delay
+                ready_at = self._next_ready_time() if len(running) < self.concurrency else None
+                timeout = max(ready_at - time.monotonic(), 0.005) if ready_at is not None else None
+                if not running:
+                    time.sleep(timeout or 0.005)
+                    continue
+                done, _ = concurrent.futures.wait(running, timeout=timeout,
+                                                  return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    url, depth, host = running.pop(future)
+                    self.active[host] -= 1
+                    result = future.result()
+                    links = result.pop("links", []) if isinstance(result, dict) else []
+                    if depth < self.max_depth:
+                        for link in links:
+                            if link in self.scope:
+                                self.frontier.add(link, depth + 1)
+                    self.frontier.finish(url)
+                    yield self.frontier.done, url, depth, result
+        finally:
+            pool.shutdown(wait=False)
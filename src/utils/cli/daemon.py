@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Long-lived tool daemon and its thin client.
+
+The daemon keeps tool runners (and everything they import) warm behind a Unix
+socket. Tool entry points call `run_via_daemon` before their heavy imports and
+fall back to running in-process when no daemon is listening.
+
+Only standard library modules may be imported here, so the client stays cheap.
+"""
+
+import io
+import os
+import sys
+import json
+import socket
+import hashlib
+import tempfile
+import threading
+import socketserver
+from typing import Any, Callable, Dict, List, Optional
+from ..common import PROJECT_ROOT
+
+DAEMON_SOCKET = os.getenv("VAT_DAEMON_SOCKET") or os.path.join(
+    tempfile.gettempdir(),
+    f"vat-{os.getuid()}-{hashlib.sha1(PROJECT_ROOT.encode('utf-8')).hexdigest()[:8]}.sock"
+)
+
+def _send(sock: socket.socket, message: Dict[str, Any]) -> None:
+    sock.sendall((json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8"))
+
+def _connect() -> Optional[socket.socket]:
+    """Connect to the daemon socket, or return None if no daemon is listening."""
+    if not os.path.exists(DAEMON_SOCKET):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(DAEMON_SOCKET)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+def _client_request(tool: str, argv: List[str]) -> Dict[str, Any]:
+    """
+    Build the request for a tool invocation, resolving what depends on the client:
+    a relative --batch FILE is made absolute (the daemon has its own working
+    directory) and `--batch -` sends the client's stdin along.
+    """
+    argv = list(argv)
+    request: Dict[str, Any] = {"tool": tool, "argv": argv}
+    for i, arg in enumerate(argv):
+        if arg == "--batch" and i + 1 < len(argv):
+            position, source = i + 1, argv[i + 1]
+        elif arg.startswith("--batch="):
+            position, source = i, arg[len("--batch="):]
+        else:
+            continue
+        if source == "-":
+            request["stdin"] = sys.stdin.read()
+        else:
+            source = os.path.abspath(source)
+        argv[position] = source if position == i + 1 else f"--batch={source}"
+    return request
+
+def run_via_daemon(tool: str, argv: Optional[List[str]] = None) -> None:
+    """
+    Forward a tool invocation to the daemon and exit with its status.
+
+    Returns without doing anything if no daemon is running (or VAT_NO_DAEMON
+    is set), so the caller can carry on in-process.
+
+    Args:
+        tool: Name the tool is registered under in the daemon
+        argv: Command-line arguments (defaults to sys.argv[1:])
+    """
+    if os.getenv("VAT_NO_DAEMON"):
+        return
+    sock = _connect()
+    if sock is None:
+        return
+
+    streams = {"stdout": sys.stdout, "stderr": sys.stderr}
+    exit_code = 1
+    with sock, sock.makefile("r", encoding="utf-8") as reader:
+        _send(sock, _client_request(tool, sys.argv[1:] if argv is None else argv))
+        for line in reader:
+            message = json.loads(line)
+            if "exit" in message:
+                exit_code = message["exit"]
+                break
+            stream = streams[message["stream"]]
+            stream.write(message["data"])
+            stream.flush()
+    sys.exit(exit_code)
+
+def stop_daemon() -> bool:
+    """Ask a running daemon to shut down. Returns False if none was running."""
+    sock = _connect()
+    if sock is None:
+        return False
+    with sock:
+        _send(sock, {"command": "stop"})
+        sock.recv(1)
+    return True
+
+def daemon_running() -> bool:
+    """Check whether a daemon is listening on the socket."""
+    sock = _connect()
+    if sock is None:
+        return False
+    sock.close()
+    return True
+
+class _SocketStream:
+    """File-like object that forwards writes to the client as framed messages."""
+
+    def __init__(self, sock: socket.socket, name: str, lock: threading.Lock):
+        self.sock = sock
+        self.name = name
+        self.lock = lock
+
+    def write(self, data: str) -> int:
+        if data:
+            with self.lock:
+                _send(self.sock, {"stream": self.name, "data": data})
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def isatty(self) -> bool:
+        return False
+
+class _ThreadLocalStream:
+    """Stand-in for sys.stdout/sys.stderr that routes writes per request thread."""
+
+    def __init__(self, default):
+        self._default = default
+        self._local = threading.local()
+
+    def redirect(self, stream) -> None:
+        self._local.stream = stream
+
+    def _target(self):
+        return getattr(self._local, "stream", None) or self._default
+
+    def write(self, data: str) -> int:
+        return self._target().write(data)
+
+    def flush(self) -> None:
+        self._target().flush()
+
+    def __iter__(self):
+        return iter(self._target())
+
+    def __getattr__(self, name: str):
+        return getattr(self._target(), name)
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def serve(runner_factories: Dict[str, Callable[[], Any]]) -> None:
+    """
+    Serve tool invocations on the daemon socket until stopped.
+
+    Args:
+        runner_factories: Tool name -> function returning a ToolRunner
+    """
+    if daemon_running():
+        print(f"Daemon already running on {DAEMON_SOCKET}", file=sys.stderr)
+        sys.exit(1)
+    if os.path.exists(DAEMON_SOCKET):
+        os.unlink(DAEMON_SOCKET)
+
+    # Build every runner up front so parsers, engines and caches stay warm
+    runners = {name: factory() for name, factory in runner_factories.items()}
+    for name, runner in runners.items():
+        runner.parser.prog = f"{name}.py"
+    stdout, stderr = _ThreadLocalStream(sys.stdout), _ThreadLocalStream(sys.stderr)
+    stdin = _ThreadLocalStream(io.StringIO())
+    sys.stdout, sys.stderr, sys.stdin = stdout, stderr, stdin
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            request = json.loads(self.rfile.readline())
+            if request.get("command") == "stop":
+                self.request.sendall(b".")
+                threading.Thread(target=server.shutdown).start()
+                return
+
+            lock = threading.Lock()
+            stdout.redirect(_SocketStream(self.request, "stdout", lock))
+            stderr.redirect(_SocketStream(self.request, "stderr", lock))
+            # The client's stdin, if it sent it; otherwise reads see an empty stream
+            stdin.redirect(io.StringIO(request.get("stdin", "")))
+            exit_code = 0
+            try:
+                runner = runners.get(request.get("tool"))
+                if runner is None:
+                    print(f"Unknown tool: {request.get('tool')}", file=sys.stderr)
+                    exit_code = 1
+                else:
+                    runner.run(request.get("argv", []))
+            except SystemExit as e:
+                exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            except Exception as e:
+                print(f"Error processing request: {str(e)}", file=sys.stderr)
+                exit_code = 1
+            finally:
+                stdout.redirect(None)
+                stderr.redirect(None)
+                stdin.redirect(None)
+            _send(self.request, {"exit": exit_code})
+
+    server = _Server(DAEMON_SOCKET, Handler)
+    os.chmod(DAEMON_SOCKET, 0o600)
+    print(f"Daemon listening on {DAEMON_SOCKET}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(DAEMON_SOCKET):
+            os.unlink(DAEMON_SOCKET)
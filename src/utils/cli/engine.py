@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Asyncio-based execution engine for large multi-input runs.
+"""
+
+import os
+import queue
+import asyncio
+import threading
+import functools
+import concurrent.futures
+from collections import defaultdict
+from typing import Callable, Generic, Iterator, List, Optional, Tuple, TypeVar
+from urllib.parse import urlparse
+from dotenv import load_dotenv
+
+load_dotenv()
+ASYNC_CONCURRENCY = int(os.getenv("ASYNC_CONCURRENCY", "64"))
+ASYNC_PER_HOST = int(os.getenv("ASYNC_PER_HOST", "8"))
+
+T = TypeVar('T')
+
+def url_host(item: str) -> Optional[str]:
+    """Return the host of a URL input, or None for inputs that are not URLs."""
+    return urlparse(item.strip()).netloc.lower() or None
+
+class AsyncProcessor(Generic[T]):
+    """
+    Process any number of items under a global and a per-host concurrency limit.
+
+    Items are scheduled on an asyncio event loop; each one runs the (blocking)
+    processor on a worker thread once it holds both its host slot and a global slot.
+    """
+
+    def __init__(self,
+                 processor: Callable[..., T],
+                 concurrency: int = ASYNC_CONCURRENCY,
+                 per_host: int = ASYNC_PER_HOST,
+                 host_of: Callable[[str], Optional[str]] = url_host):
+        self.processor = processor
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.host_of = host_of
+
+    def process_items(self, items: List[str], **kwargs) -> List[T]:
+        """Process all items concurrently, returning results in input order."""
+        return asyncio.run(self._process_all(items, kwargs))
+
+    def iter_items(self, items: List[str], **kwargs) -> Iterator[Tuple[int, T]]:
+        """Process all items concurrently, yielding (1-based input index, result) as each completes."""
+        completed: "queue.Queue[Tuple[Optional[int], object]]" = queue.Queue()
+
+        def run_loop():
+            try:
+                asyncio.run(self._process_all(items, kwargs, on_result=lambda index, result: completed.put((index, result))))
+            except BaseException as e:
+                completed.put((None, e))
+
+        thread = threading.Thread(target=run_loop, daemon=True)
+        thread.start()
+        for _ in items:
+            index, result = completed.get()
+            if index is None:
+                raise result
+            yield index, result
+        thread.join()
+
+    async def _process_all(self, items: List[str], kwargs: dict,
+                           on_result: Optional[Callable[[int, T], None]] = None) -> List[T]:
+        loop = asyncio.get_running_loop()
+        global_slots = asyncio.Semaphore(self.concurrency)
+        host_slots = defaultdict(lambda: asyncio.Semaphore(self.per_host))
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            async def run(item: str) -> T:
+                return await loop.run_in_executor(executor, functools.partial(self.processor, item, **kwargs))
+
+            async def process(index: int, item: str) -> T:
+                host = self.host_of(item)
+                # Take the host slot first so items queued behind a busy host don't hold global slots
+                if host is not None:
+                    async with host_slots[host], global_slots:
+                        result = await run(item)
+                else:
+                    async with global_slots:
+                        result = await run(item)
+                if on_result:
+                    on_result(index, result)
+                return result
+
+            return await asyncio.gather(*(process(index, item) for index, item in enumerate(items, 1)))
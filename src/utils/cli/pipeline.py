@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Streaming search -> fetch -> extract pipeline.
+"""
+
+import queue
+import threading
+import concurrent.futures
+from collections import defaultdict
+from typing import Any, Callable, Dict, Generic, Iterator, List, Optional, Tuple, TypeVar
+from ..dedup import canonicalize_url
+from .engine import url_host
+
+S = TypeVar('S')
+E = TypeVar('E')
+
+class SearchExtractPipeline(Generic[S, E]):
+    """
+    Run searches and extract every hit as soon as its search result arrives.
+
+    Hit URLs are de-duplicated across queries. Searches and extractions run on
+    separate worker pools with their own concurrency limits, plus a per-host
+    limit for extractions.
+    """
+
+    def __init__(self,
+                 search: Callable[..., S],
+                 extract: Callable[..., E],
+                 hits: Callable[[S], List[str]],
+                 search_concurrency: int = 5,
+                 extract_concurrency: int = 16,
+                 per_host: int = 4,
+                 max_pages: Optional[int] = None):
+        self.search = search
+        self.extract = extract
+        self.hits = hits
+        self.search_concurrency = search_concurrency
+        self.extract_concurrency = extract_concurrency
+        self.per_host = per_host
+        self.max_pages = max_pages
+
+    def run(self,
+            queries: List[str],
+            search_kwargs: Dict[str, Any],
+            extract_kwargs: Dict[str, Any]) -> Iterator[Tuple[str, str, Any]]:
+        """
+        Yield ("search", query, search_result) and ("page", query, extract_result)
+        events in completion order.
+        """
+        events: "queue.Queue[Tuple[str, str, Any]]" = queue.Queue()
+        host_slots = defaultdict(lambda: threading.BoundedSemaphore(self.per_host))
+        seen = set()
+
+        def extract_page(url: str) -> E:
+            with host_slots[url_host(url)]:
+                return self.extract(url, **extract_kwargs)
+
+        def report(kind: str, query: str):
+            def done(future: concurrent.futures.Future):
+                try:
+                    events.put((kind, query, future.result()))
+                except BaseException as e:
+                    events.put(("error", query, e))
+            return done
+
+        with concurrent.futures.ThreadPoolExecutor(self.search_concurrency) as search_pool, \
+             concurrent.futures.ThreadPoolExecutor(self.extract_concurrency) as extract_pool:
+            for query in queries:
+                search_pool.submit(self.search, query, **search_kwargs).add_done_callback(report("search", query))
+
+            pending = len(queries)
+            while pending:
+                kind, query, result = events.get()
+                pending -= 1
+                if kind == "error":
+                    raise result
+                if kind == "search":
+                    for url in self.hits(result):
+                        key = canonicalize_url(url)
+                        if key in seen or (self.max_pages is not None and len(seen) >= self.max_pages):
+                            continue
+                        seen.add(key)
+                        pending += 1
+                        extract_pool.submit(extract_page, url).add_done_callback(report("page", query))
+                yield kind, query, result
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Per-item instrumentation for tool runs.
+
+ToolRunner wraps each processed item in `record()`, which makes an ItemTimings
+current for the worker thread. Code on the hot path reports into it with
+`stage()`, `add_time()`, `count()` and `note()`; these are no-ops when nothing is
+being recorded, so they can stay in place permanently. Stage times are
+exclusive: time spent in a nested stage is not counted again in the outer one.
+"""
+
+import json
+import time
+import threading
+import contextlib
+import contextvars
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple, TypedDict
+
+class TimingSummary(TypedDict):
+    """Type for the timings attached to a result"""
+    total_ms: float
+    stages: Dict[str, float]  # Milliseconds per stage
+    counters: Dict[str, int]  # e.g. bytes, retries, coalesced
+    notes: Dict[str, str]  # e.g. cache: hit | revalidated | miss
+
+class ItemTimings:
+    """Stage timings, counters and notes recorded while processing one item."""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.thread_id = threading.get_ident()
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.stages: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.notes: Dict[str, str] = {}
+        # (stage, start, duration) spans for trace files
+        self.spans: List[Tuple[str, float, float]] = []
+        # Names of the stages currently open, innermost last
+        self.open: List[str] = []
+
+    def add(self, name: str, start: float, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+        self.spans.append((name, start, seconds))
+        if self.open:
+            self.stages[self.open[-1]] = self.stages.get(self.open[-1], 0.0) - seconds
+
+    @property
+    def total(self) -> float:
+        return (self.end or time.perf_counter()) - self.start
+
+    def summary(self) -> TimingSummary:
+        return TimingSummary(
+            total_ms=round(self.total * 1000, 2),
+            stages={name: round(seconds * 1000, 2) for name, seconds in self.stages.items()},
+            counters=dict(self.counters),
+            notes=dict(self.notes)
+        )
+
+_current: "contextvars.ContextVar[Optional[ItemTimings]]" = contextvars.ContextVar("timings", default=None)
+
+@contextlib.contextmanager
+def record(label: str) -> Iterator[ItemTimings]:
+    """Record everything reported while processing one item."""
+    timings = ItemTimings(label)
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        timings.end = time.perf_counter()
+        _current.reset(token)
+
+@contextlib.contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a stage of the current item (stages with the same name add up)."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    timings.open.append(name)
+    try:
+        yield
+    finally:
+        timings.open.pop()
+        timings.add(name, start, time.perf_counter() - start)
+
+def add_time(name: str, start: float, seconds: float) -> None:
+    """Add an already measured span (perf_counter start, duration) to a stage."""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, start, seconds)
+
+def count(name: str, amount: int = 1) -> None:
+    """Increase a counter of the current item."""
+    timings = _current.get()
+    if timings is not None:
+        timings.counters[name] = timings.counters.get(name, 0) + amount
+
+def note(name: str, value: str) -> None:
+    """Set a note (e.g. the cache outcome) on the current item."""
+    timings = _current.get()
+    if timings is not None:
+        timings.notes[name] = value
+
+def format_table(items: List[ItemTimings], run_spans: List[Tuple[str, float, float]]) -> str:
+    """
+    Render per-item timings as a text table, slowest item first.
+
+    Args:
+        items: Timings of the processed items
+        run_spans: (stage, start, duration) spans of run-level stages (e.g. formatting)
+    """
+    stage_names = sorted({name for item in items for name in item.stages},
+                         key=lambda name: -sum(item.stages.get(name, 0) for item in items))
+    rows = []
+    for item in sorted(items, key=lambda item: -item.total):
+        rows.append([
+            item.label,
+            f"{item.total * 1000:.0f}",
+            *(f"{item.stages[name] * 1000:.0f}" if name in item.stages else "-" for name in stage_names),
+            str(item.counters.get("bytes", "-")),
+            item.notes.get("cache", "-"),
+            str(item.counters.get("retries", "-"))
+        ])
+    rows.append([
+        "TOTAL",
+        f"{sum(item.total for item in items) * 1000:.0f}",
+        *(f"{sum(item.stages.get(name, 0) for item in items) * 1000:.0f}" for name in stage_names),
+        str(sum(item.counters.get("bytes", 0) for item in items)),
+        f"{sum(1 for item in items if item.notes.get('cache') == 'hit')} hits",
+        str(sum(item.counters.get("retries", 0) for item in items))
+    ])
+
+    header = ["item", "total ms", *(f"{name} ms" for name in stage_names), "bytes", "cache", "retries"]
+    widths = [max(len(row[i]) for row in [header, *rows]) for i in range(len(header))]
+    widths[0] = min(widths[0], 60)
+
+    def line(row: List[str]) -> str:
+        label = row[0] if len(row[0]) <= widths[0] else row[0][:widths[0] - 3] + "..."
+        return "  ".join([label.ljust(widths[0]), *(cell.rjust(width) for cell, width in zip(row[1:], widths[1:]))])
+
+    lines = [line(header), "  ".join("-" * width for width in widths), *(line(row) for row in rows)]
+    run_stages: Dict[str, float] = {}
+    for name, _, seconds in run_spans:
+        run_stages[name] = run_stages.get(name, 0.0) + seconds
+    for name, seconds in run_stages.items():
+        lines.append(f"{name}: {seconds * 1000:.0f} ms")
+    return "\n".join(lines)
+
+def write_trace(out: TextIO, items: List[ItemTimings], run_spans: List[Tuple[str, float, float]],
+                origin: float, jsonl: bool = False) -> None:
+    """
+    Write timings as a Chrome trace (chrome://tracing, Perfetto) or as JSON lines.
+
+    Args:
+        out: Open text file
+        items: Timings of the processed items
+        run_spans: (stage, start, duration) spans of run-level stages
+        origin: perf_counter value of the run start, the trace's zero
+        jsonl: Write one summary object per item instead of a Chrome trace
+    """
+    if jsonl:
+        wall_clock = time.time() - time.perf_counter()
+        for item in items:
+            out.write(json.dumps({"item": item.label, "started_at": round(wall_clock + item.start, 3),
+                                  **item.summary()}) + "\n")
+        return
+
+    def micros(seconds: float) -> float:
+        return round(seconds * 1_000_000, 1)
+
+    events: List[Dict[str, Any]] = []
+    for item in items:
+        events.append({"name": item.label, "cat": "item", "ph": "X", "pid": 1, "tid": item.thread_id,
+                       "ts": micros(item.start - origin), "dur": micros(item.total),
+                       "args": {**item.counters, **item.notes}})
+        for name, start, seconds in item.spans:
+            events.append({"name": name, "cat": "stage", "ph": "X", "pid": 1, "tid": item.thread_id,
+                           "ts": micros(start - origin), "dur": micros(seconds)})
+    for name, start, seconds in run_spans:
+        events.append({"name": name, "cat": "run", "ph": "X", "pid": 1, "tid": 0,
+                       "ts": micros(start - origin), "dur": micros(seconds)})
+    json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, out)
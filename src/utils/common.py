@@ -3,9 +3,18 @@
 Common utilities and base types for web tools.
 """
 
+import io
 import os
+import sys
+import gzip
 import json
-from typing import Any, TypedDict, Literal, Union, List, TypeVar, Generic, Callable
+import threading
+import contextlib
+from typing import Any, TypedDict, Literal, Union, List, TypeVar, Generic, Callable, Iterable, Iterator, Optional, TextIO
+
+# Project root directory (3 levels up from this file)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+OUTPUT_DIR = os.getenv("VAT_OUTPUT_DIR", os.path.join(PROJECT_ROOT, "output"))
 
 # Base types
 class BaseResult(TypedDict):
@@ -17,9 +26,12 @@ class ErrorResult(BaseResult):
     error: str
 
 # Format types
-# FormatType = Literal["text", "json"]
+# FormatType = Literal["text", "json", "ndjson", "compact"]
 FormatType = str
 
+# Output formats: text blocks, pretty JSON, one compact JSON result per line, or compact JSON
+OUTPUT_FORMATS = ["text", "json", "ndjson", "compact"]
+
 # Generic type for results
 T = TypeVar('T', bound=Union[BaseResult, ErrorResult])
 
@@ -38,21 +50,82 @@ class BaseFormatter(Generic[T]):
         """Format results in the specified format."""
         if isinstance(data, list):
             return self.format_multiple_results(data, output_format)
+        if output_format == "ndjson":
+            # The same line as in a run of several inputs
+            return self.format_item(1, data, output_format)
+        if output_format == "compact":
+            return format_as_compact_json(data)
         return self.single_format_func(data, output_format)
     
+    __call__ = format_result
+    
+    def format_header(self, output_format: FormatType) -> str:
+        """Format the header that precedes a sequence of results."""
+        if output_format != "text":
+            return ""
+        return f"{self.multi_label}\n\n"
+    
+    def format_item(self, index: int, data: T, output_format: FormatType) -> str:
+        """Format one result of a sequence, labelled with its 1-based input index."""
+        if output_format in ("json", "ndjson"):
+            return json.dumps({"index": index, **data}, ensure_ascii=False) + "\n"
+        
+        formatted_text = f"===== {self.single_label} {index}: {data.get('query', 'Unknown')} =====\n"
+        formatted_text += self.single_format_func(data, "text")  # Always use text format for nested results
+        return formatted_text + "\n"
+    
+    def prepare(self, results: Iterable[T]) -> Iterable[T]:
+        """Adjust the results of a run before they are written (e.g. across results); as is by default."""
+        return results
+    
+    def recordable(self, data: T) -> T:
+        """A result as the session log keeps it, without fields only `prepare` needs; as is by default."""
+        return data
+    
     def format_multiple_results(self, all_data: List[T], output_format: FormatType) -> str:
         """Format multiple results in the specified format."""
-        if output_format == "json":
-            return format_as_json(all_data)
-        
-        formatted_text = f"{self.multi_label}\n\n"
-        
-        for idx, data in enumerate(all_data, 1):
-            formatted_text += f"===== {self.single_label} {idx}: {data.get('query', 'Unknown')} =====\n"
-            formatted_text += self.single_format_func(data, "text")  # Always use text format for nested results
-            formatted_text += "\n"
-        
-        return formatted_text
+        out = io.StringIO()
+        writer = ResultWriter(self, out, output_format)
+        for data in self.prepare(all_data):
+            writer.write(data)
+        writer.close()
+        return out.getvalue()
+
+class ResultWriter(Generic[T]):
+    """
+    Write a sequence of results to a stream one result at a time, so that only
+    the result being written is formatted in memory.
+    
+    Formats: text blocks, a pretty JSON array (the same as format_as_json of the
+    whole list), NDJSON lines with the 1-based `index` of each result, or a
+    compact JSON array.
+    """
+    
+    def __init__(self, formatter: BaseFormatter[T], out: TextIO, output_format: FormatType):
+        self.formatter = formatter
+        self.out = out
+        self.output_format = output_format
+        self.count = 0
+        out.write(formatter.format_header(output_format))
+    
+    def write(self, data: T, index: Optional[int] = None) -> None:
+        """Write one result (labelled with `index` in text and NDJSON, by default its position)."""
+        self.count += 1
+        index = index or self.count
+        if self.output_format == "json":
+            item = json.dumps(data, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+            self.out.write(("[\n  " if self.count == 1 else ",\n  ") + item)
+        elif self.output_format == "compact":
+            self.out.write(("[" if self.count == 1 else ",") + format_as_compact_json(data))
+        else:
+            self.out.write(self.formatter.format_item(index, data, self.output_format))
+    
+    def close(self) -> None:
+        """Finish the output (closing the JSON array); the stream itself stays open."""
+        if self.output_format == "json":
+            self.out.write("\n]" if self.count else "[]")
+        elif self.output_format == "compact":
+            self.out.write("]" if self.count else "[]")
 
 def save_to_file(content: str, filename: str) -> None:
     """
@@ -62,17 +135,85 @@ def save_to_file(content: str, filename: str) -> None:
         content: The content to save
         filename: Name of the output file
     """
-    # Get the project root directory (3 levels up from this file)
-    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    filepath = os.path.join(project_root, filename)
+    with atomic_output_file(filename) as f:
+        f.write(content)
     
-    # Create directories if they don't exist
+    print(f"Results saved to {output_path(filename)}")
+
+def output_path(filename: str) -> str:
+    """Path of a file in the output directory."""
+    return os.path.join(PROJECT_ROOT, filename)
+
+@contextlib.contextmanager
+def atomic_output_file(filename: str) -> Iterator[TextIO]:
+    """
+    Open a file in the output directory for writing through a temporary file that
+    replaces it only once writing has finished, so an interrupted run never leaves
+    a half-written file. Names ending in .gz are written gzip-compressed.
+    
+    Args:
+        filename: Name of the output file
+    
+    Yields:
+        Text file handle of the temporary file
+    """
+    filepath = output_path(filename)
     os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    tmp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+    if filepath.endswith(".gz"):
+        f = gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6)
+    else:
+        f = open(tmp_path, "w", encoding="utf-8")
+    try:
+        yield f
+        f.close()
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        f.close()
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+
+def open_output_file(filename: str, mode: str = "w") -> TextIO:
+    """
+    Open a file in the output directory for writing, creating directories as needed.
     
-    with open(filepath, "w", encoding="utf-8") as f:
-        f.write(content)
+    Args:
+        filename: Name of the output file
+        mode: File mode, "w" to overwrite or "a" to append (names ending in .gz are gzip-compressed)
     
-    print(f"Results saved to {filepath}")
+    Returns:
+        Text file handle
+    """
+    filepath = os.path.join(PROJECT_ROOT, filename)
+    
+    # Create directories if they don't exist
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    
+    if filepath.endswith(".gz"):
+        # Appending adds a gzip member, which readers decompress as one stream
+        return gzip.open(filepath, mode + "t", encoding="utf-8", compresslevel=6)
+    return open(filepath, mode, encoding="utf-8")
+
+@contextlib.contextmanager
+def output_stream(filename: Optional[str], mode: Optional[str] = None) -> Iterator[TextIO]:
+    """
+    Write to `filename` in the output directory atomically (see atomic_output_file),
+    or to stdout without one. With a mode ("w" or "a") the file is written in place
+    instead, so everything written survives a failed run (e.g. a resumable crawl).
+    """
+    if filename and mode:
+        with open_output_file(filename, mode) as f:
+            yield f
+    elif filename:
+        with atomic_output_file(filename) as f:
+            yield f
+    else:
+        yield sys.stdout
+
+def format_as_compact_json(data: Any) -> str:
+    """Format data as JSON without whitespace."""
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
 
 def format_as_json(data: Any) -> str:
     """
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Focus-driven condensation of extracted content.
+
+Content is split into passages, which are ranked against a focus query with
+BM25 and kept best first until a character budget is spent. The same budget can
+be shared by all pages of a batch, so the most relevant passages win wherever
+they come from.
+"""
+
+import os
+import re
+import math
+from collections import Counter
+from typing import Dict, List, Sequence, TypedDict
+from dotenv import load_dotenv
+from .index import split_passages, PASSAGE_SIZE
+
+load_dotenv()
+# Default budget for --focus, in tokens
+CONDENSE_BUDGET = int(os.getenv("CONDENSE_BUDGET", "2000"))
+
+# Rough size of a token in English text, used to turn token budgets into characters
+CHARS_PER_TOKEN = 4
+
+# BM25 term frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+SENTENCE_END_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+class Passage(TypedDict):
+    """Type for a passage kept by condensation"""
+    offset: int  # Character offset of the passage in the page content
+    text: str
+    score: float
+
+def budget_chars(budget: int, unit: str = "tokens") -> int:
+    """Convert a budget in tokens or characters to characters."""
+    return budget * CHARS_PER_TOKEN if unit == "tokens" else budget
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+def passages_of(content: str, offset: int = 0, size: int = PASSAGE_SIZE) -> List[Passage]:
+    """
+    Split content into passages of about `size` characters.
+
+    Lines longer than twice the size (e.g. text without line breaks) are split
+    further at sentence ends, so that no passage is too large for a small budget.
+
+    Args:
+        content: Cleaned page content
+        offset: Character offset of `content` in the page
+        size: Target passage size in characters
+    """
+    passages: List[Passage] = []
+    for start, text in split_passages(content, size):
+        if len(text) <= size * 2:
+            passages.append(Passage(offset=offset + start, text=text, score=0.0))
+            continue
+        # Cut at the last sentence end before each piece outgrows `size`
+        piece_start = 0
+        cut = 0
+        ends = [match.end() for match in SENTENCE_END_PATTERN.finditer(text)] + [len(text)]
+        for end in ends:
+            if end - piece_start > size and cut > piece_start:
+                passages.append(Passage(offset=offset + start + piece_start,
+                                        text=text[piece_start:cut].rstrip(), score=0.0))
+                piece_start = cut
+            cut = end
+        passages.append(Passage(offset=offset + start + piece_start, text=text[piece_start:], score=0.0))
+    return passages
+
+def cut_to_fit(text: str, size: int) -> str:
+    """The longest start of a passage within `size` characters that ends a sentence ("" if none does)."""
+    if len(text) <= size:
+        return text
+    ends = [match.start() for match in SENTENCE_END_PATTERN.finditer(text[:size + 1])]
+    return text[:ends[-1]] if ends else ""
+
+class BM25:
+    """Okapi BM25 over a fixed set of passages."""
+
+    def __init__(self, documents: Sequence[str]):
+        self.frequencies = [Counter(tokenize(document)) for document in documents]
+        self.lengths = [sum(frequencies.values()) for frequencies in self.frequencies]
+        self.average_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        document_counts: Counter = Counter()
+        for frequencies in self.frequencies:
+            document_counts.update(frequencies.keys())
+        count = len(documents)
+        self.idf: Dict[str, float] = {
+            term: math.log(1 + (count - df + 0.5) / (df + 0.5))
+            for term, df in document_counts.items()
+        }
+
+    def scores(self, query: str) -> List[float]:
+        """Score every passage against a query."""
+        terms = [term for term in dict.fromkeys(tokenize(query)) if term in self.idf]
+        results = []
+        for frequencies, length in zip(self.frequencies, self.lengths):
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / (self.average_length or 1))
+            score = 0.0
+            for term in terms:
+                tf = frequencies.get(term, 0)
+                if tf:
+                    score += self.idf[term] * tf * (BM25_K1 + 1) / (tf + norm)
+            results.append(score)
+        return results
+
+def condense(pages: Sequence[List[Passage]], focus: str, budget: int) -> List[List[Passage]]:
+    """
+    Pick the passages most relevant to a focus query across pages, within a budget.
+
+    Passages are ranked together, so a page with nothing relevant may keep no
+    passages at all. A passage larger than what is left of the budget is cut
+    at its last sentence end that fits. If the focus matches nothing anywhere,
+    the pages' leading passages are kept instead, taking turns between pages.
+
+    Args:
+        pages: Passages of each page
+        focus: Focus query
+        budget: Total characters of passage text to keep
+
+    Returns:
+        Kept passages of each page, in page order, with their scores
+    """
+    candidates = [(page, passage) for page, passages in enumerate(pages) for passage in passages]
+    scores = BM25([passage["text"] for _, passage in candidates]).scores(focus)
+    ranked = sorted(
+        (i for i in range(len(candidates)) if scores[i] > 0),
+        key=lambda i: -scores[i]
+    )
+    if not ranked:
+        # Nothing matched: fall back to the start of each page, round robin
+        positions = Counter()
+        order = []
+        for i, (page, _) in enumerate(candidates):
+            order.append((positions[page], page, i))
+            positions[page] += 1
+        ranked = [i for _, _, i in sorted(order)]
+
+    kept: List[List[Passage]] = [[] for _ in pages]
+    remaining = budget
+    for i in ranked:
+        page, passage = candidates[i]
+        # A passage that does not fit is cut short, so a small budget still keeps
+        # the best text rather than only passages small enough to fit whole
+        text = cut_to_fit(passage["text"], remaining)
+        if not text:
+            continue
+        kept[page].append(Passage(offset=passage["offset"], text=text, score=round(scores[i], 3)))
+        remaining -= len(text)
+    for passages in kept:
+        passages.sort(key=lambda passage: passage["offset"])
+    return kept
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Local store of cleaned page content for chunked reading.
+
+Each page is kept as a UTF-8 text file next to a small JSON metadata file with a
+sparse character->byte index, so any chunk can be read by memory-mapping the
+text file and slicing it instead of re-fetching and re-parsing the page.
+"""
+
+import os
+import json
+import mmap
+import time
+import hashlib
+from typing import List, Optional, TypedDict
+from .common import OUTPUT_DIR
+
+CONTENT_DIR = os.getenv("CONTENT_DIR", os.path.join(OUTPUT_DIR, ".content"))
+
+# Record the byte offset of every Nth character
+CHAR_INDEX_STEP = 4096
+
+class StoredContent(TypedDict):
+    """Type for the metadata of a stored page"""
+    url: str
+    domain: str
+    title: str
+    content_hash: str
+    content_length: int
+    stored_at: float
+    final_url: Optional[str]
+    simhash: Optional[str]
+    truncated: bool
+    document_type: str
+    char_index: List[int]
+
+def content_hash(content: str) -> str:
+    """Short, stable hash of cleaned content for change detection."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+
+class ContentStore:
+    """File-backed store of cleaned content keyed by an arbitrary string."""
+
+    def __init__(self, directory: str = CONTENT_DIR):
+        self.directory = directory
+
+    def _paths(self, key: str):
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, name)
+        return base + ".txt", base + ".json"
+
+    def load(self, key: str) -> Optional[StoredContent]:
+        """Return the metadata of a stored page, or None if it is not stored."""
+        text_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if os.path.exists(text_path) else None
+
+    def save(self, key: str, url: str, domain: str, title: str, content: str,
+             final_url: Optional[str] = None, simhash: Optional[str] = None,
+             truncated: bool = False, document_type: str = "html") -> StoredContent:
+        """Store a page's cleaned content, skipping the write if it is unchanged."""
+        digest = content_hash(content)
+        existing = self.load(key)
+        if existing and existing["content_hash"] == digest and existing.get("truncated", False) == truncated:
+            return existing
+
+        data = content.encode("utf-8")
+        char_index = [0]
+        position = 0
+        for start in range(0, len(content) - CHAR_INDEX_STEP, CHAR_INDEX_STEP):
+            position += len(content[start:start + CHAR_INDEX_STEP].encode("utf-8"))
+            char_index.append(position)
+
+        meta = StoredContent(
+            url=url,
+            domain=domain,
+            title=title,
+            content_hash=digest,
+            content_length=len(content),
+            stored_at=time.time(),
+            final_url=final_url,
+            simhash=simhash,
+            truncated=truncated,
+            document_type=document_type,
+            char_index=char_index
+        )
+        text_path, meta_path = self._paths(key)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for path, payload in ((text_path, data), (meta_path, json.dumps(meta).encode("utf-8"))):
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(payload)
+                os.replace(tmp_path, path)
+        except OSError:
+            pass
+        return meta
+
+    def read_chunk(self, key: str, meta: StoredContent, offset: int, size: int) -> str:
+        """
+        Read `size` characters starting at character `offset` (size 0 reads to the end).
+
+        Only the bytes covering the requested range are touched in the mapped file.
+        """
+        text_path, _ = self._paths(key)
+        if offset >= meta["content_length"]:
+            return ""
+        block = offset // CHAR_INDEX_STEP
+        start = meta["char_index"][block]
+        skip = offset - block * CHAR_INDEX_STEP
+
+        with open(text_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            # A character is at most 4 bytes in UTF-8, so this covers the whole range
+            end = min(len(mapped), start + (skip + size) * 4) if size else len(mapped)
+            text = mapped[start:end].decode("utf-8", errors="ignore")
+        return text[skip:skip + size] if size else text[skip:]
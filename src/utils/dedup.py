@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+URL canonicalization and near-duplicate detection for extracted pages.
+"""
+
+import re
+import heapq
+import hashlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from .cache import normalize_url
+from .common import BaseResult
+
+# Query parameters that only track clicks and never change page content
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "twclid", "igshid", "mc_cid", "mc_eid",
+    "_ga", "_gl", "_hsenc", "_hsmi", "mkt_tok", "ref_src", "ref_url", "spm", "cmpid",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "hsa_")
+
+# Shingles sampled per page for the fingerprint, and the SimHash distance for near-duplicates
+FINGERPRINT_SAMPLE = 2048
+NEAR_DUPLICATE_DISTANCE = 3
+
+# Pages shorter than this are too small for a meaningful fingerprint comparison
+MIN_FINGERPRINT_LENGTH = 200
+
+class DuplicateResult(BaseResult):
+    """Type for a streamed result that repeats an earlier one"""
+    duplicate_of: str
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL and strip fragments and click-tracking parameters."""
+    parts = urlsplit(normalize_url(url))
+    query = [
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in TRACKING_PARAMS and not name.lower().startswith(TRACKING_PREFIXES)
+    ]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+def simhash(content: str) -> str:
+    """
+    64-bit SimHash of a page's word 3-shingles, as 16 hex digits.
+
+    Only the FINGERPRINT_SAMPLE smallest shingle hashes are used (a bottom-k
+    sample, consistent across pages), which keeps large pages cheap.
+    """
+    words = re.findall(r"\w+", content.lower())
+    shingles = {" ".join(words[i:i + 3]) for i in range(max(len(words) - 2, 1))}
+    hashes = heapq.nsmallest(
+        FINGERPRINT_SAMPLE,
+        (int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big") for shingle in shingles)
+    )
+    threshold = len(hashes) / 2
+    fingerprint = 0
+    for bit in range(64):
+        mask = 1 << bit
+        if sum(1 for h in hashes if h & mask) > threshold:
+            fingerprint |= mask
+    return f"{fingerprint:016x}"
+
+def hamming_distance(a: str, b: str) -> int:
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+class DuplicateFilter:
+    """
+    Collapse duplicate pages within one multi-URL run.
+
+    Inputs are de-duplicated by canonical URL before fetching and listed as the
+    first input's `alternate_urls`; results are then matched by canonical final
+    URL (after redirects), exact content hash or the SimHash distance of their
+    content. Results are checked one at a time, so only the fields they are
+    matched on are kept for each earlier page, and a later duplicate is replaced
+    by a placeholder pointing at the page already written.
+    """
+
+    def __init__(self, max_distance: int = NEAR_DUPLICATE_DISTANCE):
+        self.max_distance = max_distance
+        self.aliases: Dict[str, List[str]] = {}
+        self.primaries: List[Dict[str, Any]] = []
+
+    def unique_inputs(self, urls: List[str]) -> List[str]:
+        """Drop inputs whose canonical URL repeats an earlier input, remembering them as aliases."""
+        first_by_canonical: Dict[str, str] = {}
+        unique = []
+        for url in urls:
+            canonical = canonicalize_url(url)
+            if canonical in first_by_canonical:
+                self.aliases.setdefault(first_by_canonical[canonical], []).append(url)
+            else:
+                first_by_canonical[canonical] = url
+                unique.append(url)
+        return unique
+
+    def _find_primary(self, result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        for primary in self.primaries:
+            if result.get("final_url") and result.get("final_url") == primary.get("final_url"):
+                return primary
+            if result.get("content_hash") and result.get("content_hash") == primary.get("content_hash"):
+                return primary
+            comparable = min(result.get("content_length", 0), primary.get("content_length", 0)) >= MIN_FINGERPRINT_LENGTH
+            if comparable and hamming_distance(self._fingerprint(result), primary["simhash"]) <= self.max_distance:
+                return primary
+        return None
+
+    @staticmethod
+    def _fingerprint(result: Dict[str, Any]) -> str:
+        """
+        SimHash of a result's page: the one the tool returned for the whole page
+        (see ToolRunner's duplicate_kwargs), else that of its content, computed on first use.
+        """
+        if not result.get("simhash"):
+            result["simhash"] = simhash(result.get("content", ""))
+        return result["simhash"]
+
+    def check(self, result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Register a result. Returns the matching fields of the earlier result it
+        duplicates, or None if it is new.
+        """
+        if "error" in result:
+            return None
+        alternates = self.aliases.get(result.get("query"), [])
+        if alternates:
+            result["alternate_urls"] = list(alternates)
+
+        primary = self._find_primary(result)
+        if primary is None:
+            comparable = result.get("content_length", 0) >= MIN_FINGERPRINT_LENGTH
+            self.primaries.append({
+                "url": result["url"],
+                "final_url": result.get("final_url"),
+                "content_hash": result.get("content_hash"),
+                "content_length": result.get("content_length", 0),
+                "simhash": self._fingerprint(result) if comparable else "",
+            })
+        return primary
+
+    def collapse(self, results: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Pass results through as they come, replacing each duplicate of an earlier one with a placeholder."""
+        for result in results:
+            primary = self.check(result)
+            yield result if primary is None else self.duplicate_result(result, primary)
+
+    def duplicate_result(self, result: Dict[str, Any], primary: Dict[str, Any]) -> DuplicateResult:
+        """Placeholder for a result that repeats a page already written."""
+        return DuplicateResult(query=result.get("query", result.get("url")), duplicate_of=primary["url"])
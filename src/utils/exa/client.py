@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Exa API client shared by the tools: rate-limited requests with retries, and
+page text lookups through the contents endpoint.
+
+exa.py searches through it and soup.py reads page text from it, so both share
+one rate limiter and one contents batcher per process.
+"""
+
+import os
+import time
+import requests
+from typing import Any, Dict, List, Optional
+from dotenv import load_dotenv
+from ..cli import timing
+from ..http_client import http_session, http_timeout
+from ..dedup import canonicalize_url
+from ..ratelimit import TokenBucket, Batcher, backoff_delay, parse_retry_after, RETRY_STATUSES
+from .types import ExaSearchResult
+
+load_dotenv()
+
+EXA_API_KEY = os.getenv("EXA_API_KEY")
+EXA_BASE_URL = os.getenv("EXA_BASE_URL", "https://api.exa.ai").rstrip("/")
+EXA_API_URL = f"{EXA_BASE_URL}/search"
+EXA_CONTENTS_URL = f"{EXA_BASE_URL}/contents"
+EXA_TIMEOUT = float(os.getenv("EXA_TIMEOUT", "30"))
+EXA_RATE_LIMIT = float(os.getenv("EXA_RATE_LIMIT", "5"))
+EXA_MAX_RETRIES = int(os.getenv("EXA_MAX_RETRIES", "4"))
+# Characters of page text per result, 0 for the full text
+EXA_CONTENTS_MAX_CHARS = int(os.getenv("EXA_CONTENTS_MAX_CHARS", "0"))
+# URLs per contents request, and seconds a lookup waits for others to share its request
+EXA_CONTENTS_BATCH = int(os.getenv("EXA_CONTENTS_BATCH", "50"))
+EXA_CONTENTS_WINDOW = float(os.getenv("EXA_CONTENTS_WINDOW", "0.05"))
+
+exa_rate_limiter = TokenBucket("exa", rate=EXA_RATE_LIMIT)
+
+def post_with_retry(url: str, headers: dict, payload: dict) -> requests.Response:
+    """
+    POST to the Exa API under the shared rate limit, retrying rate-limited,
+    failed and timed-out requests with jittered exponential backoff.
+    """
+    for attempt in range(EXA_MAX_RETRIES + 1):
+        if attempt:
+            timing.count("retries")
+        exa_rate_limiter.acquire()
+        last_attempt = attempt == EXA_MAX_RETRIES
+        try:
+            with timing.stage("request"):
+                response = http_session().post(url, headers=headers, json=payload, timeout=http_timeout(EXA_TIMEOUT))
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+            if last_attempt:
+                raise
+            with timing.stage("backoff"):
+                time.sleep(backoff_delay(attempt))
+            continue
+
+        if response.status_code not in RETRY_STATUSES or last_attempt:
+            return response
+
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if response.status_code == 429 and retry_after:
+            # Hold back every worker (and process), not just this one
+            exa_rate_limiter.pause(retry_after)
+        with timing.stage("backoff"):
+            time.sleep(backoff_delay(attempt, retry_after))
+    return response
+
+def api_headers() -> Dict[str, str]:
+    return {
+        "Authorization": f"Bearer {EXA_API_KEY}",
+        "Content-Type": "application/json"
+    }
+
+def text_option() -> Any:
+    """The `text` contents option of a request."""
+    return {"maxCharacters": EXA_CONTENTS_MAX_CHARS} if EXA_CONTENTS_MAX_CHARS else True
+
+def to_search_result(item: Dict[str, Any], contents: bool) -> ExaSearchResult:
+    """Map an item of an Exa response to a search result."""
+    result = ExaSearchResult(
+        title=item.get('title', 'No title'),
+        author=item.get('author', 'No author'),
+        url=item.get('url', 'No URL'),
+    )
+    if contents:
+        result["text"] = item.get("text") or ""
+    return result
+
+def fetch_contents(urls: List[str]) -> Dict[str, ExaSearchResult]:
+    """
+    Look up the page text of several URLs with one call to the Exa contents endpoint.
+
+    Args:
+        urls: URLs to look up
+
+    Returns:
+        Dictionary of requested URL -> result, for the URLs Exa has text for
+        (empty if the request failed, so callers fetch the pages themselves)
+    """
+    if not EXA_API_KEY or not urls:
+        return {}
+    timing.note("exa_batch", str(len(urls)))
+    try:
+        response = post_with_retry(EXA_CONTENTS_URL, api_headers(), {"urls": urls, "text": text_option()})
+        response.raise_for_status()
+        timing.count("bytes", len(response.content))
+        with timing.stage("decode"):
+            data = response.json()
+        items = data.get("results", []) if isinstance(data, dict) else []
+    except (requests.exceptions.RequestException, ValueError):
+        return {}
+
+    # Exa may answer with a normalized spelling of a requested URL
+    found = {}
+    for item in items:
+        if isinstance(item, dict) and item.get("text"):
+            for key in (item.get("id"), item.get("url")):
+                if isinstance(key, str):
+                    found[canonicalize_url(key)] = item
+    results = {}
+    for url in urls:
+        item = found.get(canonicalize_url(url))
+        if item:
+            results[url] = to_search_result({**item, "url": url}, contents=True)
+    return results
+
+contents_batcher = Batcher(fetch_contents, EXA_CONTENTS_BATCH, EXA_CONTENTS_WINDOW)
+
+def get_contents(url: str) -> Optional[ExaSearchResult]:
+    """
+    Page text of one URL from Exa, or None if Exa has none.
+
+    Lookups made at about the same time (e.g. by the workers of a multi-URL
+    run) share one contents request of up to EXA_CONTENTS_BATCH URLs.
+    """
+    return contents_batcher.run(url)
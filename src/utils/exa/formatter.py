@@ -32,7 +32,12 @@ def format_single_result(results: ExaResult, output_format: FormatType) -> str:
         
         formatted_text += f"{i}. {title}\n"
         formatted_text += f"   URL: {url}\n"
-        formatted_text += f"   Snippet: {author}\n\n"
+        formatted_text += f"   Snippet: {author}\n"
+        if "text" in result:
+            # The text itself is stored for soup.py rather than printed
+            stored = f"{len(result['text'])} characters stored" if result["text"] else "not available from Exa"
+            formatted_text += f"   Content: {stored}\n"
+        formatted_text += "\n"
     
     return formatted_text
 
@@ -11,6 +11,7 @@ class ExaSearchResult(TypedDict):
     title: str
     author: str
     url: str
+    text: str  # Only with contents: the page text from Exa ("" if Exa has none)
 
 class ExaApiResponse(BaseResult):
     """Type for successful Exa API response"""
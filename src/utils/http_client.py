@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP client for all tools.
+
+One pooled requests session per process keeps connections alive between
+requests to the same host (within a run, and across runs in the tool daemon),
+limits connections per host, caches DNS lookups and negotiates compression.
+Timeouts and the User-Agent come from the environment.
+"""
+
+import os
+import socket
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util import make_headers
+from dotenv import load_dotenv
+from .cli import timing
+
+load_dotenv()
+HTTP_USER_AGENT = os.getenv(
+    "HTTP_USER_AGENT",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+)
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "15"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+# Hosts with pooled connections, and open connections allowed per host
+HTTP_MAX_HOSTS = int(os.getenv("HTTP_MAX_HOSTS", "64"))
+HTTP_PER_HOST = int(os.getenv("HTTP_PER_HOST", "8"))
+DNS_CACHE_TTL = float(os.getenv("DNS_CACHE_TTL", "300"))
+
+class DnsCache:
+    """Thread-safe cache of resolved addresses, kept for DNS_CACHE_TTL seconds."""
+
+    def __init__(self, ttl: float = DNS_CACHE_TTL):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+
+    def resolve(self, host: str, port: int) -> List[str]:
+        """Addresses for a host, from the cache when fresh (the host itself if caching is off)."""
+        if self.ttl <= 0:
+            return [host]
+        key = (host, port)
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry and entry[0] > time.time():
+            return entry[1]
+
+        with timing.stage("dns"):
+            infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        with self.lock:
+            self.entries[key] = (time.time() + self.ttl, addresses)
+        return addresses
+
+    def forget(self, host: str, port: int) -> None:
+        with self.lock:
+            self.entries.pop((host, port), None)
+
+dns_cache = DnsCache()
+
+class CachedDnsConnection(HTTPConnection):
+    """urllib3 connection that resolves hosts through the DNS cache."""
+
+    def _new_conn(self) -> socket.socket:
+        host = self._dns_host
+        addresses = dns_cache.resolve(host, self.port)
+        timing.count("new_connections")
+        error: Optional[Exception] = None
+        for address in addresses:
+            self._dns_host = address
+            try:
+                with timing.stage("connect"):
+                    return super()._new_conn()
+            except Exception as e:
+                error = e
+            finally:
+                self._dns_host = host
+        # The cached addresses may be stale: resolve again next time
+        dns_cache.forget(host, self.port)
+        raise error
+
+class CachedDnsHTTPSConnection(CachedDnsConnection, HTTPSConnection):
+    """HTTPS variant; certificates are still checked against the host name."""
+
+    def connect(self) -> None:
+        # Everything after the TCP connection (timed in _new_conn) is the TLS handshake
+        with timing.stage("tls"):
+            super().connect()
+
+class CachedDnsHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = CachedDnsConnection
+
+class CachedDnsHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = CachedDnsHTTPSConnection
+
+class PooledAdapter(HTTPAdapter):
+    """Adapter whose connection pools use the DNS cache and block at the per-host limit."""
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": CachedDnsHTTPConnectionPool,
+            "https": CachedDnsHTTPSConnectionPool,
+        }
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+def http_session() -> requests.Session:
+    """The process-wide pooled session (created on first use)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            # Waiting for a free connection enforces the per-host limit
+            adapter = PooledAdapter(pool_connections=HTTP_MAX_HOSTS, pool_maxsize=HTTP_PER_HOST, pool_block=True)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({
+                "User-Agent": HTTP_USER_AGENT,
+                # gzip and deflate, plus br/zstd when a decoder for them is installed
+                "Accept-Encoding": make_headers(accept_encoding=True)["accept-encoding"],
+            })
+            _session = session
+        return _session
+
+def http_timeout(read: Optional[float] = None) -> Tuple[float, float]:
+    """(connect, read) timeout, with an optional tool-specific read timeout."""
+    return HTTP_CONNECT_TIMEOUT, read or HTTP_TIMEOUT
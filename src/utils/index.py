@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Local full-text index (SQLite FTS5) over extracted page content.
+"""
+
+import os
+import re
+import time
+import sqlite3
+from typing import Iterator, List, Optional, Tuple, TypedDict
+from .common import OUTPUT_DIR
+from .content_store import content_hash
+
+INDEX_PATH = os.getenv("INDEX_PATH", os.path.join(OUTPUT_DIR, ".index", "content.db"))
+
+# Target size of an indexed passage, in characters
+PASSAGE_SIZE = 800
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    title TEXT,
+    domain TEXT,
+    content_hash TEXT,
+    fetched_at REAL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS passages USING fts5(
+    url UNINDEXED,
+    position UNINDEXED,
+    title,
+    body,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+class IndexHit(TypedDict):
+    """Type for a ranked passage returned by an index search"""
+    url: str
+    title: str
+    domain: str
+    fetched_at: float
+    offset: int  # Character offset of the passage in the page content
+    snippet: str
+    score: float
+
+def split_passages(content: str, size: int = PASSAGE_SIZE) -> Iterator[Tuple[int, str]]:
+    """Split cleaned content into (character offset, passage) pairs on line boundaries."""
+    start = 0
+    lines: List[str] = []
+    length = 0
+    position = 0
+    for line in content.split("\n"):
+        if lines and length + len(line) > size:
+            yield start, "\n".join(lines)
+            start, lines, length = position, [], 0
+        lines.append(line)
+        length += len(line) + 1
+        position += len(line) + 1
+    if lines:
+        yield start, "\n".join(lines)
+
+def match_expression(query: str, any_term: bool = False) -> str:
+    """Turn free text into a safe FTS5 expression of quoted terms."""
+    terms = [f'"{term}"' for term in re.findall(r"\w+", query)]
+    return (" OR " if any_term else " ").join(terms)
+
+class ContentIndex:
+    """Incremental full-text index of extracted pages, one row per passage."""
+
+    def __init__(self, path: str = INDEX_PATH):
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(SCHEMA)
+        return connection
+
+    def add_page(self, url: str, title: str, domain: str, content: str) -> bool:
+        """
+        Index a page, replacing its previous passages.
+
+        Returns:
+            False if the page was already indexed with the same content (no-op)
+        """
+        digest = content_hash(content)
+        connection = self._connect()
+        try:
+            with connection:
+                row = connection.execute("SELECT content_hash FROM pages WHERE url = ?", (url,)).fetchone()
+                if row and row[0] == digest:
+                    return False
+                connection.execute("DELETE FROM passages WHERE url = ?", (url,))
+                connection.executemany(
+                    "INSERT INTO passages (url, position, title, body) VALUES (?, ?, ?, ?)",
+                    ((url, position, title, passage) for position, passage in split_passages(content))
+                )
+                connection.execute(
+                    "INSERT OR REPLACE INTO pages (url, title, domain, content_hash, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                    (url, title, domain, digest, time.time())
+                )
+            return True
+        finally:
+            connection.close()
+
+    def search(self, query: str, limit: int = 10, domain: Optional[str] = None) -> List[IndexHit]:
+        """Return the best matching passages, requiring all terms and falling back to any term."""
+        connection = self._connect()
+        try:
+            for any_term in (False, True):
+                expression = match_expression(query, any_term)
+                if not expression:
+                    return []
+                sql = """
+                    SELECT passages.url, passages.title, pages.domain, pages.fetched_at, passages.position,
+                           snippet(passages, 3, '[', ']', '...', 32), bm25(passages, 0, 0, 2.0, 1.0)
+                    FROM passages JOIN pages ON pages.url = passages.url
+                    WHERE passages MATCH ?
+                """
+                params: list = [expression]
+                if domain:
+                    sql += " AND pages.domain = ?"
+                    params.append(domain)
+                sql += " ORDER BY bm25(passages, 0, 0, 2.0, 1.0) LIMIT ?"
+                params.append(limit)
+                rows = connection.execute(sql, params).fetchall()
+                if rows:
+                    return [
+                        IndexHit(url=url, title=title, domain=page_domain, fetched_at=fetched_at,
+                                 offset=int(position), snippet=snippet, score=round(-score, 4))
+                        for url, title, page_domain, fetched_at, position, snippet, score in rows
+                    ]
+            return []
+        finally:
+            connection.close()
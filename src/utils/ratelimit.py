@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Rate limiting, retry backoff, in-flight request coalescing and request batching
+for API clients.
+"""
+
+import os
+import json
+import time
+import random
+import threading
+import concurrent.futures
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+from .common import OUTPUT_DIR
+from .cli import timing
+
+try:
+    import fcntl
+except ImportError:  # Windows: limits are shared between threads only
+    fcntl = None
+
+RATELIMIT_DIR = os.path.join(OUTPUT_DIR, ".ratelimit")
+
+# Status codes worth retrying
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+R = TypeVar('R')
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter shared by all threads and, through a locked state
+    file, by all processes using the same name.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: Optional[float] = None, directory: str = RATELIMIT_DIR):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+        self.path = os.path.join(directory, f"{name}.json")
+        self.lock = threading.Lock()
+        self.state = {"tokens": self.capacity, "updated": time.time(), "paused_until": 0.0}
+
+    def _update(self, change: Callable[[Dict[str, float]], float]) -> float:
+        """Apply `change` to the shared state under the thread (and file) lock."""
+        with self.lock:
+            if fcntl is None:
+                return change(self.state)
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                f = open(self.path, "a+", encoding="utf-8")
+            except OSError:
+                return change(self.state)
+            with f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                f.seek(0)
+                try:
+                    self.state = json.loads(f.read())
+                except ValueError:
+                    pass
+                result = change(self.state)
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(self.state))
+                return result
+
+    def _take(self, state: Dict[str, float]) -> float:
+        """Take a token if one is available; otherwise return how long to wait."""
+        now = time.time()
+        if state.get("paused_until", 0) > now:
+            return state["paused_until"] - now
+        elapsed = max(now - state.get("updated", now), 0.0)
+        state["tokens"] = min(self.capacity, state.get("tokens", self.capacity) + elapsed * self.rate)
+        state["updated"] = now
+        if state["tokens"] >= 1:
+            state["tokens"] -= 1
+            return 0.0
+        return (1 - state["tokens"]) / self.rate
+
+    def acquire(self) -> None:
+        """Block until a request may be made."""
+        if self.rate <= 0:
+            return
+        while True:
+            wait = self._update(self._take)
+            if wait <= 0:
+                return
+            with timing.stage("rate_limit"):
+                time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for `seconds`, e.g. after a 429 with Retry-After."""
+        if self.rate <= 0:
+            return
+        until = time.time() + seconds
+
+        def extend(state: Dict[str, float]) -> float:
+            state["paused_until"] = max(state.get("paused_until", 0.0), until)
+            return 0.0
+
+        self._update(extend)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None, base: float = 0.5, cap: float = 30.0) -> float:
+    """
+    Delay before retry number `attempt` (0-based): full-jitter exponential
+    backoff, but never shorter than the server's Retry-After.
+    """
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    if retry_after is not None:
+        delay = retry_after + random.uniform(0, base)
+    return delay
+
+class Coalescer:
+    """Share one in-flight call between concurrent callers asking for the same key."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight: Dict[Any, concurrent.futures.Future] = {}
+
+    def run(self, key: Any, func: Callable[[], R]) -> R:
+        """Run `func`, or wait for the identical call already in flight."""
+        with self.lock:
+            future = self.in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self.in_flight[key] = concurrent.futures.Future()
+
+        if not owner:
+            timing.count("coalesced")
+            with timing.stage("coalesced_wait"):
+                return future.result()
+
+        try:
+            result = func()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+
+class Batcher:
+    """
+    Group single-key calls made at about the same time into one batched call.
+
+    The first caller of a batch waits up to `window` seconds (less if the batch
+    fills up) for others to join, then calls `func` with all their keys; each
+    caller gets the entry for its own key from the returned mapping.
+    """
+
+    def __init__(self, func: Callable[[List[Any]], Dict[Any, R]], max_size: int, window: float):
+        self.func = func
+        self.max_size = max(max_size, 1)
+        self.window = window
+        self.lock = threading.Lock()
+        self.open: Optional[Dict[str, Any]] = None
+
+    def run(self, key: Any) -> Optional[R]:
+        """Add `key` to the open batch (starting one if needed) and wait for its result."""
+        with self.lock:
+            batch = self.open
+            leader = batch is None
+            if leader:
+                batch = self.open = {"keys": [], "full": threading.Event(), "future": concurrent.futures.Future()}
+            batch["keys"].append(key)
+            if len(batch["keys"]) >= self.max_size:
+                self.open = None
+                batch["full"].set()
+
+        if not leader:
+            timing.count("batched")
+            with timing.stage("batch_wait"):
+                return batch["future"].result().get(key)
+
+        with timing.stage("batch_wait"):
+            batch["full"].wait(self.window)
+        with self.lock:
+            if self.open is batch:
+                self.open = None
+        try:
+            results = self.func(list(dict.fromkeys(batch["keys"])))
+            batch["future"].set_result(results)
+        except BaseException as e:
+            batch["future"].set_exception(e)
+            raise
+        return results.get(key)
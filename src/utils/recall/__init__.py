@@ -0,0 +1,3 @@
+"""
+Local content index search utilities and types
+"""
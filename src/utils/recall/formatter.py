@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Formatting utilities for local content index search results.
+"""
+import time
+from ..common import FormatType, format_as_json, BaseFormatter
+from .types import RecallResult
+
+def format_single_result(results: RecallResult, output_format: FormatType) -> str:
+    """Format the passages found for one query in the specified format."""
+    if output_format == "json":
+        return format_as_json(results)
+    
+    formatted_text = f"Indexed passages for: {results.get('query')}\n\n"
+    
+    if "error" in results:
+        return formatted_text + f"ERROR: {results['error']}\n"
+    
+    hits = results.get("results", [])
+    if not hits:
+        return formatted_text + "No matching passages found.\n"
+    
+    for i, hit in enumerate(hits, 1):
+        fetched = time.strftime("%Y-%m-%d %H:%M", time.localtime(hit["fetched_at"]))
+        formatted_text += f"{i}. {hit['title']}\n"
+        formatted_text += f"   URL: {hit['url']} (offset {hit['offset']}, fetched {fetched})\n"
+        formatted_text += f"   Passage: {' '.join(hit['snippet'].split())}\n\n"
+    
+    return formatted_text
+
+# Create formatter instance
+formatter = BaseFormatter[RecallResult](
+    single_format_func=format_single_result,
+    single_label="QUERY",
+    multi_label="MULTIPLE INDEX SEARCH RESULTS"
+)
+
+# Export the format_result function
+format_result = formatter.format_result
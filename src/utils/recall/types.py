@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+"""
+Type definitions for local content index search.
+"""
+
+from typing import List, Union
+from ..common import BaseResult, ErrorResult
+from ..index import IndexHit
+
+class RecallResponse(BaseResult):
+    """Type for a successful index search"""
+    results: List[IndexHit]
+
+RecallResult = Union[RecallResponse, ErrorResult]
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Append-only, compressed log of tool invocations and results for memory/.
+
+Every record is one length-prefixed block: a 13-byte header (magic, codec,
+payload size, CRC-32) followed by the record's JSON, compressed with zstd when
+the zstandard package is installed and with zlib otherwise. Next to the log, a
+small uncompressed index holds one JSON line per record with its offset, time,
+session, tool and input, so a session or a result can be found by URL, query or
+time and read with a single seek instead of decompressing the whole history.
+
+Appends take an exclusive lock on the log and write each record with a single
+O_APPEND write before indexing it, so concurrent tool processes can share the
+log and the index never points at a partly written record. Reading the log from
+the start skips anything torn by a crash (see rebuild_index).
+"""
+
+import os
+import json
+import time
+import mmap
+import zlib
+import struct
+import hashlib
+import threading
+from datetime import date
+from typing import Any, Dict, Iterator, List, Optional, Tuple, TypedDict
+from dotenv import load_dotenv
+from .common import PROJECT_ROOT
+from .dedup import canonicalize_url
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are serialized between threads only
+    fcntl = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+load_dotenv()
+MEMORY_DIR = os.getenv("VAT_MEMORY_DIR", os.path.join(PROJECT_ROOT, "memory"))
+# Set to 0 to stop recording tool runs
+SESSION_LOG = os.getenv("VAT_SESSION_LOG", "1") != "0"
+# Session new records belong to (default: the current date)
+SESSION_NAME = os.getenv("VAT_SESSION")
+
+MAGIC = b"VATR"
+HEADER = struct.Struct(">4sBII")  # magic, codec, payload size, CRC-32 of the payload
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+
+class IndexEntry(TypedDict):
+    """Type for the index line of a record"""
+    offset: int
+    size: int  # Header and payload bytes
+    ts: float
+    session: str
+    run: str  # Invocation the record belongs to
+    tool: str
+    kind: str  # invocation or result
+    key: str  # Normalized URL or query of a result, "" for invocations
+
+class LogRecord(TypedDict):
+    """Type for a decoded record"""
+    ts: float
+    session: str
+    run: str
+    tool: str
+    kind: str
+    key: str
+    data: Any  # Invocation: {"argv": [...], "pid": ...}; result: {"input": ..., "result": {...}}
+
+def record_key(item: str) -> str:
+    """Lookup key of a tool input: the canonical URL, or the query with normalized whitespace."""
+    item = item.strip()
+    if item.startswith(("http://", "https://")):
+        return canonicalize_url(item)
+    return " ".join(item.split()).lower()
+
+def encode(record: LogRecord) -> bytes:
+    """Compress a record into a length-prefixed block."""
+    data = json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+    if zstandard is not None:
+        codec, payload = CODEC_ZSTD, zstandard.ZstdCompressor(level=3).compress(data)
+    else:
+        codec, payload = CODEC_ZLIB, zlib.compress(data, 6)
+    return HEADER.pack(MAGIC, codec, len(payload), zlib.crc32(payload)) + payload
+
+def decode(codec: int, payload: bytes) -> LogRecord:
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("This record is zstd-compressed: install zstandard to read it")
+        return json.loads(zstandard.ZstdDecompressor().decompress(payload))
+    return json.loads(zlib.decompress(payload))
+
+class SessionLog:
+    """Compressed record log with an offset index."""
+
+    def __init__(self, directory: str = MEMORY_DIR, name: str = "sessions"):
+        self.directory = directory
+        self.log_path = os.path.join(directory, f"{name}.log")
+        self.index_path = os.path.join(directory, f"{name}.idx")
+        self.lock = threading.Lock()
+
+    def append(self, tool: str, kind: str, key: str, data: Any,
+               run: str = "", session: Optional[str] = None) -> IndexEntry:
+        """Append one record and its index line."""
+        now = time.time()
+        session = session or SESSION_NAME or date.fromtimestamp(now).isoformat()
+        block = encode(LogRecord(ts=now, session=session, run=run, tool=tool, kind=kind, key=key, data=data))
+        os.makedirs(self.directory, exist_ok=True)
+        with self.lock:
+            fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                if fcntl:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                offset = os.lseek(fd, 0, os.SEEK_END)
+                os.write(fd, block)
+                entry = IndexEntry(offset=offset, size=len(block), ts=now, session=session,
+                                   run=run, tool=tool, kind=kind, key=key)
+                line = (json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+                index_fd = os.open(self.index_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(index_fd, line)
+                finally:
+                    os.close(index_fd)
+            finally:
+                # Closing the descriptor releases the lock
+                os.close(fd)
+        return entry
+
+    def entries(self,
+                session: Optional[str] = None,
+                kind: Optional[str] = None,
+                key: Optional[str] = None,
+                tool: Optional[str] = None,
+                since: Optional[float] = None,
+                until: Optional[float] = None) -> Iterator[IndexEntry]:
+        """Index entries matching all given filters, oldest first."""
+        try:
+            f = open(self.index_path, encoding="utf-8")
+        except OSError:
+            return
+        with f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if ((session is None or entry["session"] == session)
+                        and (kind is None or entry["kind"] == kind)
+                        and (key is None or entry["key"] == key)
+                        and (tool is None or entry["tool"] == tool)
+                        and (since is None or entry["ts"] >= since)
+                        and (until is None or entry["ts"] < until)):
+                    yield entry
+
+    def read(self, entry: IndexEntry) -> Optional[LogRecord]:
+        """Read and decompress the record of an index entry (None if it is damaged)."""
+        with open(self.log_path, "rb") as f:
+            f.seek(entry["offset"])
+            block = f.read(entry["size"])
+        if len(block) < HEADER.size:
+            return None
+        magic, codec, size, crc = HEADER.unpack_from(block)
+        payload = block[HEADER.size:HEADER.size + size]
+        if magic != MAGIC or len(payload) != size or zlib.crc32(payload) != crc:
+            return None
+        return decode(codec, payload)
+
+    def scan(self) -> Iterator[Tuple[IndexEntry, LogRecord]]:
+        """
+        Read the whole log from the start, skipping damaged or torn blocks by
+        resynchronizing on the next magic bytes.
+        """
+        try:
+            f = open(self.log_path, "rb")
+        except OSError:
+            return
+        with f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                yield from self._scan(data)
+
+    def _scan(self, data: mmap.mmap) -> Iterator[Tuple[IndexEntry, LogRecord]]:
+        offset = 0
+        while offset + HEADER.size <= len(data):
+            magic, codec, size, crc = HEADER.unpack_from(data, offset)
+            payload = data[offset + HEADER.size:offset + HEADER.size + size]
+            if magic == MAGIC and len(payload) == size and zlib.crc32(payload) == crc:
+                try:
+                    record = decode(codec, payload)
+                except (ValueError, zlib.error):
+                    record = None
+                if record is not None:
+                    entry = IndexEntry(offset=offset, size=HEADER.size + size, ts=record["ts"],
+                                       session=record["session"], run=record["run"], tool=record["tool"],
+                                       kind=record["kind"], key=record["key"])
+                    yield entry, record
+                    offset += HEADER.size + size
+                    continue
+            found = data.find(MAGIC, offset + 1)
+            if found < 0:
+                break
+            offset = found
+
+    def rebuild_index(self) -> int:
+        """Rewrite the index from the log (e.g. after it was lost), returning the number of records."""
+        if not os.path.exists(self.log_path):
+            return 0
+        with self.lock:
+            fd = os.open(self.log_path, os.O_RDONLY)
+            try:
+                if fcntl:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                entries = [entry for entry, _ in self.scan()]
+                tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    for entry in entries:
+                        f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+                os.replace(tmp_path, self.index_path)
+            finally:
+                os.close(fd)
+        return len(entries)
+
+    def sessions(self) -> List[Dict[str, Any]]:
+        """Summary of every session: first and last record time, invocations and results."""
+        summary: Dict[str, Dict[str, Any]] = {}
+        for entry in self.entries():
+            session = summary.setdefault(entry["session"], {
+                "session": entry["session"], "start": entry["ts"], "end": entry["ts"],
+                "invocations": 0, "results": 0
+            })
+            session["end"] = max(session["end"], entry["ts"])
+            session["invocations" if entry["kind"] == "invocation" else "results"] += 1
+        return sorted(summary.values(), key=lambda session: session["start"])
+
+session_log = SessionLog()
+
+class SessionRecorder:
+    """Records one tool invocation and its results in the session log."""
+
+    def __init__(self, tool: str, argv: List[str], log: SessionLog = session_log):
+        self.tool = tool
+        self.log = log
+        self.enabled = SESSION_LOG
+        self.run = hashlib.sha256(f"{os.getpid()} {time.time()} {id(self)}".encode("utf-8")).hexdigest()[:12]
+        self.record("invocation", "", {"argv": list(argv), "pid": os.getpid()})
+
+    def record(self, kind: str, key: str, data: Any) -> None:
+        if not self.enabled:
+            return
+        try:
+            self.log.append(self.tool, kind, key, data, run=self.run)
+        except OSError:
+            # The history is best effort: a read-only or full disk must not fail the tool
+            self.enabled = False
+
+    def result(self, item: str, result: Any) -> None:
+        """Record the result for one input (URL or query)."""
+        self.record("result", record_key(item), {"input": item, "result": result})
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Streamed, size-capped download of response bodies.
+
+The body is read in chunks and decoded incrementally, so memory per fetch is
+bounded by the byte cap. Its first bytes can be inspected before the rest is
+downloaded, and reading can stop early once a handler has what it needs.
+"""
+
+import re
+import time
+import codecs
+from typing import Callable, Iterator, List, Optional
+import requests
+from ..cli import timing
+
+# Bytes read from the response per iteration
+READ_CHUNK_SIZE = 64 * 1024
+
+# Bytes inspected when the content type has to be sniffed
+SNIFF_LENGTH = 512
+
+CHARSET_PATTERN = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([\w-]+)""", re.IGNORECASE)
+
+class UnsupportedContentType(ValueError):
+    """Raised when no handler can extract text from a response."""
+
+def media_type(response: requests.Response) -> str:
+    """The lower-cased media type of a response, without parameters."""
+    return response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+
+def looks_binary(head: bytes) -> bool:
+    """Check the first bytes of a body for NUL bytes, which never occur in 8-bit or UTF-8 text."""
+    return b"\x00" in head and not head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE))
+
+def detect_encoding(response: requests.Response, head: bytes) -> str:
+    """Pick the body encoding from the HTTP header, a <meta charset> or UTF-8."""
+    if "charset" in response.headers.get("Content-Type", "").lower() and response.encoding:
+        encoding = response.encoding
+    else:
+        match = CHARSET_PATTERN.search(head)
+        encoding = match.group(1).decode("ascii") if match else "utf-8"
+    try:
+        codecs.lookup(encoding)
+    except LookupError:
+        encoding = "utf-8"
+    return encoding
+
+class ResponseBody:
+    """
+    The body of a streamed response, capped at `max_bytes` (0 for no limit).
+
+    `head` exposes the first bytes without consuming them; iterating yields the
+    whole (capped) body and sets `truncated` if the cap was reached.
+    """
+
+    def __init__(self, response: requests.Response, max_bytes: int):
+        self.response = response
+        self.max_bytes = max_bytes
+        self.truncated = False
+        self._chunks = response.iter_content(chunk_size=READ_CHUNK_SIZE)
+        self._head = b""
+        self._head_read = False
+
+    @property
+    def head(self) -> bytes:
+        """The first SNIFF_LENGTH bytes of the body (fewer if it is shorter)."""
+        if not self._head_read:
+            for chunk in self._timed(self._chunks):
+                self._head += chunk
+                if len(self._head) >= SNIFF_LENGTH:
+                    break
+            self._head_read = True
+        return self._head[:SNIFF_LENGTH]
+
+    def _timed(self, chunks: Iterator[bytes]) -> Iterator[bytes]:
+        """Count the time spent waiting for the network, as the "download" stage."""
+        while True:
+            start = time.perf_counter()
+            chunk = next(chunks, None)
+            timing.add_time("download", start, time.perf_counter() - start)
+            if chunk is None:
+                return
+            yield chunk
+
+    def __iter__(self) -> Iterator[bytes]:
+        self.head
+        received = 0
+        for chunk in self._pending():
+            if self.max_bytes and received + len(chunk) > self.max_bytes:
+                chunk = chunk[:self.max_bytes - received]
+                self.truncated = True
+            received += len(chunk)
+            timing.count("bytes", len(chunk))
+            yield chunk
+            if self.truncated:
+                return
+
+    def _pending(self) -> Iterator[bytes]:
+        yield self._head
+        yield from self._timed(self._chunks)
+
+    def read(self) -> bytes:
+        """Read the whole (capped) body."""
+        return b"".join(self)
+
+    def text(self, encoding: Optional[str] = None) -> Iterator[str]:
+        """Decode the body incrementally, yielding text as it arrives."""
+        self.head
+        encoding = encoding or detect_encoding(self.response, self._head[:4096])
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        for chunk in self:
+            yield decoder.decode(chunk)
+        # A multi-byte character cut at the cap is dropped rather than replaced
+        if not self.truncated:
+            yield decoder.decode(b"", final=True)
+
+def read_text(body: ResponseBody,
+              stop_when: Optional[Callable[[str], bool]] = None,
+              stop_marker: Optional[re.Pattern] = None) -> str:
+    """
+    Read and decode a text body.
+
+    Args:
+        body: The response body
+        stop_when: Called with the text read so far whenever `stop_marker` appears
+            in a new chunk; reading stops when it returns True
+        stop_marker: Pattern that triggers a `stop_when` check
+
+    Returns:
+        The decoded text
+    """
+    pieces: List[str] = []
+    tail = ""
+    for piece in body.text():
+        pieces.append(piece)
+        # Check only when the marker shows up, including across chunk boundaries
+        if stop_when and stop_marker and stop_marker.search(tail + piece):
+            if stop_when("".join(pieces)):
+                break
+        tail = piece[-16:]
+    return "".join(pieces)
@@ -2,50 +2,132 @@
 """
 Formatting utilities for Soup text extraction results.
 """
+from typing import Iterable, Iterator, List
 from ..common import FormatType, format_as_json, BaseFormatter
-from .types import SoupResult
+from ..condense import condense
+from .types import SoupResult, SoupExtractedContent
+from .pages import DEFAULT_CHUNK_SIZE
 
-def format_content_preview(content: str, offset = 0, chunk_size = 5000) -> str:
-    """Format a preview of the extracted content."""
-
-    truncated_content = content[offset:offset + chunk_size]
+def format_passages(data: SoupExtractedContent) -> str:
+    """Format the passages kept for a focus query, each with its offset."""
+    passages = data['passages']
+    if not passages:
+        return f'[No passages relevant to "{data["focus"]}" fit the budget]'
+    
+    text = "\n\n".join(f"[offset {passage['offset']}]\n{passage['text']}" for passage in passages)
+    shown = sum(len(passage['text']) for passage in passages)
+    note = (f'\n\n[{shown} of {data.get("content_length", 0)} characters shown, ranked by relevance to "{data["focus"]}"\n'
+            f'To read around a passage, run `tools/soup.py --url "{data.get("url")}" --offset <offset>`]')
+    return text + note
 
-    if len(content) > offset + chunk_size:
-        note = f'\n\n[Truncated content from {offset} to {offset + chunk_size} characters\nTo read further, run the tool in the format of `tools/soup.py --url(s) "<url> from {offset + chunk_size}"]'
-    else:
-        note = ""
+def format_content_preview(data: SoupExtractedContent) -> str:
+    """Format the extracted chunk with a note on how to read further."""
+    if 'passages' in data:
+        return format_passages(data)
+    
+    content = data.get('content', '')
+    offset = data.get('offset', 0)
+    end = offset + len(content)
+    
+    if data.get('content_length', 0) > end:
+        chunk_size = data.get('chunk_size', DEFAULT_CHUNK_SIZE)
+        size_option = f' --chunk-size {chunk_size}' if chunk_size != DEFAULT_CHUNK_SIZE else ''
+        note = (f'\n\n[Truncated content from {offset} to {end} characters\n'
+                f'To read further, run `tools/soup.py --url "{data.get("url")}" --offset {end}{size_option}`]')
+        return content + "..." + note
     
-    return truncated_content + "..." + note
+    return content
 
 def format_single_output(data: SoupResult, output_format: FormatType) -> str:
     """Format a single extraction result in the specified format."""
     if output_format == "json":
         return format_as_json(data)
     
-    url = data.get('url', 'Unknown URL')
+    url = data.get('url', data.get('query', 'Unknown URL'))
     formatted_text = f"Extracted content from: {url}\n"
     
     if "error" in data:
         return formatted_text + f"ERROR: {data['error']}\n"
     
+    if "duplicate_of" in data:
+        return formatted_text + f"Duplicate of: {data['duplicate_of']}\n"
+    
     formatted_text += f"Domain: {data.get('domain', 'Unknown')}\n"
     formatted_text += f"Title: {data.get('title', 'No title')}\n"
-    formatted_text += f"Content length: {data.get('content_length', 0)} characters\n\n"
+    if data.get('document_type', 'html') != 'html':
+        formatted_text += f"Document type: {data['document_type']}\n"
+    formatted_text += f"Content length: {data.get('content_length', 0)} characters\n"
+    formatted_text += f"Content hash: {data.get('content_hash', 'Unknown')}\n"
+    if data.get('truncated'):
+        formatted_text += "Download truncated: page exceeded the size limit (--max-bytes)\n"
+    if 'focus' in data:
+        formatted_text += f"Focus: {data['focus']} ({len(data['passages'])} passages)\n"
+    elif data.get('total_chunks', 1) > 1:
+        chunk_index = data.get('offset', 0) // data['chunk_size'] + 1
+        formatted_text += f"Chunk: {chunk_index} of {data['total_chunks']}\n"
+    if data.get('alternate_urls'):
+        formatted_text += f"Alternate URLs: {', '.join(data['alternate_urls'])}\n"
+    formatted_text += "\n"
     
     content = data.get('content', '')
-    if not content:
+    if not content and 'passages' not in data:
         formatted_text += "No content extracted\n"
         return formatted_text
     
     formatted_text += "CONTENT PREVIEW:\n"
     formatted_text += "=" * 80 + "\n"
-    formatted_text += format_content_preview(content)
+    formatted_text += format_content_preview(data)
     formatted_text += "\n" + "=" * 80 + "\n"
     
     return formatted_text
 
+def condense_results(results: List[SoupResult]) -> List[SoupResult]:
+    """
+    Rank the passages of focused results together, so that the budget is shared
+    by all URLs instead of applying to each page. Results that carry all their
+    passages as `candidates` are condensed from those, so a page's passages
+    compete with the other pages' before any per-page cut.
+    """
+    focused = [i for i, data in enumerate(results) if 'passages' in data]
+    if not focused or (len(focused) < 2 and 'candidates' not in results[focused[0]]):
+        return results
+    
+    first = results[focused[0]]
+    kept = condense([results[i].get('candidates', results[i]['passages']) for i in focused], first['focus'], first['budget'])
+    condensed = list(results)
+    for i, passages in zip(focused, kept):
+        data = {key: value for key, value in results[i].items() if key != 'candidates'}
+        condensed[i] = {
+            **data,
+            'content': "\n\n".join(passage['text'] for passage in passages),
+            'passages': passages
+        }
+    return condensed
+
+class SoupFormatter(BaseFormatter[SoupResult]):
+    """Formatter that shares the --focus budget across the results of a run."""
+    
+    def prepare(self, results: Iterable[SoupResult]) -> Iterator[SoupResult]:
+        """
+        Pass results through as they come. Only focused results (which carry
+        passages) share a budget, so from the first of them on the results are
+        held back and condensed together.
+        """
+        results = iter(results)
+        for data in results:
+            if 'passages' in data:
+                yield from condense_results([data, *results])
+                return
+            yield data
+    
+    def recordable(self, data: SoupResult) -> SoupResult:
+        """A result without the passages it only carries for a shared budget."""
+        if 'candidates' not in data:
+            return data
+        return {key: value for key, value in data.items() if key != 'candidates'}  # type: ignore[return-value]
+
 # Create formatter instance
-formatter = BaseFormatter[SoupResult](
+formatter = SoupFormatter(
     single_format_func=format_single_output,
     single_label="URL",
     multi_label="MULTIPLE URL EXTRACTION RESULTS"
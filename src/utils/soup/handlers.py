@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Document-type handlers for text extraction.
+
+Each handler turns one kind of response body (HTML, PDF, plain text or
+markdown, JSON, RSS/Atom feeds) into a title and plain text content. A handler
+is picked from the Content-Type header, with magic bytes taking precedence and
+deciding alone when the header is missing or generic. Types without a handler
+are rejected before the body is downloaded.
+"""
+
+import io
+import re
+import json
+import html
+from typing import Iterator, List, Optional, Tuple
+from xml.etree import ElementTree
+import requests
+from .download import ResponseBody, UnsupportedContentType, media_type, looks_binary, read_text
+from .parsers import get_backend, main_content_found, MAIN_CLOSE_PATTERN
+from .parse_pool import use_pool, parse_in_pool
+from .profiles import SOUP_PROFILES, profile_domain, profile_store
+from ..cli import timing
+
+# Types that are often sent for other documents by misconfigured servers, so the body decides
+GENERIC_TYPES = {"", "application/octet-stream", "binary/octet-stream"}
+
+TAG_START_PATTERN = re.compile(rb"\s*<\s*[!?a-zA-Z]")
+FEED_ROOT_PATTERN = re.compile(rb"<(rss|feed|rdf:RDF)[\s>]")
+MARKUP_PATTERN = re.compile(r"<[^>]+>")
+HEADING_PATTERN = re.compile(r"^#\s+(.+)$", re.MULTILINE)
+
+def local_name(tag: str) -> str:
+    """Element name without its XML namespace."""
+    return tag.rsplit("}", 1)[-1]
+
+def strip_markup(text: str) -> str:
+    """Turn an HTML fragment (e.g. a feed summary) into plain text."""
+    return " ".join(html.unescape(MARKUP_PATTERN.sub(" ", text)).split())
+
+class DocumentHandler:
+    """Base class for document-type handlers."""
+
+    name = ""
+    media_types: Tuple[str, ...] = ()
+    # Whether the extracted text still needs whitespace cleanup
+    needs_cleaning = True
+    # Optional package the handler depends on
+    requirement: Optional[str] = None
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    def sniff(self, head: bytes) -> bool:
+        """Check whether the first bytes of a body identify this document type."""
+        return False
+
+    def extract(self, body: ResponseBody, selector: Optional[str], parser: Optional[str],
+                links: Optional[List[str]] = None) -> Tuple[Optional[str], str]:
+        """
+        Read the body and extract its title and text.
+
+        Args:
+            body: The response body
+            selector: Optional CSS selector to target specific elements
+            parser: Parser backend name for HTML
+            links: If given, the document's links (as written) are appended to
+                it, and the whole document is read
+
+        Returns:
+            Tuple of (title or None, content text)
+        """
+        raise NotImplementedError
+
+class HtmlHandler(DocumentHandler):
+    """HTML pages, through the parser backends (large pages in the parser process pool)."""
+
+    name = "html"
+    media_types = ("text/html", "application/xhtml+xml")
+
+    def sniff(self, head: bytes) -> bool:
+        return not looks_binary(head) and TAG_START_PATTERN.match(head.lstrip(b"\xef\xbb\xbf")) is not None
+
+    def extract(self, body: ResponseBody, selector: Optional[str], parser: Optional[str],
+                links: Optional[List[str]] = None) -> Tuple[Optional[str], str]:
+        backend = get_backend(parser, selector)
+        # The site's profile, if it has one, is tried before the generic candidate search
+        domain = profile_domain(body.response.url) if SOUP_PROFILES and not selector else None
+        profile = profile_store.get(domain) if domain else None
+        profile_selector = profile["selector"] if profile else None
+
+        def main_complete(partial: str) -> bool:
+            with timing.stage("main_detect"):
+                return main_content_found(backend, partial)
+
+        # Without a selector, stop downloading once the page's <main> is complete,
+        # unless the site's profile points elsewhere or the links after it are wanted
+        early_stop = selector is None and profile_selector in (None, "main") and links is None
+        text = read_text(
+            body,
+            stop_when=main_complete if early_stop else None,
+            stop_marker=MAIN_CLOSE_PATTERN
+        )
+        if use_pool(text):
+            title, content, source, page_links = parse_in_pool(text, backend.name, selector, profile_selector,
+                                                               links is not None)
+        else:
+            with timing.stage("parse"):
+                document = backend.parse(text)
+            with timing.stage("extract"):
+                page_links = backend.links(document) if links is not None else []
+                title, content, source = backend.extract_main(document, selector, profile_selector)
+        if links is not None:
+            links.extend(page_links)
+        if domain:
+            try:
+                timing.note("profile", profile_store.record(domain, profile, source))
+            except OSError:
+                # Profiles are best effort: a page that extracted fine must not fail on a read-only or full disk
+                timing.note("profile", "error")
+        return title, content
+
+class PdfHandler(DocumentHandler):
+    """PDF documents, page by page with pypdf (optional dependency)."""
+
+    name = "pdf"
+    media_types = ("application/pdf", "application/x-pdf")
+    requirement = "pypdf"
+
+    @classmethod
+    def available(cls) -> bool:
+        try:
+            import pypdf  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def sniff(self, head: bytes) -> bool:
+        return head.startswith(b"%PDF-")
+
+    def extract(self, body: ResponseBody, selector: Optional[str], parser: Optional[str],
+                links: Optional[List[str]] = None) -> Tuple[Optional[str], str]:
+        from pypdf import PdfReader
+
+        # The cross-reference table is at the end of the file, so pages can only be read once it is complete
+        data = body.read()
+        with timing.stage("parse"):
+            reader = PdfReader(io.BytesIO(data), strict=False)
+            title = reader.metadata.title if reader.metadata else None
+
+        def pages() -> Iterator[str]:
+            for page in reader.pages:
+                yield page.extract_text() or ""
+
+        with timing.stage("extract"):
+            return (title or "").strip() or None, "\n\n".join(pages())
+
+class FeedHandler(DocumentHandler):
+    """RSS and Atom feeds, parsed entry by entry as the body streams in."""
+
+    name = "feed"
+    media_types = ("application/rss+xml", "application/atom+xml", "application/rdf+xml",
+                   "application/xml", "text/xml")
+    needs_cleaning = False
+
+    def sniff(self, head: bytes) -> bool:
+        stripped = head.lstrip(b"\xef\xbb\xbf \t\r\n")
+        return stripped.startswith((b"<?xml", b"<rss", b"<feed", b"<rdf:RDF")) and FEED_ROOT_PATTERN.search(head) is not None
+
+    def extract(self, body: ResponseBody, selector: Optional[str], parser: Optional[str],
+                links: Optional[List[str]] = None) -> Tuple[Optional[str], str]:
+        xml_parser = ElementTree.XMLPullParser(events=("start", "end"))
+        title: Optional[str] = None
+        entries: List[str] = []
+        path: List[str] = []
+
+        for chunk in body:
+            try:
+                xml_parser.feed(chunk)
+            except ElementTree.ParseError:
+                # Keep the entries read so far from a truncated or malformed feed
+                break
+            for event, element in xml_parser.read_events():
+                name = local_name(element.tag)
+                if event == "start":
+                    if not path and name not in ("rss", "feed", "RDF"):
+                        raise UnsupportedContentType(f"Unsupported XML document: <{name}>")
+                    path.append(name)
+                    continue
+                path.pop()
+                if name in ("item", "entry"):
+                    entries.append(self.format_entry(element, links))
+                    element.clear()
+                elif name == "title" and title is None and path and path[-1] in ("channel", "feed"):
+                    title = (element.text or "").strip() or None
+
+        return title, "\n\n".join(entries)
+
+    def format_entry(self, entry: ElementTree.Element, links: Optional[List[str]] = None) -> str:
+        """Render one feed item or entry as plain text, collecting its link if `links` is given."""
+        fields = {}
+        for child in entry:
+            name = local_name(child.tag)
+            if name == "link" and child.get("href"):
+                fields.setdefault("link", child.get("href"))
+            elif child.text and child.text.strip():
+                fields.setdefault(name, child.text.strip())
+
+        if links is not None and "link" in fields:
+            links.append(fields["link"])
+        lines = [fields.get("title", "Untitled")]
+        for name in ("link", "pubDate", "published", "updated", "date"):
+            if name in fields:
+                lines.append(fields[name])
+        summary = fields.get("content") or fields.get("summary") or fields.get("description")
+        if summary:
+            lines.append(strip_markup(summary))
+        return "\n".join(lines)
+
+class JsonHandler(DocumentHandler):
+    """JSON documents, pretty-printed."""
+
+    name = "json"
+    media_types = ("application/json", "text/json")
+    needs_cleaning = False
+
+    def sniff(self, head: bytes) -> bool:
+        return head.lstrip(b"\xef\xbb\xbf \t\r\n").startswith((b"{", b"["))
+
+    def extract(self, body: ResponseBody, selector: Optional[str], parser: Optional[str],
+                links: Optional[List[str]] = None) -> Tuple[Optional[str], str]:
+        text = read_text(body)
+        try:
+            data = json.loads(text)
+        except ValueError:
+            # Truncated or invalid JSON is still readable as text
+            return None, text
+        title = data.get("title") if isinstance(data, dict) else None
+        return title if isinstance(title, str) else None, json.dumps(data, indent=2, ensure_ascii=False)
+
+class TextHandler(DocumentHandler):
+    """Plain text and markdown, kept as is apart from trailing whitespace."""
+
+    name = "text"
+    media_types = ("text/plain", "text/markdown", "text/x-markdown", "text/csv")
+    needs_cleaning = False
+
+    def sniff(self, head: bytes) -> bool:
+        return not looks_binary(head)
+
+    def extract(self, body: ResponseBody, selector: Optional[str], parser: Optional[str],
+                links: Optional[List[str]] = None) -> Tuple[Optional[str], str]:
+        text = read_text(body)
+        content = re.sub(r"\n{3,}", "\n\n", "\n".join(line.rstrip() for line in text.splitlines())).strip()
+        heading = HEADING_PATTERN.search(content)
+        return heading.group(1).strip() if heading else None, content
+
+# Handlers with distinctive magic bytes come first: they win over the declared type
+HANDLERS: List[DocumentHandler] = [PdfHandler(), FeedHandler(), HtmlHandler(), JsonHandler(), TextHandler()]
+MAGIC_HANDLERS = ("pdf", "feed")
+
+def declared_handler(declared: str) -> Optional[DocumentHandler]:
+    """The handler for a media type, including +json and +xml suffixed types."""
+    for handler in HANDLERS:
+        if declared in handler.media_types:
+            return handler
+    if declared.endswith("+json"):
+        return get_handler("json")
+    if declared.endswith("+xml"):
+        return get_handler("feed")
+    return None
+
+def get_handler(name: str) -> DocumentHandler:
+    return next(handler for handler in HANDLERS if handler.name == name)
+
+def missing_requirement(handler: DocumentHandler) -> UnsupportedContentType:
+    return UnsupportedContentType(f"Reading {handler.name} documents requires {handler.requirement} (pip install {handler.requirement})")
+
+def select_handler(response: requests.Response, body: ResponseBody) -> DocumentHandler:
+    """
+    Pick the handler for a response.
+
+    Raises:
+        UnsupportedContentType: If no handler fits; for a declared type without a
+            handler this happens before any of the body is read
+    """
+    declared = media_type(response)
+    handler = declared_handler(declared)
+    if handler is None and declared not in GENERIC_TYPES:
+        raise UnsupportedContentType(f"Unsupported content type: {declared}")
+    if handler and not handler.available():
+        raise missing_requirement(handler)
+
+    head = body.head
+    magic = next((h for h in HANDLERS if h.name in MAGIC_HANDLERS and h.sniff(head)), None)
+    if magic:
+        handler = magic
+    elif handler is None:
+        handler = next((h for h in HANDLERS if h.sniff(head)), None)
+    elif handler.name != "pdf" and looks_binary(head):
+        handler = None
+    if handler is None:
+        raise UnsupportedContentType(f"Unsupported content type: {declared or 'unknown'} (body is binary)")
+    if not handler.available():
+        raise missing_requirement(handler)
+    return handler
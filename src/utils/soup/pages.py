@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Where soup.py keeps extracted pages: the response cache, the content store and
+the search index. Page text obtained without fetching (Exa search contents) is
+stored here too, so exa.py can hand it over without importing soup.py.
+"""
+
+import os
+import sqlite3
+from typing import Optional
+from urllib.parse import urlparse
+from dotenv import load_dotenv
+from .types import SoupResult, SoupExtractedContent
+from ..cli import timing
+from ..cache import ResponseCache, make_key
+from ..dedup import canonicalize_url
+from ..content_store import ContentStore, StoredContent
+from ..index import ContentIndex
+
+load_dotenv()
+SOUP_CACHE_TTL = int(os.getenv("SOUP_CACHE_TTL", "3600"))
+# Characters of a page returned per chunk
+DEFAULT_CHUNK_SIZE = int(os.getenv("DEFAULT_CHUNK_SIZE", "5000"))
+
+soup_cache = ResponseCache[SoupResult]("soup", ttl=SOUP_CACHE_TTL)
+content_store = ContentStore()
+content_index = ContentIndex()
+
+def clean_text(text: str) -> str:
+    """Clean extracted text by removing extra whitespace and empty lines."""
+    lines = [line.strip() for line in text.split("\n")]
+    return "\n".join(line for line in lines if line)
+
+def save_page(url: str, page: SoupExtractedContent, selector: Optional[str] = None) -> StoredContent:
+    """Keep a page's full content in the content store and, without a selector, the search index."""
+    with timing.stage("store"):
+        stored = content_store.save(
+            make_key(canonicalize_url(url), selector), url, page["domain"], page["title"], page["content"],
+            final_url=page.get("final_url"),
+            truncated=page.get("truncated", False),
+            document_type=page.get("document_type", "html")
+        )
+    if not selector:
+        # Unchanged pages are detected by content hash and skipped
+        with timing.stage("index"):
+            try:
+                content_index.add_page(url, page["title"], page["domain"], page["content"])
+            except (sqlite3.Error, OSError):
+                # Like the content store, the index is best effort: a locked database
+                # or a Python without FTS5 must not fail the extraction
+                timing.note("index", "error")
+    return stored
+
+def text_page(url: str, title: str, text: str, document_type: str = "exa") -> SoupExtractedContent:
+    """
+    Build (and cache) the full-page result for text obtained without fetching
+    the page, e.g. from Exa, as if the page had been fetched and extracted.
+    """
+    content = clean_text(text)
+    page = SoupExtractedContent(
+        query=url,
+        url=url,
+        domain=urlparse(url).netloc,
+        title=title or urlparse(url).path,
+        content=content,
+        content_length=len(content),
+        final_url=canonicalize_url(url),
+        truncated=False,
+        document_type=document_type
+    )
+    soup_cache.store(make_key(canonicalize_url(url), None), page)
+    return page
+
+def store_text_page(url: str, title: str, text: str) -> None:
+    """Cache and store page text obtained from Exa, so reading the page later needs no fetch."""
+    save_page(url, text_page(url, title, text))
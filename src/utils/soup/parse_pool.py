@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Process pool for CPU-bound HTML parsing.
+
+Fetching stays on the I/O worker threads; once a page is downloaded, its HTML is
+copied into a shared memory block and a pool process parses and extracts it, so
+several pages are parsed at once instead of taking turns holding the GIL. Only
+the block's name crosses the process boundary, not the page itself.
+
+Starting the pool (each process imports the running script anew) and shutting
+it down costs far more than parsing one page, so by default the pool only runs
+in the tool daemon, where it is started once and the script is the daemon's
+own. Even then it is started in the background when the second large page
+arrives, so a run with a single large page never pays for it, and it is kept
+for the life of the process. Until its processes are up, and for small pages,
+where the handoff would cost more than it saves, pages are parsed in the
+calling thread.
+"""
+
+import os
+import sys
+import time
+import threading
+import multiprocessing
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+from dotenv import load_dotenv
+from .parsers import get_backend
+from ..cli import timing
+
+load_dotenv()
+# Parser processes (0 or 1 parses in the fetching threads; unset: one per core in the daemon, none otherwise)
+SOUP_PARSE_WORKERS = int(os.getenv("SOUP_PARSE_WORKERS") or "0")
+# Pages smaller than this many bytes of HTML are parsed in the fetching thread
+SOUP_PARSE_POOL_MIN_BYTES = int(os.getenv("SOUP_PARSE_POOL_MIN_BYTES", str(256 * 1024)))
+
+_workers = SOUP_PARSE_WORKERS
+# Large pages seen so far: the pool starts with the second
+_large_pages = 0
+_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+# Completes once a pool process has started
+_ready: Optional[concurrent.futures.Future] = None
+_pool_lock = threading.Lock()
+
+def attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to a block created by the parent process, which also removes it."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Pool processes share the parent's resource tracker, where the block is already registered
+    return shared_memory.SharedMemory(name=name)
+
+def parse_shared(name: str, size: int, parser: str, selector: Optional[str], profile: Optional[str],
+                 want_links: bool) -> Tuple[Optional[str], str, Optional[str], List[str], float, float, float]:
+    """
+    Parse and extract a page from a shared memory block (runs in a pool process).
+
+    Returns:
+        Tuple of (title, content, main content source, links, parse start, parse seconds, extract seconds)
+    """
+    block = attach(name)
+    try:
+        html = bytes(block.buf[:size]).decode("utf-8")
+    finally:
+        block.close()
+    backend = get_backend(parser, selector)
+    start = time.perf_counter()
+    document = backend.parse(html)
+    parsed = time.perf_counter()
+    links = backend.links(document) if want_links else []
+    title, content, source = backend.extract_main(document, selector, profile)
+    return title, content, source, links, start, parsed - start, time.perf_counter() - parsed
+
+def parse_pool() -> concurrent.futures.ProcessPoolExecutor:
+    """The process-wide parser pool (created on first use)."""
+    global _pool, _ready
+    with _pool_lock:
+        if _pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            # Forking a process with running threads is unsafe; a fork server is not
+            if "forkserver" in methods:
+                context = multiprocessing.get_context("forkserver")
+                # Workers are forked from a server that has imported the parsers once
+                context.set_forkserver_preload([__name__])
+            else:
+                context = multiprocessing.get_context("spawn")
+            _pool = concurrent.futures.ProcessPoolExecutor(_workers, mp_context=context)
+            # Processes start on demand: one no-op task per worker starts them all
+            _ready = _pool.submit(os.getpid)
+            for _ in range(_workers - 1):
+                _pool.submit(os.getpid)
+        return _pool
+
+def reset_pool() -> None:
+    """Drop a broken pool (e.g. after a worker was killed) so the next page starts a new one."""
+    global _pool, _ready
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+            _pool = _ready = None
+
+def enable_daemon_pool() -> None:
+    """Use one parser process per core in a long-lived process, unless SOUP_PARSE_WORKERS says otherwise."""
+    global _workers
+    if not os.getenv("SOUP_PARSE_WORKERS"):
+        _workers = os.cpu_count() or 1
+
+def use_pool(html: str) -> bool:
+    """Check whether a page should go to the pool, starting the pool from the second large page on."""
+    global _large_pages
+    if _workers <= 1 or len(html) < SOUP_PARSE_POOL_MIN_BYTES:
+        return False
+    with _pool_lock:
+        _large_pages += 1
+        if _large_pages < 2:
+            return False
+    parse_pool()
+    ready = _ready
+    return ready is not None and ready.done() and ready.exception() is None
+
+def parse_in_pool(html: str, parser: str, selector: Optional[str], profile: Optional[str] = None,
+                  want_links: bool = False) -> Tuple[Optional[str], str, Optional[str], List[str]]:
+    """
+    Parse and extract a page in the process pool.
+
+    Args:
+        html: Page HTML
+        parser: Parser backend name
+        selector: Optional CSS selector to target specific elements
+        profile: CSS selector to try first for the main content
+        want_links: Also return the page's links
+
+    Returns:
+        Tuple of (title or None, content text, main content source, links)
+
+    Raises:
+        BrokenProcessPool: If a pool process died; the pool is replaced for later pages
+    """
+    with timing.stage("handoff"):
+        data = html.encode("utf-8")
+        block = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+        block.buf[:len(data)] = data
+    try:
+        future = parse_pool().submit(parse_shared, block.name, len(data), parser, selector, profile, want_links)
+        with timing.stage("handoff"):
+            title, content, source, links, start, parse_seconds, extract_seconds = future.result()
+            # Report the pool process's own times as the usual stages; the rest is waiting and transfer
+            timing.add_time("parse", start, parse_seconds)
+            timing.add_time("extract", start + parse_seconds, extract_seconds)
+    except BrokenProcessPool:
+        reset_pool()
+        raise
+    finally:
+        block.close()
+        block.unlink()
+    return title, content, source, links
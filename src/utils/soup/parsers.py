@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+HTML parser backends for text extraction.
+
+Every backend prunes boilerplate elements and locates main-content candidates in
+a single pass over the document, then extracts text with the same rules as
+BeautifulSoup's `get_text(separator="\\n", strip=True)`, so all backends produce
+the same content after `clean_text`. The fastest installed backend is used unless
+one is requested by name (via --parser or SOUP_PARSER).
+"""
+
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+SOUP_PARSER = os.getenv("SOUP_PARSER", "auto")
+
+# Elements removed before extracting any text (template and ruby annotations are
+# never part of BeautifulSoup's get_text output, so they are pruned for all backends)
+PRUNED_TAGS = ["script", "style", "meta", "noscript", "header", "footer", "nav", "template", "rp", "rt"]
+
+# Minimum length for a main-content candidate to be used
+MIN_MAIN_CONTENT_LENGTH = 100
+
+def get_main_content_elements() -> List[dict]:
+    """Get list of potential main content element selectors, in priority order."""
+    return [
+        {"tag": "main"},
+        {"tag": "article"},
+        {"tag": "div", "attrs": {"id": "content"}},
+        {"tag": "div", "attrs": {"class": "content"}},
+        {"tag": "div", "attrs": {"id": "main"}},
+        {"tag": "div", "attrs": {"class": "main"}},
+        {"tag": "div", "attrs": {"role": "main"}},
+    ]
+
+def element_css(element_def: dict) -> str:
+    """Convert a main content element definition to a CSS selector."""
+    css = element_def["tag"]
+    for name, value in element_def.get("attrs", {}).items():
+        css += {"id": f"#{value}", "class": f".{value}"}.get(name, f'[{name}="{value}"]')
+    return css
+
+def matches_element(tag: str, attrs: Dict[str, Any], element_def: dict) -> bool:
+    """Check whether an element matches a main content element definition."""
+    if tag != element_def["tag"]:
+        return False
+    for name, value in element_def.get("attrs", {}).items():
+        actual = attrs.get(name)
+        if actual is None:
+            return False
+        if name == "class":
+            classes = actual.split() if isinstance(actual, str) else list(actual)
+            if value not in classes and " ".join(classes) != value:
+                return False
+        elif actual != value:
+            return False
+    return True
+
+def join_text(strings) -> str:
+    """Join text nodes the way BeautifulSoup's get_text(separator="\\n", strip=True) does."""
+    return "\n".join(text for text in (s.strip() for s in strings) if text)
+
+def pick_main_content(candidates: List[Optional[Any]], get_text) -> Optional[Tuple[str, str]]:
+    """
+    Find the first candidate, in priority order, with substantial content.
+
+    Returns:
+        Tuple of (CSS selector of the candidate, its text), or None
+    """
+    for element, element_def in zip(candidates, get_main_content_elements()):
+        if element is not None:
+            content = get_text(element)
+            if len(content) > MIN_MAIN_CONTENT_LENGTH:
+                return element_css(element_def), content
+    return None
+
+MAIN_OPEN_PATTERN = re.compile(r"<main[\s>]", re.IGNORECASE)
+MAIN_CLOSE_PATTERN = re.compile(r"</main\s*>", re.IGNORECASE)
+PRUNED_CONTAINER_PATTERN = re.compile(r"<(/?)(header|footer|nav|template|noscript)[\s>]", re.IGNORECASE)
+
+def main_content_found(backend: "ParserBackend", html: str) -> bool:
+    """
+    Check whether a partial document already holds its final main content.
+
+    `<main>` is the highest priority candidate, so once the first one has closed
+    with substantial text, the rest of the page cannot change the extraction.
+    """
+    # The first <main> outside pruned elements is the one extraction would use
+    depth, position, opening = 0, 0, None
+    for candidate in MAIN_OPEN_PATTERN.finditer(html):
+        for match in PRUNED_CONTAINER_PATTERN.finditer(html, position, candidate.start()):
+            depth += -1 if match.group(1) else 1
+        position = candidate.start()
+        if depth <= 0:
+            opening = candidate
+            break
+    if not opening:
+        return False
+    closing = MAIN_CLOSE_PATTERN.search(html, opening.end())
+    # A nested <main> would make the first closing tag ambiguous
+    if not closing or MAIN_OPEN_PATTERN.search(html, opening.end(), closing.start()):
+        return False
+    _, content = backend.extract(backend.parse(html[opening.start():closing.end()]))
+    return len(content) > MIN_MAIN_CONTENT_LENGTH
+
+class ParserBackend:
+    """Base class for HTML parser backends."""
+
+    name = ""
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    def parse(self, html: str) -> Any:
+        """Parse an HTML string into a document."""
+        raise NotImplementedError
+
+    def extract(self, document: Any, selector: Optional[str] = None) -> Tuple[Optional[str], str]:
+        """
+        Prune the document and extract its title and main text.
+
+        Returns:
+            Tuple of (title or None, raw content text)
+        """
+        title, content, _ = self.extract_main(document, selector)
+        return title, content
+
+    def extract_main(self, document: Any, selector: Optional[str] = None,
+                     profile: Optional[str] = None) -> Tuple[Optional[str], str, Optional[str]]:
+        """
+        Prune the document and extract its title and main text, trying a profile first.
+
+        Args:
+            document: Parsed document
+            selector: CSS selector whose matches are the content, if any
+            profile: CSS selector of the element that held the main content on
+                earlier pages of the same site, tried before the candidate search
+
+        Returns:
+            Tuple of (title or None, raw content text, CSS selector of the element
+            the main content came from, or None for a selector or the whole body)
+        """
+        raise NotImplementedError
+
+    def select_first(self, document: Any, css: str) -> Optional[Any]:
+        """The first element matching a CSS selector, in document order."""
+        raise NotImplementedError
+
+    def links(self, document: Any) -> List[str]:
+        """The href of every link in the document, as written (call before extracting, which prunes)."""
+        raise NotImplementedError
+
+    def profile_content(self, document: Any, profile: str, get_text) -> Optional[str]:
+        """The text of a profile's element, if it still has substantial content."""
+        try:
+            element = self.select_first(document, profile)
+        except Exception:
+            # Invalid selector, or lxml without cssselect
+            return None
+        if element is None:
+            return None
+        content = get_text(element)
+        return content if len(content) > MIN_MAIN_CONTENT_LENGTH else None
+
+class BeautifulSoupBackend(ParserBackend):
+    """BeautifulSoup with the pure-Python html.parser builder."""
+
+    name = "html.parser"
+
+    def parse(self, html: str) -> Any:
+        from bs4 import BeautifulSoup
+        return BeautifulSoup(html, self.name)
+
+    def select_first(self, document: Any, css: str) -> Optional[Any]:
+        return document.select_one(css)
+
+    def links(self, document: Any) -> List[str]:
+        return [a["href"] for a in document.find_all("a", href=True)]
+
+    def extract_main(self, document: Any, selector: Optional[str] = None,
+                     profile: Optional[str] = None) -> Tuple[Optional[str], str, Optional[str]]:
+        from bs4 import Tag
+
+        element_defs = get_main_content_elements()
+        candidates: List[Optional[Any]] = [None] * len(element_defs)
+        pruned = []
+        title = None
+
+        # Single walk: collect pruned subtrees, the title and the first match of each candidate
+        stack = [child for child in reversed(document.contents) if isinstance(child, Tag)]
+        while stack:
+            tag = stack.pop()
+            if tag.name in PRUNED_TAGS:
+                pruned.append(tag)
+                continue
+            if tag.name == "title" and title is None:
+                title = tag
+            for i, element_def in enumerate(element_defs):
+                if candidates[i] is None and matches_element(tag.name, tag.attrs, element_def):
+                    candidates[i] = tag
+            stack.extend(child for child in reversed(tag.contents) if isinstance(child, Tag))
+
+        for tag in pruned:
+            tag.decompose()
+
+        title_text = title.string.strip() if title is not None and title.string else None
+
+        def get_text(element):
+            return element.get_text(separator="\n", strip=True)
+
+        if selector:
+            elements = document.select(selector)
+            if elements:
+                return title_text, "\n\n".join(get_text(elem) for elem in elements), None
+
+        content = self.profile_content(document, profile, get_text) if profile else None
+        if content is not None:
+            return title_text, content, profile
+        main = pick_main_content(candidates, get_text)
+        if main is not None:
+            return title_text, main[1], main[0]
+        return title_text, get_text(document.body) if document.body else "No content found", None
+
+class LxmlBackend(ParserBackend):
+    """Native lxml.html tree (C parser, no BeautifulSoup tree building)."""
+
+    name = "lxml"
+
+    @classmethod
+    def available(cls) -> bool:
+        try:
+            import lxml.html  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def parse(self, html: str) -> Any:
+        import lxml.html
+        try:
+            return lxml.html.document_fromstring(html)
+        except ValueError:
+            # Strings with an XML encoding declaration must be passed as bytes
+            return lxml.html.document_fromstring(html.encode("utf-8"))
+
+    def select_first(self, document: Any, css: str) -> Optional[Any]:
+        from lxml.cssselect import CSSSelector
+        elements = CSSSelector(css)(document)
+        return elements[0] if elements else None
+
+    def links(self, document: Any) -> List[str]:
+        return [a.get("href") for a in document.iter("a") if a.get("href")]
+
+    def extract_main(self, document: Any, selector: Optional[str] = None,
+                     profile: Optional[str] = None) -> Tuple[Optional[str], str, Optional[str]]:
+        from lxml import etree
+
+        etree.strip_elements(document, *PRUNED_TAGS, with_tail=False)
+
+        title = next(document.iter("title"), None)
+        title_text = (title.text or "").strip() or None if title is not None else None
+
+        def get_text(element):
+            return join_text(element.itertext())
+
+        if selector:
+            from lxml.cssselect import CSSSelector
+            elements = CSSSelector(selector)(document)
+            if elements:
+                return title_text, "\n\n".join(get_text(elem) for elem in elements), None
+
+        content = self.profile_content(document, profile, get_text) if profile else None
+        if content is not None:
+            return title_text, content, profile
+
+        element_defs = get_main_content_elements()
+        candidates: List[Optional[Any]] = [None] * len(element_defs)
+        for element in document.iter(tag=etree.Element):
+            for i, element_def in enumerate(element_defs):
+                if candidates[i] is None and matches_element(element.tag, element.attrib, element_def):
+                    candidates[i] = element
+
+        main = pick_main_content(candidates, get_text)
+        if main is not None:
+            return title_text, main[1], main[0]
+        body = document.find("body")
+        return title_text, get_text(body) if body is not None else "No content found", None
+
+class SelectolaxBackend(ParserBackend):
+    """selectolax with the lexbor engine (falling back to modest on older versions)."""
+
+    name = "selectolax"
+
+    @classmethod
+    def available(cls) -> bool:
+        try:
+            import selectolax  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def parse(self, html: str) -> Any:
+        try:
+            from selectolax.lexbor import LexborHTMLParser
+            return LexborHTMLParser(html)
+        except ImportError:
+            from selectolax.parser import HTMLParser
+            return HTMLParser(html)
+
+    def select_first(self, document: Any, css: str) -> Optional[Any]:
+        return document.css_first(css)
+
+    def links(self, document: Any) -> List[str]:
+        return [node.attributes["href"] for node in document.css("a[href]") if node.attributes.get("href")]
+
+    def extract_main(self, document: Any, selector: Optional[str] = None,
+                     profile: Optional[str] = None) -> Tuple[Optional[str], str, Optional[str]]:
+        document.strip_tags(PRUNED_TAGS)
+
+        title = document.css_first("title")
+        title_text = title.text().strip() or None if title is not None else None
+
+        def get_text(node):
+            # selectolax keeps whitespace-only nodes as empty lines; drop them like get_text(strip=True)
+            return join_text(node.text(deep=True, separator="\n", strip=True).split("\n"))
+
+        if selector:
+            elements = document.css(selector)
+            if elements:
+                return title_text, "\n\n".join(get_text(elem) for elem in elements), None
+
+        content = self.profile_content(document, profile, get_text) if profile else None
+        if content is not None:
+            return title_text, content, profile
+
+        element_defs = get_main_content_elements()
+        candidates: List[Optional[Any]] = [None] * len(element_defs)
+        # One combined query returns every candidate in document order
+        for node in document.css(", ".join(element_css(element_def) for element_def in element_defs)):
+            for i, element_def in enumerate(element_defs):
+                if candidates[i] is None and matches_element(node.tag, node.attributes, element_def):
+                    candidates[i] = node
+
+        main = pick_main_content(candidates, get_text)
+        if main is not None:
+            return title_text, main[1], main[0]
+        return title_text, get_text(document.body) if document.body is not None else "No content found", None
+
+# Backends in order of preference for automatic selection
+BACKENDS = {backend.name: backend for backend in (SelectolaxBackend, LxmlBackend, BeautifulSoupBackend)}
+
+def get_backend(name: Optional[str] = None, selector: Optional[str] = None) -> ParserBackend:
+    """
+    Get a parser backend by name, or the fastest installed one for "auto".
+
+    Args:
+        name: Backend name (selectolax, lxml, html.parser or auto)
+        selector: CSS selector that will be used, if any
+    """
+    name = name or SOUP_PARSER
+    if name != "auto":
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown parser backend: {name}")
+        return BACKENDS[name]()
+
+    for backend in BACKENDS.values():
+        # Native lxml needs the optional cssselect package for CSS selectors
+        if backend is LxmlBackend and selector:
+            try:
+                import cssselect  # noqa: F401
+            except ImportError:
+                continue
+        if backend.available():
+            return backend()
+    return BeautifulSoupBackend()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Per-domain extraction profiles for main-content detection.
+
+A profile is the CSS selector of the element that held a site's main content.
+Once a domain has one, it is tried before the generic candidate search, so
+repeated extraction from the same site goes straight to the right element.
+Learned profiles are kept under output/.profiles, one file per domain, and are
+replaced after PROFILE_MAX_MISSES pages in a row where they found nothing.
+Profiles in the config file (SOUP_PROFILES_FILE) take precedence: a plain
+selector is fixed, while {"selector": ..., "learn": true} only seeds a profile
+that is relearned like any other once it goes stale.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Optional, TypedDict
+from urllib.parse import urlparse
+from dotenv import load_dotenv
+from ..common import OUTPUT_DIR, PROJECT_ROOT
+
+load_dotenv()
+PROFILES_DIR = os.getenv("PROFILES_DIR", os.path.join(OUTPUT_DIR, ".profiles"))
+# Relative to the project root unless absolute
+SOUP_PROFILES_FILE = os.path.join(PROJECT_ROOT, os.getenv("SOUP_PROFILES_FILE", "soup_profiles.json"))
+
+# Set to 0 to always use the generic candidate search
+SOUP_PROFILES = os.getenv("SOUP_PROFILES", "1") != "0"
+
+# Consecutive pages without content after which a profile is relearned
+PROFILE_MAX_MISSES = int(os.getenv("PROFILE_MAX_MISSES", "3"))
+
+class DomainProfile(TypedDict):
+    """Type for the extraction profile of a domain"""
+    domain: str
+    selector: str  # CSS selector of the main content element
+    source: str  # learned, seeded (config, relearnable) or config (fixed)
+    misses: int  # Consecutive pages where the selector found no content
+    updated_at: float
+
+def profile_domain(url: str) -> str:
+    """The domain a URL's profile is kept under (host without www.)."""
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+class ProfileStore:
+    """Learned profiles on disk, with config file profiles layered on top."""
+
+    def __init__(self, directory: str = PROFILES_DIR, config_path: str = SOUP_PROFILES_FILE):
+        self.directory = directory
+        self.config_path = config_path
+        self.lock = threading.Lock()
+        self.profiles: Dict[str, Optional[DomainProfile]] = {}
+        self.config: Optional[Dict[str, DomainProfile]] = None
+        self.config_mtime: Optional[float] = None
+
+    def _path(self, domain: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(domain.encode("utf-8")).hexdigest()[:32] + ".json")
+
+    def _load_config(self) -> Dict[str, DomainProfile]:
+        """Read the config file, again whenever it changes (e.g. under the tool daemon)."""
+        try:
+            mtime = os.path.getmtime(self.config_path)
+        except OSError:
+            mtime = None
+        if self.config is not None and mtime == self.config_mtime:
+            return self.config
+
+        config: Dict[str, DomainProfile] = {}
+        if mtime is not None:
+            try:
+                with open(self.config_path, encoding="utf-8") as f:
+                    entries = json.load(f)
+            except (OSError, ValueError):
+                entries = {}
+            for domain, entry in entries.items():
+                if isinstance(entry, str):
+                    entry = {"selector": entry}
+                if not isinstance(entry, dict) or not entry.get("selector"):
+                    continue
+                domain = domain.lower()
+                domain = domain[4:] if domain.startswith("www.") else domain
+                config[domain] = DomainProfile(
+                    domain=domain,
+                    selector=entry["selector"],
+                    source="seeded" if entry.get("learn") else "config",
+                    misses=0,
+                    updated_at=mtime
+                )
+        self.config, self.config_mtime = config, mtime
+        return config
+
+    def _load(self, domain: str) -> Optional[DomainProfile]:
+        if domain not in self.profiles:
+            try:
+                with open(self._path(domain), encoding="utf-8") as f:
+                    profile = json.load(f)
+                self.profiles[domain] = profile if profile.get("domain") == domain else None
+            except (OSError, ValueError):
+                self.profiles[domain] = None
+        return self.profiles[domain]
+
+    def _save(self, profile: DomainProfile) -> None:
+        self.profiles[profile["domain"]] = profile
+        path = self._path(profile["domain"])
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(profile, f)
+        os.replace(tmp_path, path)
+
+    def get(self, domain: str) -> Optional[DomainProfile]:
+        """The profile to try first for a domain, if any."""
+        with self.lock:
+            fixed = self._load_config().get(domain)
+            if fixed and fixed["source"] == "config":
+                return fixed
+            learned = self._load(domain)
+            # A seed applies until a profile has been learned from it (or it went stale)
+            if fixed and (learned is None or learned["updated_at"] < fixed["updated_at"]):
+                return fixed
+            if learned and learned["misses"] >= PROFILE_MAX_MISSES:
+                return None
+            return learned
+
+    def record(self, domain: str, profile: Optional[DomainProfile], source: Optional[str]) -> str:
+        """
+        Update a domain's profile after an extraction.
+
+        Args:
+            domain: The page's profile domain
+            profile: The profile that was tried, if any
+            source: CSS selector of the element the main content came from (None for the body)
+
+        Returns:
+            Outcome for timing notes: hit, miss, invalidated, learned or none
+        """
+        if profile and source == profile["selector"]:
+            # Only a change is written: a learned profile that keeps working stays as it is
+            if profile["source"] != "config" and (profile["misses"] or profile["source"] == "seeded"):
+                with self.lock:
+                    self._save({**profile, "source": "learned", "misses": 0, "updated_at": time.time()})
+            return "hit"
+
+        if profile and profile["source"] == "config":
+            return "miss"
+        with self.lock:
+            if profile:
+                misses = profile["misses"] + 1
+                if misses < PROFILE_MAX_MISSES or source is None:
+                    self._save({**profile, "misses": misses, "updated_at": time.time()})
+                    return "miss" if misses < PROFILE_MAX_MISSES else "invalidated"
+            if source is None:
+                # Nothing to learn from a page without a main content element
+                return "none"
+            self._save(DomainProfile(domain=domain, selector=source, source="learned", misses=0,
+                                     updated_at=time.time()))
+        return "learned"
+
+profile_store = ProfileStore()
@@ -3,15 +3,31 @@
 Type definitions for Soup text extraction functionality.
 """
 
-from typing import Union, TypedDict
+from typing import List, Union, TypedDict
 from ..common import BaseResult, ErrorResult
+from ..dedup import DuplicateResult
+from ..condense import Passage
 
 class SoupExtractedContent(BaseResult):
     """Type for content extracted by BeautifulSoup"""
     url: str
     domain: str
     title: str
-    content: str
-    content_length: int
+    content: str  # The requested chunk of the cleaned content
+    content_length: int  # Length of the full cleaned content
+    offset: int
+    chunk_size: int
+    total_chunks: int
+    content_hash: str
+    final_url: str  # Canonical URL after redirects
+    simhash: str  # Only when duplicates were checked: fingerprint of the whole page
+    truncated: bool  # Download was cut at the byte cap
+    document_type: str  # Handler that extracted the content: html, pdf, text, json or feed
+    alternate_urls: List[str]  # Only present when duplicates were collapsed into this result
+    focus: str  # Only with --focus: the query passages were ranked against
+    budget: int  # Only with --focus: characters of passages allowed
+    passages: List[Passage]  # Only with --focus: the kept passages, joined as `content`
+    candidates: List[Passage]  # Only while a --focus budget is shared: every passage from the offset on
+    links: List[str]  # Only when requested (crawls): absolute http(s) links on the page
 
-SoupResult = Union[SoupExtractedContent, ErrorResult]
\ No newline at end of file
+SoupResult = Union[SoupExtractedContent, ErrorResult, DuplicateResult]
\ No newline at end of file
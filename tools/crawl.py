@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Site Crawl Tool
+A command-line utility that crawls a documentation site or blog archive from seed
+URLs, extracting every in-scope page with soup.py and streaming the results.
+"""
+import sys
+from src.utils.cli.daemon import run_via_daemon
+
+if __name__ == "__main__":
+    # Hand off to a running tool daemon, if any, before the heavy imports below
+    run_via_daemon("crawl")
+
+import argparse
+from typing import List, Optional
+from src.utils.cache import bind_cache_policy, configure_cache
+from src.utils.common import ResultWriter, output_stream, output_path
+from src.utils.cli.base import add_runner_arguments
+from src.utils.session_log import SessionRecorder
+from src.utils.cli.crawl import (
+    Crawler, CrawlJob, CrawlScope, Frontier,
+    CRAWL_MAX_PAGES, CRAWL_MAX_DEPTH, CRAWL_CONCURRENCY, CRAWL_PER_HOST, CRAWL_DELAY
+)
+from src.utils.soup.formatter import formatter
+from soup import extract_text_from_url, DEFAULT_CHUNK_SIZE
+
+class CrawlRunner:
+    """Command-line runner for resumable site crawls."""
+
+    def __init__(self):
+        self.parser = argparse.ArgumentParser(description="Crawl a site from seed URLs and extract every in-scope page")
+        input_group = self.parser.add_mutually_exclusive_group(required=True)
+        input_group.add_argument("--url", "-u", type=str, help="Seed URL")
+        input_group.add_argument("--urls", "-us", nargs="+", type=str, help="Multiple seed URLs")
+        self.parser.add_argument("--max-pages",
+                                type=int, default=CRAWL_MAX_PAGES,
+                                help=f"Page budget, seeds included (default: {CRAWL_MAX_PAGES})")
+        self.parser.add_argument("--max-depth",
+                                type=int, default=CRAWL_MAX_DEPTH,
+                                help=f"Links to follow from a seed, 0 for the seeds only (default: {CRAWL_MAX_DEPTH})")
+        self.parser.add_argument("--scope",
+                                choices=["prefix", "host"], default="prefix",
+                                help="Follow links under the seed's directory, or anywhere on its host (default: prefix)")
+        self.parser.add_argument("--concurrency",
+                                type=int, default=CRAWL_CONCURRENCY,
+                                help=f"Concurrent page fetches (default: {CRAWL_CONCURRENCY})")
+        self.parser.add_argument("--per-host",
+                                type=int, default=CRAWL_PER_HOST,
+                                help=f"Concurrent page fetches per host (default: {CRAWL_PER_HOST})")
+        self.parser.add_argument("--delay",
+                                type=float, default=CRAWL_DELAY,
+                                help=f"Minimum seconds between requests to a host; a longer robots.txt Crawl-delay wins (default: {CRAWL_DELAY})")
+        self.parser.add_argument("--selector", "-s",
+                                type=str,
+                                help="CSS selector to target specific elements")
+        self.parser.add_argument("--chunk-size",
+                                type=int, default=DEFAULT_CHUNK_SIZE,
+                                help=f"Characters of content per page, 0 for all (default: {DEFAULT_CHUNK_SIZE})")
+        self.parser.add_argument("--job",
+                                type=str,
+                                help="Crawl name for resuming (default: derived from the seeds and options)")
+        self.parser.add_argument("--restart",
+                                action="store_true",
+                                help="Discard the progress of an earlier run of the same crawl")
+        # A resumed crawl appends to --output, which a JSON array cannot take
+        add_runner_arguments(
+            self.parser,
+            formats=["text", "json", "ndjson"],
+            format_help="Output format: text blocks or NDJSON lines (json or ndjson)",
+            output_help="Save results to file (in output directory; gzip-compressed if it ends in .gz), appended to when a crawl resumes",
+            timings=False
+        )
+
+    def run(self, argv: Optional[List[str]] = None) -> None:
+        """Run the crawl with parsed arguments (from sys.argv unless argv is given)."""
+        args = self.parser.parse_args(argv)
+        configure_cache(enabled=not args.no_cache, refresh=args.refresh)
+        seeds = [args.url] if args.url else args.urls
+        recorder = SessionRecorder("crawl", sys.argv[1:] if argv is None else argv)
+        extract_kwargs = {"selector": args.selector, "chunk_size": args.chunk_size}
+        options = {"max_pages": args.max_pages, "max_depth": args.max_depth, "scope": args.scope, **extract_kwargs}
+
+        job = CrawlJob(args.job or CrawlJob.default_name(seeds, options))
+        previous = None if args.restart else job.load()
+        if previous and previous.get("status") == "done":
+            print(f"Crawl {job.name} is already complete ({previous['done']} pages; use --restart to run it again)",
+                  file=sys.stderr)
+            return
+        if previous:
+            frontier = Frontier.from_state(previous, args.max_pages)
+            print(f"Resuming crawl {job.name}: {frontier.done} pages done, "
+                  f"{len(previous.get('pending', []))} pending", file=sys.stderr)
+        else:
+            frontier = Frontier(args.max_pages)
+            for seed in seeds:
+                frontier.add(seed, 0)
+        job.state = {"seeds": seeds, "options": options}
+
+        crawler = Crawler(
+            extract=bind_cache_policy(extract_text_from_url),
+            frontier=frontier,
+            scope=CrawlScope(seeds, args.scope),
+            max_depth=args.max_depth,
+            concurrency=args.concurrency,
+            per_host=args.per_host,
+            delay=args.delay
+        )
+        status = "interrupted"
+        try:
+            # Written in place, not atomically: pages are checkpointed as done once they are
+            # written, so they must stay in the file on any failure, and a resumed crawl
+            # appends only the rest
+            with output_stream(args.output, "a" if previous else "w") as out:
+                writer = ResultWriter(formatter, out, "ndjson" if args.format == "json" else args.format)
+                try:
+                    for page, url, depth, result in crawler.run(**extract_kwargs):
+                        writer.write({**result, "depth": depth}, page)
+                        recorder.result(url, {**result, "depth": depth})
+                        out.flush()
+                        job.checkpoint(frontier)
+                    status = "done"
+                except KeyboardInterrupt:
+                    pass
+                writer.close()
+        except Exception as e:
+            print(f"Error processing request: {str(e)}", file=sys.stderr)
+            sys.exit(1)
+        finally:
+            job.checkpoint(frontier, status=status, force=True)
+        if args.output:
+            print(f"Results saved to {output_path(args.output)}")
+        if status == "interrupted":
+            print(f"\nInterrupted: run the same command again to resume crawl {job.name}", file=sys.stderr)
+            sys.exit(130)
+
+        print(f"Crawled {frontier.done} pages from {len(seeds)} seeds", file=sys.stderr)
+
+def create_runner() -> CrawlRunner:
+    return CrawlRunner()
+
+def main():
+    create_runner().run()
+
+if __name__ == "__main__":
+    main()
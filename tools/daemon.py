@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tool Daemon
+Keeps the VAT tools loaded in a background process so each call skips interpreter
+startup work and imports. Tool commands use the daemon automatically while it runs.
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+from src.utils.cli.daemon import DAEMON_SOCKET, serve, stop_daemon, daemon_running
+
+# Tools are plain scripts next to this file
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+def start() -> None:
+    """Import the tools and serve them in the foreground."""
+    import soup
+    import exa
+    import research
+    import recall
+    import crawl
+    import replay
+    from src.utils.soup.parse_pool import enable_daemon_pool
+
+    # The parser pool's startup is paid once here, not by every run
+    enable_daemon_pool()
+
+    serve({
+        "soup": soup.create_runner,
+        "exa": exa.create_runner,
+        "research": research.create_runner,
+        "recall": recall.create_runner,
+        "crawl": crawl.create_runner,
+        "replay": replay.create_runner,
+    })
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the VAT tools as a long-lived daemon")
+    parser.add_argument("command",
+                       choices=["start", "stop", "status"],
+                       help="Start the daemon, stop it, or check whether it is running")
+    parser.add_argument("--background", "-b",
+                       action="store_true",
+                       help="Start the daemon as a detached background process")
+    args = parser.parse_args()
+
+    if args.command == "stop":
+        print("Daemon stopped" if stop_daemon() else "Daemon is not running")
+    elif args.command == "status":
+        if daemon_running():
+            print(f"Daemon running on {DAEMON_SOCKET}")
+        else:
+            print("Daemon is not running")
+    elif args.background:
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "start"],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+        print(f"Daemon starting on {DAEMON_SOCKET}")
+    else:
+        start()
+
+if __name__ == "__main__":
+    main()
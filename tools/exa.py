@@ -7,29 +7,47 @@ A command-line utility that searches the web using the Exa API.
 
 import os
 import sys
+from src.utils.cli.daemon import run_via_daemon
+
+if __name__ == "__main__":
+    # Hand off to a running tool daemon, if any, before the heavy imports below
+    run_via_daemon("exa")
+
 import requests
+from typing import Any, Dict, List
 from dotenv import load_dotenv
 
 # Import shared utilities
 from src.utils.exa.types import ExaApiResponse, ExaResult, ExaSearchResult
-from src.utils.exa.formatter import format_result
+from src.utils.exa.formatter import formatter
 from src.utils.common import ErrorResult
 from src.utils.cli.base import ToolRunner
+from src.utils.cli import timing
+from src.utils.cache import ResponseCache, make_key
+from src.utils.ratelimit import Coalescer
+from src.utils.exa.client import EXA_API_KEY, EXA_API_URL, post_with_retry, api_headers, text_option, to_search_result
 
 # Load environment variables
 load_dotenv()
 
-EXA_API_KEY = os.getenv("EXA_API_KEY")
 DEFAULT_SEARCH_LIMIT = int(os.getenv("DEFAULT_SEARCH_LIMIT", "10"))
-EXA_API_URL = "https://api.exa.ai/search"
+EXA_CACHE_TTL = int(os.getenv("EXA_CACHE_TTL", "86400"))
 
-def search_exa(query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> ExaResult:
+exa_cache = ResponseCache[ExaApiResponse]("exa", ttl=EXA_CACHE_TTL)
+exa_coalescer = Coalescer()
+
+def search_exa(query: str, limit: int = DEFAULT_SEARCH_LIMIT, contents: bool = False) -> ExaResult:
     """
     Perform a web search using the Exa API.
     
+    With contents, Exa returns each result's page text along with the search.
+    The texts are stored like pages extracted by soup.py, so reading those
+    pages later does not fetch them again.
+    
     Args:
         query: The search query string
         limit: Maximum number of results to return
+        contents: Also return the page text of each result
         
     Returns:
         Dictionary containing search results or error information
@@ -44,36 +62,59 @@ def search_exa(query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> ExaResult:
     if limit < 1:
         limit = DEFAULT_SEARCH_LIMIT
     
-    headers = {
-        "Authorization": f"Bearer {EXA_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    
-    payload = {
+    # Serve repeated queries from the cache to save API credits
+    key_parts: List[Any] = [" ".join(query.split()), limit]
+    if contents:
+        # Results with text are cached apart from plain ones
+        key_parts.append("text")
+    cache_key = make_key(*key_parts)
+    cached = exa_cache.get(cache_key)
+    timing.note("cache", "hit" if cached else "miss")
+    if cached:
+        result = cached
+    else:
+        # Identical queries submitted together share a single API call
+        result = exa_coalescer.run(cache_key, lambda: fetch_search(query, limit, cache_key, contents))
+        result = {**result, "query": query}
+    if contents and "error" not in result:
+        store_contents(result["results"])
+    return result
+
+def store_contents(results: List[ExaSearchResult]) -> None:
+    """Keep the text of results in soup.py's cache and content store."""
+    # Imported here so plain searches do not load the extraction stack
+    from src.utils.soup.pages import store_text_page
+    with timing.stage("store"):
+        for item in results:
+            if item.get("text") and item["url"].startswith("http"):
+                store_text_page(item["url"], item["title"], item["text"])
+
+def fetch_search(query: str, limit: int, cache_key: str, contents: bool = False) -> ExaResult:
+    """Call the Exa search endpoint and cache successful responses."""
+    payload: Dict[str, Any] = {
         "query": query,
         "numResults": limit,
         "useAutoprompt": True,
     }
+    if contents:
+        payload["contents"] = {"text": text_option()}
     
     try:
-        response = requests.post(EXA_API_URL, headers=headers, json=payload, timeout=30)
+        response = post_with_retry(EXA_API_URL, api_headers(), payload)
         response.raise_for_status()
-        result = response.json()
+        timing.count("bytes", len(response.content))
+        with timing.stage("decode"):
+            result = response.json()
         
         if not isinstance(result, dict) or 'results' not in result:
             return ErrorResult(query=query, error="Invalid API response format")
         
-        return ExaApiResponse(
+        search_result = ExaApiResponse(
             query=query, 
-            results=[
-                ExaSearchResult(
-                    title=item.get('title', 'No title'),
-                    author=item.get('author', 'No author'),
-                    url=item.get('url', 'No URL'),
-                ) 
-                for item in result.get('results', [])
-            ]
+            results=[to_search_result(item, contents) for item in result.get('results', [])]
         )
+        exa_cache.store(cache_key, search_result)
+        return search_result
     except requests.exceptions.Timeout:
         return ErrorResult(query=query, error="Request timed out")
     except requests.exceptions.RequestException as e:
@@ -81,10 +122,10 @@ def search_exa(query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> ExaResult:
     except (KeyError, ValueError, TypeError) as e:
         return ErrorResult(query=query, error=f"Error processing API response: {str(e)}")
 
-def main():
+def create_runner() -> ToolRunner:
     runner = ToolRunner(
         processor=search_exa,
-        formatter=format_result,
+        formatter=formatter,
         description="Search the web using Exa API",
         input_name="query",
         input_help="Single search query",
@@ -95,9 +136,15 @@ def main():
         "type": int,
         "default": DEFAULT_SEARCH_LIMIT,
         "help": f"Number of results (default: {DEFAULT_SEARCH_LIMIT})"
+    }, contents={
+        "action": "store_true",
+        "help": "Also get each result's page text and store it, so soup.py reads those pages without fetching them"
     })
     
-    runner.run()
+    return runner
+
+def main():
+    create_runner().run()
 
 if __name__ == "__main__":
     main()
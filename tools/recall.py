@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Recall Tool
+A command-line utility that searches the local index of everything soup.py has
+extracted and returns ranked passages with snippets.
+"""
+import os
+from src.utils.cli.daemon import run_via_daemon
+
+if __name__ == "__main__":
+    # Hand off to a running tool daemon, if any, before the heavy imports below
+    run_via_daemon("recall")
+
+import sqlite3
+from typing import Optional
+from src.utils.recall.types import RecallResult, RecallResponse
+from src.utils.recall.formatter import formatter
+from src.utils.common import ErrorResult
+from src.utils.cli.base import ToolRunner
+from src.utils.index import ContentIndex
+
+DEFAULT_RECALL_LIMIT = int(os.getenv("DEFAULT_RECALL_LIMIT", "10"))
+
+content_index = ContentIndex()
+
+def search_index(query: str, limit: int = DEFAULT_RECALL_LIMIT, domain: Optional[str] = None) -> RecallResult:
+    """
+    Search the local content index.
+    
+    Args:
+        query: Free-text search query
+        limit: Maximum number of passages to return
+        domain: Only return passages from this domain
+        
+    Returns:
+        Dictionary containing ranked passages or error information
+    """
+    if not query or query.isspace():
+        return ErrorResult(query=query, error="Empty query provided")
+    
+    try:
+        return RecallResponse(query=query, results=content_index.search(query, max(limit, 1), domain))
+    except sqlite3.Error as e:
+        return ErrorResult(query=query, error=f"Index error: {str(e)}")
+
+def create_runner() -> ToolRunner:
+    runner = ToolRunner(
+        processor=search_index,
+        formatter=formatter,
+        description="Search passages of previously extracted pages",
+        input_name="query",
+        input_help="Single search query",
+        multi_input_help="Multiple search queries"
+    )
+    
+    runner.add_arguments(
+        limit={
+            "type": int,
+            "default": DEFAULT_RECALL_LIMIT,
+            "help": f"Number of passages (default: {DEFAULT_RECALL_LIMIT})"
+        },
+        domain={
+            "type": str,
+            "help": "Only search pages from this domain"
+        }
+    )
+    
+    return runner
+
+def main():
+    create_runner().run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Session Replay Tool
+A command-line utility that lists the recorded tool sessions in memory/ and
+replays a session, or looks up earlier results by URL, query or time, without
+running the tools again.
+"""
+import sys
+from src.utils.cli.daemon import run_via_daemon
+
+if __name__ == "__main__":
+    # Hand off to a running tool daemon, if any, before the heavy imports below
+    run_via_daemon("replay")
+
+import json
+import argparse
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+from src.utils.common import BaseFormatter, format_as_compact_json, output_stream, output_path
+from src.utils.cli.base import add_runner_arguments
+from src.utils.exa.formatter import formatter as exa_formatter
+from src.utils.recall.formatter import formatter as recall_formatter
+from src.utils.soup.formatter import formatter as soup_formatter
+from src.utils.session_log import LogRecord, SessionLog, session_log, record_key
+
+FORMATTERS: Dict[str, BaseFormatter] = {
+    "soup": soup_formatter,
+    "exa": exa_formatter,
+    "recall": recall_formatter,
+    "crawl": soup_formatter,
+    "research": soup_formatter,
+}
+
+def parse_time(value: str) -> float:
+    """Timestamp of an ISO date or date and time (local time unless it has an offset)."""
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Not an ISO date or time: {value}")
+
+def format_time(ts: float) -> str:
+    return datetime.fromtimestamp(ts).isoformat(sep=" ", timespec="seconds")
+
+def formatter_for(record: LogRecord) -> BaseFormatter:
+    result = record["data"].get("result", {})
+    # research.py records its searches next to its pages
+    if record["tool"] == "research" and "results" in result:
+        return exa_formatter
+    return FORMATTERS.get(record["tool"], soup_formatter)
+
+class ReplayRunner:
+    """Command-line runner for browsing the session log."""
+
+    def __init__(self, log: SessionLog = session_log):
+        self.log = log
+        self.parser = argparse.ArgumentParser(description="Replay recorded tool sessions or look up earlier results")
+        self.parser.add_argument("--list", "-L",
+                                action="store_true",
+                                help="List the recorded sessions")
+        self.parser.add_argument("--session", "-s",
+                                type=str,
+                                help="Replay this session (see --list)")
+        self.parser.add_argument("--url", "-u",
+                                type=str,
+                                help="Results for this URL")
+        self.parser.add_argument("--query", "-q",
+                                type=str,
+                                help="Results for this search query")
+        self.parser.add_argument("--tool", "-t",
+                                type=str,
+                                help="Only records of this tool (soup, exa, research, crawl, recall)")
+        self.parser.add_argument("--since",
+                                type=parse_time,
+                                help="Only records from this ISO date or time on")
+        self.parser.add_argument("--until",
+                                type=parse_time,
+                                help="Only records before this ISO date or time")
+        self.parser.add_argument("--limit", "-l",
+                                type=int,
+                                help="Only the most recent N results")
+        add_runner_arguments(
+            self.parser,
+            format_help="Output format: text blocks, NDJSON records (json or ndjson) or a compact JSON array",
+            cache=False,
+            timings=False
+        )
+        self.parser.add_argument("--rebuild-index",
+                                action="store_true",
+                                help="Rebuild the offset index from the log")
+
+    def records(self, args: argparse.Namespace) -> Iterator[LogRecord]:
+        """Records matching the arguments, oldest first; only results unless a session is replayed."""
+        key = record_key(args.url or args.query) if args.url or args.query else None
+        kind = None if args.session and key is None else "result"
+        entries = list(self.log.entries(session=args.session, kind=kind, key=key, tool=args.tool,
+                                        since=args.since, until=args.until))
+        if args.limit:
+            kept = [entry for entry in entries if entry["kind"] == "result"][-args.limit:]
+            offsets = {entry["offset"] for entry in kept}
+            # Keep the invocations the remaining results belong to
+            runs = {entry["run"] for entry in kept}
+            entries = [entry for entry in entries if entry["offset"] in offsets or
+                       (entry["kind"] == "invocation" and entry["run"] in runs)]
+        for entry in entries:
+            record = self.log.read(entry)
+            if record is not None:
+                yield record
+
+    def format_record(self, index: int, record: LogRecord, output_format: str) -> str:
+        if output_format == "compact":
+            return format_as_compact_json(record)
+        if output_format in ("json", "ndjson"):
+            return json.dumps(record, ensure_ascii=False) + "\n"
+        if record["kind"] == "invocation":
+            argv = " ".join(record["data"].get("argv", []))
+            return f"##### {format_time(record['ts'])} {record['tool']}.py {argv}\n\n"
+        header = f"[{format_time(record['ts'])}, {record['tool']}.py, session {record['session']}]\n"
+        return header + formatter_for(record).format_item(index, record["data"]["result"], "text")
+
+    def list_sessions(self, output_format: str) -> str:
+        sessions = self.log.sessions()
+        if output_format == "compact":
+            return format_as_compact_json(sessions)
+        if output_format in ("json", "ndjson"):
+            return "".join(json.dumps(session) + "\n" for session in sessions)
+        if not sessions:
+            return "No recorded sessions.\n"
+        return "".join(
+            f"{session['session']}: {format_time(session['start'])} - {format_time(session['end'])}, "
+            f"{session['invocations']} runs, {session['results']} results\n"
+            for session in sessions
+        )
+
+    def run(self, argv: Optional[List[str]] = None) -> None:
+        """Run with parsed arguments (from sys.argv unless argv is given)."""
+        args = self.parser.parse_args(argv)
+        if args.rebuild_index:
+            print(f"Indexed {self.log.rebuild_index()} records", file=sys.stderr)
+            return
+        if not (args.list or args.session or args.url or args.query or args.since or args.until):
+            self.parser.error("pass --list, --session, --url, --query, --since or --until")
+
+        results = 0
+        with output_stream(args.output) as out:
+            if args.list:
+                out.write(self.list_sessions(args.format))
+            else:
+                written = 0
+                for record in self.records(args):
+                    if record["kind"] == "result":
+                        results += 1
+                    if args.format == "compact":
+                        out.write("[" if not written else ",")
+                    out.write(self.format_record(results, record, args.format))
+                    written += 1
+                    out.flush()
+                if args.format == "compact":
+                    out.write("]" if written else "[]")
+            # The other formats end in a newline already
+            if args.format == "compact" and not args.output:
+                out.write("\n")
+        if args.output:
+            print(f"Results saved to {output_path(args.output)}")
+        if not args.list:
+            print(f"Replayed {results} results", file=sys.stderr)
+
+def create_runner() -> ReplayRunner:
+    return ReplayRunner()
+
+def main():
+    create_runner().run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Research Pipeline Tool
+A command-line utility that searches the web with Exa and extracts the content of
+every hit as soon as its search result arrives, streaming the combined output.
+With --exa-contents, the page text comes with the search results and only hits
+without it are fetched.
+"""
+import os
+import sys
+from src.utils.cli.daemon import run_via_daemon
+
+if __name__ == "__main__":
+    # Hand off to a running tool daemon, if any, before the heavy imports below
+    run_via_daemon("research")
+
+import argparse
+import threading
+from typing import Dict, List, Optional
+from src.utils.cache import bind_cache_policy, configure_cache
+from src.utils.common import ResultWriter, output_stream, output_path
+from src.utils.cli.base import add_runner_arguments
+from src.utils.session_log import SessionRecorder
+from src.utils.cli.pipeline import SearchExtractPipeline
+from src.utils.dedup import canonicalize_url
+from src.utils.exa.types import ExaResult
+from src.utils.soup.formatter import formatter
+from src.utils.soup.types import SoupExtractedContent, SoupResult
+from exa import search_exa, DEFAULT_SEARCH_LIMIT
+from soup import extract_text_from_url, DEFAULT_CHUNK_SIZE
+from src.utils.soup.pages import text_page
+
+SEARCH_CONCURRENCY = int(os.getenv("RESEARCH_SEARCH_CONCURRENCY", "5"))
+FETCH_CONCURRENCY = int(os.getenv("RESEARCH_FETCH_CONCURRENCY", "16"))
+FETCH_PER_HOST = int(os.getenv("RESEARCH_FETCH_PER_HOST", "4"))
+
+def search_hits(result: ExaResult) -> List[str]:
+    """URLs of the hits in a search result (none for failed searches)."""
+    return [item["url"] for item in result.get("results", []) if item.get("url", "").startswith("http")]
+
+class HitContents:
+    """Page text that came with search results, handed to the extraction of each hit."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.texts: Dict[str, Dict[str, str]] = {}
+
+    def search(self, query: str, **kwargs) -> ExaResult:
+        """Search with contents, keeping the text of each hit."""
+        result = search_exa(query, contents=True, **kwargs)
+        with self.lock:
+            for item in result.get("results", []):
+                if item.get("text"):
+                    self.texts.setdefault(canonicalize_url(item["url"]), item)
+        return result
+
+    def extract(self, url: str, **kwargs) -> SoupResult:
+        """Extract a hit from its search text, fetching it only if Exa had none."""
+        with self.lock:
+            item = self.texts.pop(canonicalize_url(url), None)
+        page: Optional[SoupExtractedContent] = text_page(url, item["title"], item["text"]) if item else None
+        return extract_text_from_url(url, page=page, **kwargs)
+
+class ResearchRunner:
+    """Command-line runner for the search -> fetch -> extract pipeline."""
+
+    def __init__(self):
+        self.parser = argparse.ArgumentParser(description="Search with Exa and extract every hit in one streaming run")
+        input_group = self.parser.add_mutually_exclusive_group(required=True)
+        input_group.add_argument("--query", "-q", type=str, help="Single search query")
+        input_group.add_argument("--queries", "-qs", nargs="+", type=str, help="Multiple search queries")
+        self.parser.add_argument("--limit", "-l",
+                                type=int, default=DEFAULT_SEARCH_LIMIT,
+                                help=f"Search results per query (default: {DEFAULT_SEARCH_LIMIT})")
+        self.parser.add_argument("--max-pages",
+                                type=int,
+                                help="Stop queueing pages after this many unique URLs")
+        self.parser.add_argument("--selector", "-s",
+                                type=str,
+                                help="CSS selector to target specific elements")
+        self.parser.add_argument("--chunk-size",
+                                type=int, default=DEFAULT_CHUNK_SIZE,
+                                help=f"Characters of content per page, 0 for all (default: {DEFAULT_CHUNK_SIZE})")
+        self.parser.add_argument("--search-concurrency",
+                                type=int, default=SEARCH_CONCURRENCY,
+                                help=f"Concurrent searches (default: {SEARCH_CONCURRENCY})")
+        self.parser.add_argument("--fetch-concurrency",
+                                type=int, default=FETCH_CONCURRENCY,
+                                help=f"Concurrent page fetches (default: {FETCH_CONCURRENCY})")
+        self.parser.add_argument("--per-host",
+                                type=int, default=FETCH_PER_HOST,
+                                help=f"Concurrent page fetches per host (default: {FETCH_PER_HOST})")
+        self.parser.add_argument("--exa-contents",
+                                action="store_true",
+                                help="Get page text with the search results and fetch only the hits Exa has no text for")
+        add_runner_arguments(
+            self.parser,
+            format_help="Output format: text blocks, NDJSON lines (json or ndjson) or a compact JSON array",
+            timings=False
+        )
+
+    def run(self, argv: Optional[List[str]] = None) -> None:
+        """Run the pipeline with parsed arguments (from sys.argv unless argv is given)."""
+        args = self.parser.parse_args(argv)
+        configure_cache(enabled=not args.no_cache, refresh=args.refresh)
+        queries = [args.query] if args.query else args.queries
+        recorder = SessionRecorder("research", sys.argv[1:] if argv is None else argv)
+
+        contents = HitContents() if args.exa_contents else None
+        pipeline = SearchExtractPipeline(
+            search=bind_cache_policy(contents.search if contents else search_exa),
+            extract=bind_cache_policy(contents.extract if contents else extract_text_from_url),
+            hits=search_hits,
+            search_concurrency=args.search_concurrency,
+            extract_concurrency=args.fetch_concurrency,
+            per_host=args.per_host,
+            max_pages=args.max_pages
+        )
+        pages = 0
+        try:
+            with output_stream(args.output) as out:
+                writer = ResultWriter(formatter, out, "ndjson" if args.format == "json" else args.format)
+                events = pipeline.run(
+                    queries,
+                    search_kwargs={"limit": args.limit},
+                    extract_kwargs={"selector": args.selector, "chunk_size": args.chunk_size}
+                )
+                for kind, query, result in events:
+                    if kind == "search":
+                        recorder.result(query, result)
+                        if "error" in result:
+                            print(f"Search failed for '{query}': {result['error']}", file=sys.stderr)
+                        continue
+                    pages += 1
+                    recorder.result(result["query"], result)
+                    writer.write({**result, "source_query": query}, pages)
+                    out.flush()
+                writer.close()
+        except Exception as e:
+            print(f"Error processing request: {str(e)}", file=sys.stderr)
+            sys.exit(1)
+        if args.output:
+            print(f"Results saved to {output_path(args.output)}")
+
+        print(f"Extracted {pages} pages from {len(queries)} queries", file=sys.stderr)
+
+def create_runner() -> ResearchRunner:
+    return ResearchRunner()
+
+def main():
+    create_runner().run()
+
+if __name__ == "__main__":
+    main()
@@ -5,76 +5,254 @@ A command-line utility that extracts meaningful text from webpages using Beautif
 """
 import os
 import sys
+from src.utils.cli.daemon import run_via_daemon
+
+if __name__ == "__main__":
+    # Hand off to a running tool daemon, if any, before the heavy imports below
+    run_via_daemon("soup")
+
 import requests
-from typing import Optional, List
-from bs4 import BeautifulSoup
-from urllib.parse import urlparse
+from typing import List, Optional
+from urllib.parse import urlparse, urljoin, urldefrag
 from src.utils.soup.types import SoupResult, SoupExtractedContent
-from src.utils.soup.formatter import format_result
+from src.utils.soup.formatter import formatter
+from src.utils.soup.parsers import BACKENDS
+from src.utils.soup.download import ResponseBody, UnsupportedContentType
+from src.utils.soup.handlers import select_handler
 from src.utils.common import ErrorResult
 from src.utils.cli.base import ToolRunner
+from src.utils.cli import timing
+from src.utils.http_client import http_session, http_timeout
+from src.utils.cache import make_key, conditional_headers, cache_reads_allowed
+from src.utils.dedup import DuplicateFilter, canonicalize_url, simhash
+from src.utils.content_store import StoredContent
+from src.utils.condense import CONDENSE_BUDGET, budget_chars, condense, passages_of
+from src.utils.soup.pages import soup_cache, content_store, clean_text, save_page, text_page, DEFAULT_CHUNK_SIZE
+from src.utils.exa.client import get_contents
 
-def clean_text(text: str) -> str:
-    """Clean extracted text by removing extra whitespace and empty lines."""
-    lines = [line.strip() for line in text.split("\n")]
-    return "\n".join(line for line in lines if line)
+SOUP_MAX_BYTES = int(os.getenv("SOUP_MAX_BYTES", str(5 * 1024 * 1024)))
 
-def get_main_content_elements() -> List[dict]:
-    """Get list of potential main content element selectors."""
-    return [
-        {"tag": "main"},
-        {"tag": "article"},
-        {"tag": "div", "attrs": {"id": "content"}},
-        {"tag": "div", "attrs": {"class": "content"}},
-        {"tag": "div", "attrs": {"id": "main"}},
-        {"tag": "div", "attrs": {"class": "main"}},
-        {"tag": "div", "attrs": {"role": "main"}},
-    ]
-
-def extract_text_from_url(url: str, selector: Optional[str] = None) -> SoupResult:
+def extract_text_from_url(url: str,
+                          selector: Optional[str] = None,
+                          offset: int = 0,
+                          chunk_size: int = DEFAULT_CHUNK_SIZE,
+                          parser: Optional[str] = None,
+                          max_bytes: int = SOUP_MAX_BYTES,
+                          focus: Optional[str] = None,
+                          budget: int = CONDENSE_BUDGET,
+                          budget_unit: str = "tokens",
+                          links: bool = False,
+                          exa: bool = False,
+                          page: Optional[SoupExtractedContent] = None,
+                          share_budget: bool = False,
+                          fingerprint: bool = False) -> SoupResult:
     """
-    Extract text content from a webpage.
+    Extract one chunk of text content from a webpage.
+    
+    With a focus query, the content from `offset` on is condensed instead: only
+    the passages most relevant to the query are returned, up to the budget.
+    
+    With `exa`, the page text is looked up with Exa's contents endpoint first
+    (batched with the other URLs of the run); pages Exa has no text for are
+    fetched directly.
     
     Args:
         url: The URL to scrape
         selector: Optional CSS selector to target specific elements
+        offset: Character offset of the chunk to return
+        chunk_size: Number of characters to return (0 for everything from offset)
+        parser: Parser backend name (defaults to the fastest installed one)
+        max_bytes: Maximum bytes to download, 0 for no limit
+        focus: Query to rank passages against
+        budget: Size of the condensed content
+        budget_unit: Unit of the budget, "tokens" or "chars"
+        links: Also return the page's links (the page is fetched unless it is
+            cached with its links, even for a later offset)
+        exa: Read the page text from Exa when it has it (ignored with a selector or links)
+        page: Full-page result already obtained (e.g. from Exa search contents) to use instead of fetching
+        share_budget: With a focus, also return every passage from the offset on as
+            `candidates`, for the budget to be shared by the results of a run
+            (see condense_results)
+        fingerprint: Also return the SimHash of the whole page as `simhash`, for
+            the duplicate checks of a run (not only of the returned chunk)
         
     Returns:
-        Dictionary containing the extracted content
+        Dictionary containing the extracted chunk and paging information
     """
     if not url or url.isspace():
         return ErrorResult(query=url, error="Empty URL provided")
+    offset = max(offset, 0)
+    chunk_size = max(chunk_size, 0)
+    # Condensation ranks all content from the offset on
+    read_size = 0 if focus else chunk_size
+    
+    # Later chunks of an already extracted page are read from the content store,
+    # unless the run bypasses the cache (the page is then fetched and stored anew)
+    store_key = make_key(canonicalize_url(url), selector)
+    reuse = offset > 0 and not links and cache_reads_allowed()
+    stored = content_store.load(store_key) if reuse else None
+    content: Optional[str] = None
+    if stored:
+        timing.note("cache", "stored")
+        with timing.stage("store_read"):
+            chunk = content_store.read_chunk(store_key, stored, offset, read_size)
+    else:
+        if page is None and exa and not selector and not links:
+            page = fetch_exa_page(url)
+        if page is None:
+            page = fetch_page(url, selector, parser, max_bytes, links=links)
+        if "error" in page:
+            return page
+        page_links = page.get("links", [])
+        content = page["content"]
+        stored = save_page(url, page, selector)
+        chunk = content[offset:offset + read_size] if read_size else content[offset:]
+    
+    if focus:
+        limit = budget_chars(budget, budget_unit)
+        with timing.stage("condense"):
+            candidates = passages_of(chunk, offset)
+            passages = condense([candidates], focus, limit)[0]
+        result = make_chunk_result(url, stored, "\n\n".join(passage["text"] for passage in passages), offset, chunk_size)
+        result = SoupExtractedContent(**result, focus=focus, budget=limit, passages=passages)
+        if share_budget:
+            result["candidates"] = candidates
+    else:
+        result = make_chunk_result(url, stored, chunk, offset, chunk_size)
+    if links:
+        result["links"] = page_links
+    if fingerprint:
+        with timing.stage("fingerprint"):
+            if content is None:
+                content = content_store.read_chunk(store_key, stored, 0, 0)
+            result["simhash"] = simhash(content)
+    return result
 
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
+def fetch_exa_page(url: str) -> Optional[SoupExtractedContent]:
+    """The page from the cache or Exa's contents endpoint, or None if Exa has no text for it."""
+    cached = soup_cache.get(make_key(canonicalize_url(url), None))
+    if cached:
+        timing.note("cache", "hit")
+        return cached
+    item = get_contents(url)
+    timing.note("exa", "hit" if item else "miss")
+    return text_page(url, item["title"], item["text"]) if item else None
+
+def make_chunk_result(url: str, stored: StoredContent, chunk: str, offset: int, chunk_size: int) -> SoupExtractedContent:
+    """Build the result for one chunk of a stored page."""
+    content_length = stored["content_length"]
+    total_chunks = -(-content_length // chunk_size) if chunk_size else 1
+    return SoupExtractedContent(
+        query=url,
+        url=url,
+        domain=stored["domain"],
+        title=stored["title"],
+        content=chunk,
+        content_length=content_length,
+        offset=offset,
+        chunk_size=chunk_size,
+        total_chunks=max(total_chunks, 1),
+        content_hash=stored["content_hash"],
+        final_url=stored.get("final_url") or canonicalize_url(url),
+        truncated=bool(stored.get("truncated")),
+        document_type=stored.get("document_type") or "html"
+    )
+
+def absolute_links(base_url: str, hrefs: List[str]) -> List[str]:
+    """Resolve links against the page URL, keeping unique http(s) URLs without fragments."""
+    resolved = []
+    for href in hrefs:
+        try:
+            link = urldefrag(urljoin(base_url, href.strip()))[0]
+        except ValueError:
+            continue
+        if link.startswith(("http://", "https://")):
+            resolved.append(link)
+    return list(dict.fromkeys(resolved))
+
+def fetch_page(url: str,
+               selector: Optional[str] = None,
+               parser: Optional[str] = None,
+               max_bytes: int = SOUP_MAX_BYTES,
+               links: bool = False) -> SoupResult:
+    """
+    Fetch a webpage or document and extract its full text content.
+    
+    The body is streamed: at most `max_bytes` are read, and the handler for its
+    type (HTML, PDF, text, JSON or feed) may stop reading earlier. Unsupported
+    types are rejected before the body is downloaded.
+    
+    Args:
+        url: The URL to scrape
+        selector: Optional CSS selector to target specific elements
+        parser: Parser backend name (defaults to the fastest installed one)
+        max_bytes: Maximum bytes to download, 0 for no limit
+        links: Also collect the page's links (read the whole page, skip cached pages without links)
         
-        # Remove unwanted elements
-        for element in soup(["script", "style", "meta", "noscript", "header", "footer", "nav"]):
-            element.decompose()
+    Returns:
+        Dictionary containing the full extracted content
+    """
+    cache_key = make_key(canonicalize_url(url), selector)
+    cached = soup_cache.lookup(cache_key)
+    if links and cached and "links" not in cached["value"]:
+        cached = None
+    if cached and soup_cache.is_fresh(cached):
+        timing.note("cache", "hit")
+        return cached["value"]
+    timing.note("cache", "miss")
+
+    try:
+        # Revalidate a stale cached page instead of downloading it again
+        headers = conditional_headers(cached)
+        # Until the response headers arrive (connection setup is timed separately)
+        with timing.stage("request"):
+            response = http_session().get(url, headers=headers, timeout=http_timeout(), stream=True)
+        with response:
+            if cached and response.status_code == 304:
+                timing.note("cache", "revalidated")
+                soup_cache.renew(cached)
+                return cached["value"]
+            response.raise_for_status()
+            body = ResponseBody(response, max_bytes)
+            handler = select_handler(response, body)
             
-        # Extract title and content
-        title = soup.title.string.strip() if soup.title else urlparse(url).path
-        content = extract_content(soup, selector)
+            # Extract title and content
+            page_links: Optional[List[str]] = [] if links else None
+            title, content = handler.extract(body, selector, parser, page_links)
+        
+        truncated = body.truncated
+        title = title or urlparse(url).path
         
         # Clean up the text
-        content = clean_text(content)
+        if handler.needs_cleaning:
+            with timing.stage("clean"):
+                content = clean_text(content)
         domain = urlparse(url).netloc
         
-        return SoupExtractedContent(
+        result = SoupExtractedContent(
             query=url,
             url=url,
             domain=domain,
             title=title,
             content=content,
-            content_length=len(content)
+            content_length=len(content),
+            final_url=canonicalize_url(response.url),
+            truncated=truncated,
+            document_type=handler.name
         )
+        if page_links is not None:
+            result["links"] = absolute_links(response.url, page_links)
+        # A truncated page depends on the byte cap, so it is not cached
+        if not truncated:
+            soup_cache.store(
+                cache_key, result,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified")
+            )
+        return result
         
+    except UnsupportedContentType as e:
+        return ErrorResult(query=url, error=str(e))
     except requests.exceptions.Timeout:
         return ErrorResult(query=url, error="Request timed out")
     except requests.exceptions.RequestException as e:
@@ -82,43 +260,70 @@ def extract_text_from_url(url: str, selector: Optional[str] = None) -> SoupResul
     except Exception as e:
         return ErrorResult(query=url, error=f"Error processing content: {str(e)}")
 
-def extract_content(soup: BeautifulSoup, selector: Optional[str] = None) -> str:
-    """Extract content from BeautifulSoup object using selector or fallback methods."""
-    if selector:
-        elements = soup.select(selector)
-        if elements:
-            return "\n\n".join(elem.get_text(separator="\n", strip=True) for elem in elements)
-    
-    # Try each potential main content element
-    for element_def in get_main_content_elements():
-        element = soup.find(element_def["tag"], element_def.get("attrs"))
-        if element:
-            content = element.get_text(separator="\n", strip=True)
-            if len(content) > 100:  # Only use if substantial content found
-                return content
-    
-    # Fallback to body text
-    if soup.body:
-        return soup.body.get_text(separator="\n", strip=True)
-    
-    return "No content found"
-
-def main():
+def create_runner() -> ToolRunner:
     runner = ToolRunner(
         processor=extract_text_from_url,
-        formatter=format_result,
+        formatter=formatter,
         description="Extract text from webpages using BeautifulSoup",
         input_name="url",
         input_help="URL to extract text from",
-        multi_input_help="Multiple URLs to extract text from"
+        multi_input_help="Multiple URLs to extract text from",
+        duplicate_filter=DuplicateFilter,
+        # Focused pages written together share the budget, ranked over all their passages
+        prepare_kwargs={"share_budget": True},
+        # Duplicates are matched on whole pages, whichever chunk of them is returned
+        duplicate_kwargs={"fingerprint": True}
     )
     
-    runner.add_arguments(selector={
-        "type": str,
-        "help": "CSS selector to target specific elements"
-    })
+    runner.add_arguments(
+        selector={
+            "type": str,
+            "help": "CSS selector to target specific elements"
+        },
+        offset={
+            "type": int,
+            "default": 0,
+            "help": "Character offset to start reading from (default: 0)"
+        },
+        chunk_size={
+            "type": int,
+            "default": DEFAULT_CHUNK_SIZE,
+            "help": f"Number of characters to return, 0 for all (default: {DEFAULT_CHUNK_SIZE})"
+        },
+        parser={
+            "choices": ["auto", *BACKENDS],
+            "default": "auto",
+            "help": "HTML parser backend (default: fastest installed)"
+        },
+        max_bytes={
+            "type": int,
+            "default": SOUP_MAX_BYTES,
+            "help": f"Maximum bytes to download per page, 0 for no limit (default: {SOUP_MAX_BYTES})"
+        },
+        focus={
+            "type": str,
+            "help": "Return only the passages most relevant to this query instead of a chunk"
+        },
+        budget={
+            "type": int,
+            "default": CONDENSE_BUDGET,
+            "help": f"Size of the --focus passages, shared by all URLs of a run (default: {CONDENSE_BUDGET})"
+        },
+        budget_unit={
+            "choices": ["tokens", "chars"],
+            "default": "tokens",
+            "help": "Unit of --budget (default: tokens, about 4 characters each)"
+        },
+        exa={
+            "action": "store_true",
+            "help": "Read page text from Exa's contents endpoint in batches, fetching only pages Exa has no text for (not with --selector)"
+        }
+    )
     
-    runner.run()
+    return runner
+
+def main():
+    create_runner().run()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file